@@ -22,9 +22,11 @@ import json
 import logging
 import os
 import re
+import signal
 import string
 import subprocess
 import tempfile
+import threading
 import time
 from typing import Any
 import uuid
@@ -33,8 +35,11 @@ from google.cloud import storage
 from google.protobuf import json_format
 from kubernetes import client
 from kubernetes import config
+from kubernetes import utils
+from kubernetes import watch
 from kubernetes.client.api import batch_v1_api
 from urllib3 import exceptions
+import yaml
 
 import common_pb2
 import health_results_pb2
@@ -61,6 +66,22 @@ K_NEMO_TRAIN_STEP_TIMING_REGEX = re.compile(
 K_DIAG_RUNNER_TAINT_INTER_RACK = (
     f"{K_DIAG_RUNNER_TAINT_INTER_RACK_KEY}=true:NoSchedule"
 )
+K_STRATEGIC_MERGE_PATCH = "application/strategic-merge-patch+json"
+# Number of nodes patched concurrently when flushing node mutations.
+K_NODE_MUTATION_MAX_WORKERS = int(
+    os.environ.get("NODE_MUTATION_MAX_WORKERS", "16")
+)
+# Node labels indexed by NodeInformer for fast lookups.
+K_NODE_INDEX_LABELS = (
+    "aiinfra/nccl-healthcheck-pre-result",
+    "topology.gke.io/cluster",
+    "topology.gke.io/rack",
+    "cloud.google.com/gce-topology-block",
+    K_TOPOLOGY_LABEL_SUBBLOCK,
+)
+# Label set on health check jobs to scope job lookups to a single run.
+K_RUN_ID_LABEL = "aiinfra/health-check-run"
+_K_HELM_RELEASE_NAME_ANNOTATION = "meta.helm.sh/release-name"
 K_APPLY_FORMAT = "%s apply -f %s"
 K_DELETE_FORMAT = "%s delete -f %s"
 
@@ -111,6 +132,7 @@ K_MESSAGE_SIZE_TO_LATENCY_LABEL = {
 class HelmCommand(enum.Enum):
   INSTALL: str = "install"
   UNINSTALL: str = "uninstall"
+  TEMPLATE: str = "template"
 
 
 def log_results(
@@ -132,19 +154,6 @@ def log_results(
   print(json.dumps(log))
 
 
-def remove_label(
-    node: str,
-    label_key: str,
-    kubectl_path: str = _KUBECTL,
-) -> None:
-  """Removes a label from a node."""
-  print(f"removing label {label_key} from node {node}")
-  run_command(
-      f"{kubectl_path} label node {node} {label_key}-",
-      print_output=False,
-  )
-
-
 # 
 def label_node(
     node: str,
@@ -158,60 +167,436 @@ def label_node(
     label_key: The key of the label.
     label_value: The value of the label.
   """
-  add_label(
-      node,
-      label_key,
-      label_value,
-      f"{_KUBECTL} label node %s %s=%s --overwrite",
-  )
+  mutator = NodeMutator()
+  mutator.set_label(node, label_key, label_value)
+  mutator.flush()
 
 
-def add_label(
-    node_name: str,
-    label: str,
-    value: str,
-    label_format: str,
-    print_output: bool = True,
+def remove_taint_from_all_nodes(
+    taint_key: str,
+    kubectl_path: str = _KUBECTL,
 ) -> None:
-  """Adds a label to a node.
+  """Removes the taint label from all nodes."""
+  run_command(f"{kubectl_path} taint node --all {taint_key}-")
+
+
+_core_v1_api: client.CoreV1Api | None = None
+
+
+def get_core_v1_api() -> client.CoreV1Api:
+  """Returns a process-wide CoreV1Api using the in-cluster config."""
+  global _core_v1_api
+  if _core_v1_api is None:
+    config.load_incluster_config()
+    _core_v1_api = client.CoreV1Api()
+  return _core_v1_api
+
+
+@dataclasses.dataclass
+class NodeMutation:
+  """Label and taint changes queued for a single node.
+
+  Attributes:
+    labels: Label key to value. A value of None removes the label.
+    taints: Taints to add (or replace) keyed by (key, effect).
+    removed_taint_keys: Taint keys to remove regardless of effect.
+  """
+
+  labels: dict[str, str | None] = dataclasses.field(default_factory=dict)
+  taints: dict[tuple[str, str], client.V1Taint] = dataclasses.field(
+      default_factory=dict
+  )
+  removed_taint_keys: set[str] = dataclasses.field(default_factory=set)
+
+
+class NodeMutator:
+  """Batches node label and taint changes into one PATCH per node.
+
+  Changes are queued in memory and sent on flush() as a single strategic merge
+  patch per node, with nodes patched concurrently. Taints are a plain list in
+  the node spec so they are read, merged and written back with the node's
+  resourceVersion, retrying on conflicts.
+
+  Typical usage example:
+
+    mutator = NodeMutator()
+    for node in nodes:
+      mutator.set_label(node, "aiinfra/nccl-healthcheck-result", "pass")
+      mutator.remove_taint(node, "aiinfra/nccl-healthcheck")
+    mutator.flush()
+  """
+
+  def __init__(
+      self,
+      v1: client.CoreV1Api | None = None,
+      max_workers: int = K_NODE_MUTATION_MAX_WORKERS,
+      conflict_retries: int = 3,
+  ):
+    self._v1 = v1
+    self._max_workers = max_workers
+    self._conflict_retries = conflict_retries
+    self._lock = threading.Lock()
+    self._pending: dict[str, NodeMutation] = {}
+
+  def _mutation(self, node_name: str) -> NodeMutation:
+    return self._pending.setdefault(node_name, NodeMutation())
+
+  def set_label(
+      self,
+      node_name: str,
+      label_key: str,
+      label_value: Any,
+      print_output: bool = True,
+  ) -> None:
+    """Queues adding or overwriting a label on a node."""
+    if print_output:
+      print(f"adding label {label_key}={label_value} to node {node_name}")
+    with self._lock:
+      self._mutation(node_name).labels[label_key] = str(label_value)
+
+  def remove_label(
+      self, node_name: str, label_key: str, print_output: bool = True
+  ) -> None:
+    """Queues removing a label from a node."""
+    if print_output:
+      print(f"removing label {label_key} from node {node_name}")
+    with self._lock:
+      self._mutation(node_name).labels[label_key] = None
+
+  def add_taint(
+      self,
+      node_name: str,
+      key: str,
+      value: str,
+      effect: str,
+      print_output: bool = True,
+  ) -> None:
+    """Queues adding (or replacing) a taint on a node."""
+    if print_output:
+      print(f"adding taint {key}={value}:{effect} to node {node_name}")
+    with self._lock:
+      mutation = self._mutation(node_name)
+      mutation.removed_taint_keys.discard(key)
+      mutation.taints[(key, effect)] = client.V1Taint(
+          key=key, value=value, effect=effect
+      )
+
+  def remove_taint(
+      self, node_name: str, key: str, print_output: bool = True
+  ) -> None:
+    """Queues removing all taints with the given key from a node."""
+    if print_output:
+      print(f"removing taint {key} from node {node_name}")
+    with self._lock:
+      mutation = self._mutation(node_name)
+      mutation.taints = {
+          taint_id: taint
+          for taint_id, taint in mutation.taints.items()
+          if taint_id[0] != key
+      }
+      mutation.removed_taint_keys.add(key)
+
+  def flush(self) -> dict[str, Exception]:
+    """Applies all queued changes, patching nodes concurrently.
+
+    Returns:
+      Node name to the error raised while patching it, for failed nodes only.
+    """
+    with self._lock:
+      pending, self._pending = self._pending, {}
+    if not pending:
+      return {}
+    if self._v1 is None:
+      self._v1 = get_core_v1_api()
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+      future_to_node = {
+          executor.submit(self._patch_node, node_name, mutation): node_name
+          for node_name, mutation in pending.items()
+      }
+      for future in futures.as_completed(future_to_node):
+        node_name = future_to_node[future]
+        try:
+          future.result()
+        except (client.ApiException, exceptions.HTTPError) as e:
+          print(f"Error patching node {node_name}: {e}")
+          errors[node_name] = e
+    print(f"Patched {len(pending) - len(errors)} of {len(pending)} nodes")
+    return errors
+
+  def _patch_node(self, node_name: str, mutation: NodeMutation) -> None:
+    """Sends the queued changes for one node as a single PATCH."""
+    attempt = 1
+    while True:
+      body = {"metadata": {"labels": dict(mutation.labels)}}
+      if mutation.taints or mutation.removed_taint_keys:
+        node = self._v1.read_node(name=node_name)
+        body["metadata"]["resourceVersion"] = node.metadata.resource_version
+        body["spec"] = {"taints": self._merge_taints(node, mutation)}
+      try:
+        self._v1.patch_node(
+            name=node_name,
+            body=body,
+            _content_type=K_STRATEGIC_MERGE_PATCH,
+        )
+        return
+      except client.ApiException as e:
+        # Only taint updates carry a resourceVersion and can conflict.
+        if e.status != 409 or attempt >= self._conflict_retries:
+          raise e
+      print(f"Conflict patching node {node_name}, retrying")
+      attempt += 1
+
+  def _merge_taints(
+      self, node: client.V1Node, mutation: NodeMutation
+  ) -> list[dict[str, Any]]:
+    """Returns the node's full taint list after applying the mutation."""
+    existing = node.spec.taints if node.spec and node.spec.taints else []
+    taints = [
+        taint
+        for taint in existing
+        if taint.key not in mutation.removed_taint_keys
+        and (taint.key, taint.effect) not in mutation.taints
+    ]
+    taints.extend(mutation.taints.values())
+    return [
+        self._v1.api_client.sanitize_for_serialization(taint)
+        for taint in taints
+    ]
+
+
+class NodeInformer:
+  """In-memory cache of the cluster's nodes, kept current by a watch.
+
+  The node list is fetched once and then a background thread watches for
+  changes from that list's resourceVersion. Nodes are indexed by name and by
+  the value of each label in index_labels, so lookups don't hit the API.
+
+  Typical usage example:
+
+    informer = get_node_informer()
+    informer.sync()
+    passed = informer.by_label("aiinfra/nccl-healthcheck-pre-result", "pass")
+  """
+
+  def __init__(
+      self,
+      v1: client.CoreV1Api | None = None,
+      index_labels: Iterable[str] = K_NODE_INDEX_LABELS,
+      watch_timeout_seconds: int = 300,
+  ):
+    self._v1 = v1
+    self._index_labels = tuple(index_labels)
+    self._watch_timeout_seconds = watch_timeout_seconds
+    self._lock = threading.Lock()
+    self._start_lock = threading.Lock()
+    self._updated = threading.Condition(self._lock)
+    self._nodes: dict[str, client.V1Node] = {}
+    self._indexes: dict[str, dict[str, set[str]]] = {
+        label: {} for label in self._index_labels
+    }
+    self._resource_version: str | None = None
+    self._thread: threading.Thread | None = None
+
+  def start(self) -> None:
+    """Lists all nodes and starts watching for changes, if not started."""
+    with self._start_lock:
+      if self._thread is not None:
+        return
+      if self._v1 is None:
+        self._v1 = get_core_v1_api()
+      self._relist()
+      self._thread = threading.Thread(
+          target=self._watch_forever, name="node-informer", daemon=True
+      )
+      self._thread.start()
+
+  def sync(self, timeout_seconds: int = 30) -> None:
+    """Waits until the cache reflects all node changes made before the call.
+
+    A single-item list returns the current resourceVersion cheaply; the cache
+    is current once the watch has caught up to it. If it doesn't within
+    timeout_seconds the full node list is fetched again.
+
+    Args:
+      timeout_seconds: Maximum time to wait for the watch to catch up.
+    """
+    self.start()
+    target = self._v1.list_node(limit=1).metadata.resource_version
+    deadline = time.time() + timeout_seconds
+    with self._lock:
+      while not self._has_seen(target):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+          break
+        self._updated.wait(remaining)
+      else:
+        return
+    print(f"Node cache did not reach version {target}, re-listing nodes")
+    self._relist()
+
+  def list_nodes(self) -> list[client.V1Node]:
+    """Returns all cached nodes."""
+    self.start()
+    with self._lock:
+      return list(self._nodes.values())
+
+  def get(self, node_name: str) -> client.V1Node | None:
+    """Returns the cached node with the given name, if any."""
+    self.start()
+    with self._lock:
+      return self._nodes.get(node_name)
+
+  def by_label(self, label_key: str, label_value: str) -> list[client.V1Node]:
+    """Returns cached nodes whose label label_key has value label_value."""
+    self.start()
+    with self._lock:
+      if label_key in self._indexes:
+        names = self._indexes[label_key].get(label_value, set())
+        return [self._nodes[name] for name in names]
+      return [
+          node
+          for node in self._nodes.values()
+          if (node.metadata.labels or {}).get(label_key) == label_value
+      ]
+
+  def label_values(self, label_key: str) -> dict[str, list[str]]:
+    """Returns each value of an indexed label mapped to its node names."""
+    self.start()
+    with self._lock:
+      return {
+          value: sorted(names)
+          for value, names in self._indexes[label_key].items()
+      }
+
+  def _has_seen(self, resource_version: str) -> bool:
+    """Returns whether the cache is at or past the given resourceVersion."""
+    if self._resource_version is None:
+      return False
+    try:
+      return int(self._resource_version) >= int(resource_version)
+    except ValueError:
+      return self._resource_version == resource_version
+
+  def _relist(self) -> None:
+    """Replaces the cache contents with a fresh list of all nodes."""
+    node_list = self._v1.list_node()
+    with self._lock:
+      self._nodes = {}
+      self._indexes = {label: {} for label in self._index_labels}
+      for node in node_list.items:
+        self._upsert(node)
+      self._resource_version = node_list.metadata.resource_version
+      self._updated.notify_all()
+    print(f"Cached {len(node_list.items)} nodes")
+
+  def _upsert(self, node: client.V1Node) -> None:
+    """Adds or replaces a node in the cache. Caller must hold the lock."""
+    self._remove(node.metadata.name)
+    self._nodes[node.metadata.name] = node
+    labels = node.metadata.labels or {}
+    for label, index in self._indexes.items():
+      if label in labels:
+        index.setdefault(labels[label], set()).add(node.metadata.name)
+
+  def _remove(self, node_name: str) -> None:
+    """Removes a node from the cache. Caller must hold the lock."""
+    old_node = self._nodes.pop(node_name, None)
+    if old_node is None:
+      return
+    labels = old_node.metadata.labels or {}
+    for label, index in self._indexes.items():
+      names = index.get(labels.get(label))
+      if names is not None:
+        names.discard(node_name)
+        if not names:
+          del index[labels[label]]
+
+  def _watch_forever(self) -> None:
+    """Applies node watch events to the cache, re-listing when needed."""
+    while True:
+      try:
+        node_watch = watch.Watch()
+        for event in node_watch.stream(
+            self._v1.list_node,
+            resource_version=self._resource_version,
+            timeout_seconds=self._watch_timeout_seconds,
+            allow_watch_bookmarks=True,
+        ):
+          with self._lock:
+            if event["type"] in ("ADDED", "MODIFIED"):
+              self._upsert(event["object"])
+            elif event["type"] == "DELETED":
+              self._remove(event["object"].metadata.name)
+            if node_watch.resource_version:
+              self._resource_version = node_watch.resource_version
+            self._updated.notify_all()
+      except (client.ApiException, exceptions.HTTPError, ValueError) as e:
+        print(f"Node watch failed, re-listing nodes: {e}")
+        time.sleep(1)
+        try:
+          self._relist()
+        except (client.ApiException, exceptions.HTTPError) as relist_error:
+          print(f"Error re-listing nodes: {relist_error}")
+          time.sleep(10)
+
+
+_node_informer: NodeInformer | None = None
+_node_informer_lock = threading.Lock()
+
+
+def get_node_informer(v1: client.CoreV1Api | None = None) -> NodeInformer:
+  """Returns the process-wide NodeInformer, starting it on first use.
 
   Args:
-    node_name (str): Name of the node.
-    label (str): label being set.
-    value (str): value being set.
-    label_format (str): Interpolation format accepting node_name, label, value.
-    print_output (bool): If True, prints the output of the command. Defaults to
-      True.
+    v1: CoreV1Api to create the informer with, if it doesn't exist yet.
 
   Returns:
-    None.
+    The shared NodeInformer.
   """
-  if print_output:
-    print("adding label %s=%s to node %s" % (label, value, node_name))
-  run_command(
-      label_format % (node_name, label, value), print_output=print_output
-  )
+  global _node_informer
+  with _node_informer_lock:
+    if _node_informer is None:
+      _node_informer = NodeInformer(v1)
+  _node_informer.start()
+  return _node_informer
 
 
-def remove_taint_from_all_nodes(
-    taint_key: str,
-    kubectl_path: str = _KUBECTL,
-) -> None:
-  """Removes the taint label from all nodes."""
-  run_command(f"{kubectl_path} taint node --all {taint_key}-")
+class RateLimiter:
+  """Token bucket limiting how many calls can start per second.
 
+  Typical usage example:
 
-def taint_node(
-    node_name: str,
-    taint: str,
-    kubectl_path: str = _KUBECTL,
-) -> None:
-  """Adds a taint to a node."""
-  print(f"tainting node {node_name} with {taint}")
-  run_command(
-      f"{kubectl_path} taint node {node_name} {taint}",
-      print_output=False,
-  )
+    limiter = RateLimiter(qps=10, burst=10)
+    for release in releases:
+      limiter.acquire()
+      install(release)
+  """
+
+  def __init__(self, qps: float, burst: int = 1):
+    self._interval = 1.0 / qps if qps > 0 else 0.0
+    self._burst = max(1, burst)
+    self._tokens = float(self._burst)
+    self._last = time.monotonic()
+    self._lock = threading.Lock()
+
+  def acquire(self) -> None:
+    """Blocks until a call is allowed to start."""
+    if not self._interval:
+      return
+    with self._lock:
+      now = time.monotonic()
+      self._tokens = min(
+          self._burst, self._tokens + (now - self._last) / self._interval
+      )
+      self._last = now
+      wait_seconds = 0.0
+      if self._tokens < 1:
+        wait_seconds = (1 - self._tokens) * self._interval
+      self._tokens -= 1
+    if wait_seconds:
+      time.sleep(wait_seconds)
 
 
 def run_command_with_retry(
@@ -278,33 +663,138 @@ def run_command(
   return diag
 
 
-def get_created_jobs(release_names: Iterable[str]) -> Iterable[str]:
+def run_command_streaming(
+    command: str,
+    on_line: Callable[[str], bool],
+    print_output: bool = True,
+) -> subprocess.CompletedProcess[str]:
+  """Execute a shell command, handing each line of stdout over as it's read.
+
+  Args:
+    command (str): The shell command to be executed.
+    on_line (Callable[[str], bool]): Called with each line of stdout. If it
+      returns True the command (and any process it started) is terminated.
+    print_output (bool, optional): If True, prints each line of stdout as it
+      arrives and stderr once the command exits. Defaults to True.
+
+  Returns:
+    subprocess.CompletedProcess: The result object with the stdout read until
+    the command exited or was terminated.
+  """
+
+  print("running: %s" % command)
+  start_time = time.time()
+  # Own process group so that stopping early also stops the command's children
+  process = subprocess.Popen(
+      command,
+      shell=True,
+      text=True,
+      stdout=subprocess.PIPE,
+      stderr=subprocess.PIPE,
+      start_new_session=True,
+  )
+  # Drained in the background so a full stderr pipe can't block the command
+  stderr_lines = []
+  stderr_reader = threading.Thread(
+      target=lambda: stderr_lines.extend(process.stderr), daemon=True
+  )
+  stderr_reader.start()
+  stdout_lines = []
+  for line in process.stdout:
+    stdout_lines.append(line)
+    if print_output:
+      print(line, end="")
+    if on_line(line):
+      print("stopping command early: %s" % command)
+      try:
+        os.killpg(process.pid, signal.SIGTERM)
+      except ProcessLookupError:
+        pass
+      break
+  process.stdout.close()
+  returncode = process.wait()
+  stderr_reader.join()
+  if print_output:
+    print(
+        "took: %s seconds\nerr: %s"
+        % (time.time() - start_time, "".join(stderr_lines))
+    )
+
+  return subprocess.CompletedProcess(
+      args=command,
+      returncode=returncode,
+      stdout="".join(stdout_lines),
+      stderr="".join(stderr_lines),
+  )
+
+
+def get_created_jobs(
+    release_names: Iterable[str],
+    label_selector: str | None = None,
+) -> Iterable[str]:
   """Get jobs created by a given helm release.
 
   Args:
     release_names: Iterable of helm release names to get jobs for.
+    label_selector: Optional label selector matching the releases' jobs.
 
   Returns:
     Iterable of job names created by the helm releases.
   """
+  release_to_jobs = get_created_jobs_by_release(release_names, label_selector)
+  return [job for jobs in release_to_jobs.values() for job in jobs]
+
+
+def get_created_jobs_by_release(
+    release_names: Iterable[str],
+    label_selector: str | None = None,
+) -> dict[str, list[str]]:
+  """Get jobs created by given helm releases, grouped by release.
+
+  All releases are looked up with a single list call. If a label selector is
+  given the list is filtered server side; should that miss the jobs of some
+  releases (e.g. a chart that doesn't set the label) the whole namespace is
+  listed instead.
+
+  Args:
+    release_names: Iterable of helm release names to get jobs for.
+    label_selector: Optional label selector matching the releases' jobs.
+
+  Returns:
+    Helm release name to the names of the jobs it created.
+  """
+  release_names = set(release_names)
   config.load_incluster_config()
   batch_v1 = batch_v1_api.BatchV1Api()
   try:
-    jobs = batch_v1.list_namespaced_job(namespace="default").items
-
-    release_name_annotation_key = "meta.helm.sh/release-name"
-    matching_jobs = [
-        job.metadata.name
-        for job in jobs
-        if job.metadata.annotations
-        and release_name_annotation_key in job.metadata.annotations
-        and job.metadata.annotations[release_name_annotation_key]
-        in release_names
-    ]
-    return matching_jobs
+    if label_selector:
+      jobs = batch_v1.list_namespaced_job(
+          namespace="default", label_selector=label_selector
+      ).items
+      found_releases = {
+          job.metadata.annotations.get(_K_HELM_RELEASE_NAME_ANNOTATION)
+          for job in jobs
+          if job.metadata.annotations
+      }
+      if not release_names <= found_releases:
+        print(f"Not all releases have jobs matching {label_selector}")
+        jobs = batch_v1.list_namespaced_job(namespace="default").items
+    else:
+      jobs = batch_v1.list_namespaced_job(namespace="default").items
+
+    release_to_jobs = {}
+    for job in jobs:
+      if not job.metadata.annotations:
+        continue
+      release_name = job.metadata.annotations.get(
+          _K_HELM_RELEASE_NAME_ANNOTATION
+      )
+      if release_name in release_names:
+        release_to_jobs.setdefault(release_name, []).append(job.metadata.name)
+    return release_to_jobs
   except client.ApiException as e:
     print(f"Error getting Jobs: {e}")
-    return []
+    return {}
 
 
 def get_jobs_by_prefix(prefix: str) -> list[str]:
@@ -523,6 +1013,91 @@ def check_if_fail_nemo_early(
   return jobs_to_fail_early
 
 
+def _job_finished(
+    job: client.V1Job,
+    remaining_jobs: set[str],
+    on_job_finished: Callable[[str], None] | None = None,
+) -> None:
+  """Removes a job from remaining_jobs if it has succeeded or failed."""
+  if job.metadata.name not in remaining_jobs or job.status is None:
+    return
+  if (
+      job.status.succeeded is not None
+      and job.status.succeeded == job.spec.completions
+  ):
+    remaining_jobs.remove(job.metadata.name)
+    print(f"Job {job.metadata.name} completed successfully.")
+  elif job.status.failed is not None and job.status.failed >= 1:
+    remaining_jobs.remove(job.metadata.name)
+    print(f"Job {job.metadata.name} failed.")
+  else:
+    return
+  if on_job_finished:
+    on_job_finished(job.metadata.name)
+
+
+def _list_jobs(
+    job_v1: batch_v1_api.BatchV1Api,
+    namespace: str,
+    label_selector: str | None,
+) -> client.V1JobList | None:
+  """Lists jobs in a namespace, returning None if the API call failed."""
+  kwargs = {}
+  if label_selector:
+    kwargs["label_selector"] = label_selector
+  try:
+    return job_v1.list_namespaced_job(namespace, **kwargs)
+  except exceptions.ConnectTimeoutError as e:
+    print(f"Connect Timeout Error when attempting to list jobs: {e}")
+  except exceptions.MaxRetryError as e:
+    print(f"Max retry error when attempting to list jobs: {e}")
+  except client.ApiException as e:
+    print(f"Unknown error when attempting to list jobs: {e}")
+  return None
+
+
+def _watch_jobs(
+    job_v1: batch_v1_api.BatchV1Api,
+    namespace: str,
+    label_selector: str | None,
+    resource_version: str,
+    remaining_jobs: set[str],
+    timeout_seconds: int,
+    on_job_finished: Callable[[str], None] | None = None,
+) -> str:
+  """Watches jobs from resource_version until done or timeout_seconds pass.
+
+  Args:
+    job_v1: BatchV1Api object
+    namespace: Namespace of the jobs.
+    label_selector: Optional label selector to scope the watch.
+    resource_version: Resource version to resume the watch from.
+    remaining_jobs: Names of jobs still running; updated in place.
+    timeout_seconds: Server-side timeout for this watch request.
+    on_job_finished: Optional function called with each finished job's name.
+
+  Returns:
+    The last resource version seen, to resume the next watch from.
+  """
+  kwargs = {}
+  if label_selector:
+    kwargs["label_selector"] = label_selector
+  job_watch = watch.Watch()
+  for event in job_watch.stream(
+      job_v1.list_namespaced_job,
+      namespace,
+      resource_version=resource_version,
+      timeout_seconds=timeout_seconds,
+      allow_watch_bookmarks=True,
+      **kwargs,
+  ):
+    if event["type"] in ("ADDED", "MODIFIED"):
+      _job_finished(event["object"], remaining_jobs, on_job_finished)
+    if not remaining_jobs:
+      job_watch.stop()
+  return job_watch.resource_version or resource_version
+
+
 def wait_till_jobs_complete(
     job_v1: batch_v1_api.BatchV1Api,
     jobs_to_monitor: Iterable[str],
@@ -530,9 +1105,16 @@ def wait_till_jobs_complete(
     timeout_seconds: int = 900,
     check_interval: int = 30,
     nemo_check_config: dict[str, Any] | None = None,
+    label_selector: str | None = None,
+    use_watch: bool = True,
+    on_job_finished: Callable[[str], None] | None = None,
 ) -> list[str]:
   """Waits for a list of jobs to complete.
 
+  Jobs are tracked with a watch that resumes from the resource version of an
+  initial list, so completions are seen as soon as they happen. If the watch
+  breaks the function falls back to polling every check_interval seconds.
+
   Args:
     job_v1: BatchV1Api object
     jobs_to_monitor: List of job names to monitor.
@@ -541,6 +1123,11 @@ def wait_till_jobs_complete(
     check_interval: Interval in seconds to check for the jobs.
     nemo_check_config: Optional dictionary containing NEMO-specific check
       configuration.
+    label_selector: Optional label selector matching the monitored jobs, used
+      to avoid listing every job in the namespace.
+    use_watch: Whether to watch for job updates instead of polling.
+    on_job_finished: Optional function called with the name of each job as
+      soon as it succeeds or fails, e.g. to start follow-up work early.
 
   Returns:
     list[str]: Any non-completed jobs.
@@ -549,38 +1136,31 @@ def wait_till_jobs_complete(
   jobs_started_successfully = set()
   start_time = time.time()
   nemo_log_check_timeout = 600  # 10 minutes
+  resource_version = None
 
-  # Poll list jobs API until all jobs are completed or the timeout is reached.
   print(
-      f"Polling jobs for {timeout_seconds} seconds and checking every"
-      f" {check_interval} seconds"
+      f"Waiting on jobs for {timeout_seconds} seconds and checking every"
+      f" {check_interval} seconds (watch={use_watch},"
+      f" selector={label_selector})"
   )
   while remaining_jobs:
-    job_list = []
-    try:
-      job_list = job_v1.list_namespaced_job(namespace)
-    except exceptions.ConnectTimeoutError as e:
-      print(f"Connect Timeout Error when attempting to list jobs: {e}")
-    except exceptions.MaxRetryError as e:
-      print(f"Max retry error when attempting to list jobs: {e}")
-    except client.ApiException as e:
-      print(f"Unknown error when attempting to list jobs: {e}")
-
-    if job_list:
-      for job in job_list.items:
-        if job.metadata.name in remaining_jobs:
-          if (
-              job.status.succeeded is not None
-              and job.status.succeeded == job.spec.completions
-          ):
-            remaining_jobs.remove(job.metadata.name)
-            print(f"Job {job.metadata.name} completed successfully.")
-          elif job.status.failed is not None and job.status.failed >= 1:
-            remaining_jobs.remove(job.metadata.name)
-            print(f"Job {job.metadata.name} failed.")
+    # A fresh list is needed to start (or restart) the watch and when polling.
+    if resource_version is None:
+      job_list = _list_jobs(job_v1, namespace, label_selector)
+      if job_list and label_selector:
+        # Charts that don't set the run label can't be found by selector.
+        listed_jobs = {job.metadata.name for job in job_list.items}
+        if not remaining_jobs <= listed_jobs:
+          print(f"Not all jobs match {label_selector}, watching all jobs")
+          label_selector = None
+          continue
+      if job_list:
+        for job in job_list.items:
+          _job_finished(job, remaining_jobs, on_job_finished)
+        if use_watch:
+          resource_version = job_list.metadata.resource_version
 
     if not remaining_jobs:
-      print("All jobs completed.")
       break
 
     elapsed_time = time.time() - start_time
@@ -605,9 +1185,38 @@ def wait_till_jobs_complete(
       )
       remaining_jobs -= jobs_to_fail_early
     print("Remaining jobs: ", remaining_jobs)
-    print(f"Sleeping for {check_interval} seconds")
-    time.sleep(check_interval)
 
+    if resource_version is None:
+      print(f"Sleeping for {check_interval} seconds")
+      time.sleep(check_interval)
+      continue
+
+    wait_seconds = max(
+        1, min(check_interval, int(timeout_seconds - elapsed_time))
+    )
+    try:
+      resource_version = _watch_jobs(
+          job_v1,
+          namespace,
+          label_selector,
+          resource_version,
+          remaining_jobs,
+          wait_seconds,
+          on_job_finished,
+      )
+    except client.ApiException as e:
+      # 410 Gone means the resource version expired; re-list and re-watch.
+      if e.status != 410:
+        print(f"Watch on jobs failed, falling back to polling: {e}")
+        use_watch = False
+      resource_version = None
+    except (exceptions.HTTPError, ValueError) as e:
+      print(f"Watch on jobs failed, falling back to polling: {e}")
+      use_watch = False
+      resource_version = None
+
+  if not remaining_jobs:
+    print("All jobs completed.")
   return list(remaining_jobs)
 
 
@@ -642,6 +1251,7 @@ def create_job_k8s_helm(
     helm_config: HelmConfig,
     env_mappings: dict[str, str] | None = None,
     helm_bin_path: str = HELM,
+    run_id: str | None = None,
 ) -> list[Callable[[], subprocess.CompletedProcess[str]]]:
   """Creates a k8s helm release and returns a function to uninstall it.
 
@@ -649,19 +1259,13 @@ def create_job_k8s_helm(
     helm_config: Helm configuration for the release.
     env_mappings: Environment variables to pass to the helm chart.
     helm_bin_path: Path to the helm binary.
+    run_id: Optional run identifier, set as the K_RUN_ID_LABEL label on the
+      created jobs.
 
   Returns:
     List of functions to uninstall the helm release.
   """
-  if not env_mappings:
-    env_mappings = {}
-
-  # Convert the mappings to helm format
-  values = {}
-  if env_mappings:
-    for k, v in env_mappings.items():
-      # Assuming the env_mappings are all for the health_check job
-      values[f"health_check.env.{k}"] = v
+  values = _helm_job_values(env_mappings, run_id)
 
   # If release name is not specified, use the base name after making it unique
   release_name = helm_config.release_name
@@ -682,6 +1286,131 @@ def create_job_k8s_helm(
   return uninstall_functions
 
 
+def _helm_job_values(
+    env_mappings: dict[str, str] | None, run_id: str | None
+) -> dict[str, str]:
+  """Converts job environment variables and run ID to helm values."""
+  values = {}
+  if env_mappings:
+    for k, v in env_mappings.items():
+      # Assuming the env_mappings are all for the health_check job
+      values[f"health_check.env.{k}"] = v
+  if run_id:
+    values["job.run_id"] = run_id
+  return values
+
+
+def render_job_k8s_helm(
+    helm_config: HelmConfig,
+    env_mappings: dict[str, str] | None = None,
+    helm_bin_path: str = HELM,
+    run_id: str | None = None,
+    extra_values: dict[str, str] | None = None,
+) -> str:
+  """Renders a helm chart locally with `helm template`.
+
+  Args:
+    helm_config: Helm configuration for the chart to render.
+    env_mappings: Environment variables to pass to the helm chart.
+    helm_bin_path: Path to the helm binary.
+    run_id: Optional run identifier, set as the K_RUN_ID_LABEL label on the
+      rendered jobs.
+    extra_values: Additional helm values to set, e.g. {"job.guid": "abc"}.
+
+  Returns:
+    The rendered manifests as a multi-document YAML string.
+  """
+  values = _helm_job_values(env_mappings, run_id)
+  if extra_values:
+    values.update(extra_values)
+  helm_template_command = generate_helm_command(
+      helm_path=helm_bin_path,
+      release_name=helm_config.release_name or helm_config.release_name_base,
+      chart=helm_config.chart,
+      values=values,
+      chart_version=helm_config.chart_version,
+      helm_install_flags=helm_config.install_flags,
+      helm_command_type=HelmCommand.TEMPLATE,
+  )
+  return run_command_with_retry(
+      helm_template_command, print_output=False
+  ).stdout
+
+
+def create_k8s_objects_from_manifest(
+    manifest: str,
+    run_id: str,
+    namespace: str = "default",
+) -> list[str]:
+  """Creates the objects of a rendered manifest with the Kubernetes API.
+
+  Every object is labeled with K_RUN_ID_LABEL=run_id so that all objects of a
+  run can be removed with delete_k8s_objects_by_run_id.
+
+  Args:
+    manifest: Multi-document YAML with the objects to create.
+    run_id: Run identifier to label the objects with.
+    namespace: Namespace for namespaced objects that don't specify one.
+
+  Returns:
+    The names of the created jobs.
+  """
+  api_client = get_core_v1_api().api_client
+  job_names = []
+  for k8s_object in yaml.safe_load_all(manifest):
+    if not k8s_object:
+      continue
+    metadata = k8s_object.setdefault("metadata", {})
+    labels = metadata.get("labels") or {}
+    labels[K_RUN_ID_LABEL] = run_id
+    metadata["labels"] = labels
+    utils.create_from_dict(api_client, k8s_object, namespace=namespace)
+    if k8s_object.get("kind") == "Job":
+      job_names.append(metadata["name"])
+  return job_names
+
+
+def delete_k8s_objects_by_run_id(
+    run_id: str,
+    namespace: str = "default",
+) -> None:
+  """Deletes the objects created for a run with one call per object type.
+
+  Args:
+    run_id: Run identifier the objects were labeled with.
+    namespace: Namespace of the namespaced objects.
+  """
+  v1 = get_core_v1_api()
+  batch_v1 = client.BatchV1Api(v1.api_client)
+  rbac_v1 = client.RbacAuthorizationV1Api(v1.api_client)
+  label_selector = f"{K_RUN_ID_LABEL}={run_id}"
+  print(f"Deleting objects with label {label_selector}")
+  delete_calls = [
+      lambda: batch_v1.delete_collection_namespaced_job(
+          namespace,
+          label_selector=label_selector,
+          propagation_policy="Background",
+      ),
+      lambda: v1.delete_collection_namespaced_service(
+          namespace, label_selector=label_selector
+      ),
+      lambda: v1.delete_collection_namespaced_service_account(
+          namespace, label_selector=label_selector
+      ),
+      lambda: rbac_v1.delete_collection_cluster_role_binding(
+          label_selector=label_selector
+      ),
+      lambda: rbac_v1.delete_collection_cluster_role(
+          label_selector=label_selector
+      ),
+  ]
+  for delete_call in delete_calls:
+    try:
+      delete_call()
+    except client.ApiException as e:
+      print(f"Error deleting objects with label {label_selector}: {e}")
+
+
 def create_job_k8s(
     job_name: str,
     yaml_file: str,
@@ -758,7 +1487,10 @@ def generate_helm_command(
   if helm_command_type == HelmCommand.UNINSTALL:
     command = f"{command} uninstall {release_name}"
   else:  # Default to `helm install` if not specified
-    command = f"{command} install {release_name} {chart}"
+    verb = "install"
+    if helm_command_type == HelmCommand.TEMPLATE:
+      verb = "template"
+    command = f"{command} {verb} {release_name} {chart}"
     # Will default to latest version if not set
     # 
     if chart_version:
@@ -1517,9 +2249,7 @@ def get_node_list(
     filter_label_value: str | None = None,
 ) -> list[str]:
   """Returns a list of the nodes names in the cluster."""
-  config.load_incluster_config()
-  v1 = client.CoreV1Api()
-  kube_nodes = v1.list_node().items
+  kube_nodes = get_node_informer().list_nodes()
   gpu_nodes = _get_nodes_under_test(
       kube_nodes, filter_label_name, filter_label_value
   )
@@ -1610,9 +2340,9 @@ def _get_pod_metadata(
       )
       continue
 
-    node = v1.read_node(
-        name=node_name,
-    )
+    node = get_node_informer().get(node_name)
+    if node is None:
+      node = v1.read_node(name=node_name)
     node_instance_id = node.metadata.annotations.get(
         "container.googleapis.com/instance_id", ""
     )
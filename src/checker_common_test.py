@@ -0,0 +1,152 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for checker_common."""
+
+from unittest import mock
+
+from absl.testing import absltest
+from kubernetes import client
+
+import checker_common
+
+
+def _job(
+    name: str,
+    succeeded: int | None = None,
+    failed: int | None = None,
+    completions: int = 1,
+) -> client.V1Job:
+  return client.V1Job(
+      metadata=client.V1ObjectMeta(name=name),
+      spec=client.V1JobSpec(
+          completions=completions, template=client.V1PodTemplateSpec()
+      ),
+      status=client.V1JobStatus(succeeded=succeeded, failed=failed),
+  )
+
+
+class JobFinishedTest(absltest.TestCase):
+
+  def test_removes_succeeded_job(self):
+    remaining_jobs = {"job-a", "job-b"}
+
+    checker_common._job_finished(_job("job-a", succeeded=1), remaining_jobs)
+
+    self.assertEqual(remaining_jobs, {"job-b"})
+
+  def test_removes_failed_job(self):
+    remaining_jobs = {"job-a"}
+
+    checker_common._job_finished(_job("job-a", failed=1), remaining_jobs)
+
+    self.assertEmpty(remaining_jobs)
+
+  def test_keeps_job_until_all_completions_succeed(self):
+    remaining_jobs = {"job-a"}
+
+    checker_common._job_finished(
+        _job("job-a", succeeded=1, completions=2), remaining_jobs
+    )
+
+    self.assertEqual(remaining_jobs, {"job-a"})
+
+  def test_ignores_jobs_not_monitored(self):
+    remaining_jobs = {"job-a"}
+
+    checker_common._job_finished(_job("other-job", succeeded=1), remaining_jobs)
+
+    self.assertEqual(remaining_jobs, {"job-a"})
+
+  def test_reports_finished_job(self):
+    remaining_jobs = {"job-a", "job-b"}
+    finished = []
+
+    checker_common._job_finished(
+        _job("job-a", failed=1), remaining_jobs, finished.append
+    )
+    checker_common._job_finished(
+        _job("job-b", succeeded=0), remaining_jobs, finished.append
+    )
+
+    self.assertEqual(finished, ["job-a"])
+
+  def test_ignores_jobs_without_status(self):
+    job = _job("job-a")
+    job.status = None
+    remaining_jobs = {"job-a"}
+
+    checker_common._job_finished(job, remaining_jobs)
+
+    self.assertEqual(remaining_jobs, {"job-a"})
+
+
+class RateLimiterTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.now = 100.0
+    self.sleeps = []
+    self.enter_context(
+        mock.patch.object(
+            checker_common.time, "monotonic", side_effect=lambda: self.now
+        )
+    )
+    self.enter_context(
+        mock.patch.object(
+            checker_common.time, "sleep", side_effect=self.sleeps.append
+        )
+    )
+
+  def test_burst_starts_without_waiting(self):
+    limiter = checker_common.RateLimiter(qps=10, burst=3)
+
+    for _ in range(3):
+      limiter.acquire()
+
+    self.assertEmpty(self.sleeps)
+
+  def test_waits_for_a_token_once_burst_is_used(self):
+    limiter = checker_common.RateLimiter(qps=10, burst=2)
+
+    for _ in range(4):
+      limiter.acquire()
+
+    self.assertLen(self.sleeps, 2)
+    self.assertAlmostEqual(self.sleeps[0], 0.1)
+    self.assertAlmostEqual(self.sleeps[1], 0.2)
+
+  def test_tokens_refill_over_time(self):
+    limiter = checker_common.RateLimiter(qps=10, burst=1)
+
+    limiter.acquire()
+    self.now += 0.05
+    limiter.acquire()
+    self.now += 1.0
+    limiter.acquire()
+
+    self.assertLen(self.sleeps, 1)
+    self.assertAlmostEqual(self.sleeps[0], 0.05)
+
+  def test_zero_qps_is_unlimited(self):
+    limiter = checker_common.RateLimiter(qps=0)
+
+    for _ in range(100):
+      limiter.acquire()
+
+    self.assertEmpty(self.sleeps)
+
+
+if __name__ == "__main__":
+  absltest.main()
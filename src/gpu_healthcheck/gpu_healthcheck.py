@@ -63,11 +63,7 @@ NVIDIA_SMI_COMMAND = (
     " --format=csv,noheader,nounits"
 )
 K_ENABLE_PERSISTENCE_MODE = "/usr/local/nvidia/bin/nvidia-smi -pm 1"
-K_ADD_LABEL_FORMAT = "/app/kubectl label node %s %s=%s --overwrite"
-K_REMOVE_LABEL_FORMAT = "/app/kubectl label node %s %s-"
-K_TAINT_NODE_FORMAT = "/app/kubectl taint node %s %s=%s:%s"
 NVIDIA_BUG_REPORT_SCRIPT = "/usr/local/nvidia/bin/nvidia-bug-report.sh"
-K_UNTAINT_NODE_FORMAT = "/app/kubectl taint node %s %s-"
 
 # https://docs.nvidia.com/datacenter/dcgm/latest/user-guide/dcgm-diagnostics.html
 K_DCGM_ERROR_ISOLATE = 2
@@ -80,15 +76,14 @@ def main() -> None:
 
   print("diagnostic on vm '%s' is 'initiated'" % node_name)
 
-  reboot_required = run_reboot_required_check(node_name)
+  mutator = checker_common.NodeMutator()
+  reboot_required = run_reboot_required_check(mutator, node_name)
+  # Apply the reboot label/taint before the (long) diagnostic starts.
+  mutator.flush()
   enable_persistence_mode(node_name)
-  run_dcgm_diag(node_name, reboot_required)
-  checker_common.add_label(
-      node_name,
-      HEALTHCHECK_TIME_LABEL_KEY,
-      f"{int(time.time())}",
-      K_ADD_LABEL_FORMAT,
-  )
+  run_dcgm_diag(mutator, node_name, reboot_required)
+  mutator.set_label(node_name, HEALTHCHECK_TIME_LABEL_KEY, int(time.time()))
+  mutator.flush()
 
 
 def enable_persistence_mode(node_name: str) -> None:
@@ -142,7 +137,9 @@ def convert_output_to_proto(output: str) -> dcgm_pb2.DiagnosticReport:
   return report
 
 
-def run_reboot_required_check(node_name: str) -> bool:
+def run_reboot_required_check(
+    mutator: checker_common.NodeMutator, node_name: str
+) -> bool:
   """run reboot required check."""
   smi_output = checker_common.run_command(NVIDIA_SMI_COMMAND)
 
@@ -170,14 +167,12 @@ def run_reboot_required_check(node_name: str) -> bool:
         "adding reboot required label for node %s due to %s errors"
         % (node_name, total_errors),
     )
-    checker_common.add_label(
-        node_name, REBOOT_REQUIRED_LABEL_KEY, "true", K_ADD_LABEL_FORMAT
-    )
-    taint_node(node_name, TAINT_KEY, TAINT_VALUE, TAINT_EFFECT)
+    mutator.set_label(node_name, REBOOT_REQUIRED_LABEL_KEY, "true")
+    taint_node(mutator, node_name, TAINT_KEY, TAINT_VALUE, TAINT_EFFECT)
     return True
   else:
     print("reboot is not required for node %s" % node_name)
-    remove_label(node_name, REBOOT_REQUIRED_LABEL_KEY)
+    mutator.remove_label(node_name, REBOOT_REQUIRED_LABEL_KEY)
     return False
 
 
@@ -289,7 +284,11 @@ def generate_nvidia_bug_report(node_name: str) -> None:
     print("No GCS_BUCKET_NAME environment variable found.")
 
 
-def run_dcgm_diag(node_name: str, reboot_required: bool) -> None:
+def run_dcgm_diag(
+    mutator: checker_common.NodeMutator,
+    node_name: str,
+    reboot_required: bool,
+) -> None:
   """run dcgm diag."""
   command = generate_dcgm_command()
   diag_output = checker_common.run_command(command)
@@ -308,15 +307,12 @@ def run_dcgm_diag(node_name: str, reboot_required: bool) -> None:
       node_name=node_name,
       workflow_id=os.environ.get("WORKFLOW_ID"),  # Remove workflow id
   )
-  checker_common.add_label(
-      node_name,
-      _RESULT_LABEL_KEY,
-      "fail" if failed else "pass",
-      K_ADD_LABEL_FORMAT,
-  )
+  mutator.set_label(node_name, _RESULT_LABEL_KEY, "fail" if failed else "pass")
   if failed:
     print(f"Node {node_name} failed dcgm test")
-    taint_node(node_name, TAINT_KEY, TAINT_VALUE, TAINT_EFFECT)
+    taint_node(mutator, node_name, TAINT_KEY, TAINT_VALUE, TAINT_EFFECT)
+    # Taint the node before spending time on the bug report.
+    mutator.flush()
     try:
       mft_installer.install_mft_if_needed(node_name)
     except (
@@ -330,25 +326,18 @@ def run_dcgm_diag(node_name: str, reboot_required: bool) -> None:
   else:
     print(f"Node {node_name} passed dcgm test")
     if not reboot_required:
-      un_taint_node(node_name, TAINT_KEY)
-
+      mutator.remove_taint(node_name, TAINT_KEY)
 
-def remove_label(node_name: str, label: str) -> None:
-  print("removing label %s from node %s" % (label, node_name))
-  checker_common.run_command(K_REMOVE_LABEL_FORMAT % (node_name, label))
 
-
-def taint_node(node_name: str, key: str, value: str, effect: str) -> None:
-  print("adding taint %s=%s to node %s" % (key, value, node_name))
+def taint_node(
+    mutator: checker_common.NodeMutator,
+    node_name: str,
+    key: str,
+    value: str,
+    effect: str,
+) -> None:
   if os.environ.get("DRY_RUN") != "true":
-    checker_common.run_command(
-        K_TAINT_NODE_FORMAT % (node_name, key, value, effect)
-    )
-
-
-def un_taint_node(node_name: str, key: str) -> None:
-  print("removing taint %s from node %s" % (key, node_name))
-  checker_common.run_command(K_UNTAINT_NODE_FORMAT % (node_name, key))
+    mutator.add_taint(node_name, key, value, effect)
 
 
 def is_bad_node_from_proto(report: dcgm_pb2.DiagnosticReport) -> bool:
@@ -306,6 +306,10 @@ def run_health_check(sleep_time: int) -> None:
       helm_key = f"health_check.env.{key[len(_HC_ENV_PREFIX):]}"
       helm_values[helm_key] = f'"{value}"'
 
+  # Label the jobs of this run so they can be watched with a selector
+  run_id = str(uuid.uuid4())[:8]
+  helm_values["job.run_id"] = run_id
+
   # RUN HC
   release_names = []
   pool = None
@@ -345,7 +349,10 @@ def run_health_check(sleep_time: int) -> None:
       time.time() - start_time,
   )
   # Helm releases & associated jobs are logged for reference outside of HR
-  release_jobs = checker_common.get_created_jobs(release_names)
+  run_label_selector = f"{checker_common.K_RUN_ID_LABEL}={run_id}"
+  release_jobs = checker_common.get_created_jobs(
+      release_names, run_label_selector
+  )
   jobs_and_releases: list[tuple[str, str]] = list(
       zip(release_jobs, release_names)
   )
@@ -359,6 +366,7 @@ def run_health_check(sleep_time: int) -> None:
       jobs_to_monitor=release_jobs,
       timeout_seconds=(sleep_time * 60),
       check_interval=10,
+      label_selector=run_label_selector,
   )
 
   post_run_cleanup()
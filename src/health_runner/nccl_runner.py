@@ -15,14 +15,19 @@
 """Runs NCCL health check."""
 
 import collections
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
+from concurrent import futures
 import copy
+import dataclasses
+import functools
 import itertools
 import logging
+import math
 import os
 import random
 import signal
 import sys
+import threading
 from typing import Any
 import uuid
 
@@ -42,6 +47,23 @@ def timeout_handler(signum: Any, frame: Any) -> None:
 
 signal.signal(signal.SIGALRM, timeout_handler)
 
+
+def _extend_timeout(extra_minutes: int) -> None:
+  """Adds time to the health check timeout, if one is set.
+
+  The timeout covers a first and a second pass of one round each. Modes that
+  launch more rounds add SLEEP_TIME_MINUTES for each extra round, so the
+  alarm doesn't fire while they're still running.
+
+  Args:
+    extra_minutes: The minutes to add.
+  """
+  remaining_seconds = signal.alarm(0)
+  if remaining_seconds:
+    signal.alarm(remaining_seconds + extra_minutes * 60)
+    print(f"Extended timeout by {extra_minutes} minutes")
+
+
 # Time to wait for jobs to complete (timeout for 1st & 2nd pass separately)
 _SLEEP_TIME_MINUTES = os.environ.get("SLEEP_TIME_MINUTES", "10")
 # Time to wait for full HR to complete
@@ -51,14 +73,34 @@ _TIMEOUT_MINUTES: str = os.environ.get(
     f"{int(_SLEEP_TIME_MINUTES)*2 + 5}",
 )
 _CHECK_INTERVAL_SECONDS = os.environ.get("CHECK_INTERVAL_SECONDS", "20")
+# Number of node pairs launched concurrently and the launch rate limit
+_LAUNCH_CONCURRENCY = os.environ.get("LAUNCH_CONCURRENCY", "16")
+_LAUNCH_QPS = os.environ.get("LAUNCH_QPS", "10")
+# "helm" installs a release per pair; "render" renders the chart or YAML once
+# and creates each pair's objects directly with the Kubernetes API
+_LAUNCH_MODE = os.environ.get("LAUNCH_MODE", "helm").lower()
+# Stand-ins for the per-pair values in a manifest rendered once for all pairs
+_NODE0_PLACEHOLDER = "chs-node0-placeholder"
+_NODE1_PLACEHOLDER = "chs-node1-placeholder"
+_GUID_PLACEHOLDER = "chsguidplaceholder"
 
 NCCL_PRE_RESULT_KEY = "aiinfra/nccl-healthcheck-pre-result"
 NCCL_RESULT_KEY = "aiinfra/nccl-healthcheck-result"
+NCCL_BANDWIDTH_KEY = "aiinfra/nccl-healthcheck-bandwidth"
 
 # If set, only the nodes that have this label set to true will be used.
 _FILTER_LABEL_NAME = os.environ.get("FILTER_LABEL_NAME", "")
 _FILTER_LABEL_VALUE = os.environ.get("FILTER_LABEL_VALUE", "true")
 
+# Number of nodes per group in the first round of the group pairing mode
+_GROUP_SIZE = os.environ.get("GROUP_SIZE", "8")
+# Number of random pairing rounds and the share of a node's tests that must
+# fail (not explained by a faulty partner) for it to be considered faulty.
+_MULTI_ROUND_COUNT = os.environ.get("MULTI_ROUND_COUNT", "3")
+_FAULT_SCORE_THRESHOLD = os.environ.get("FAULT_SCORE_THRESHOLD", "0.5")
+# Number of reshuffles tried to find a pairing with no repeated partners.
+_PAIRING_ATTEMPTS = 10
+
 
 def run_nccl_healthcheck(
     orchestrator_config: checker_common.HelmConfig | str,
@@ -73,7 +115,9 @@ def run_nccl_healthcheck(
     case = os.environ.get("PAIRING_MODE", "random").lower()
     second_pass_enabled = is_second_pass_enabled()
     node_data: list[dict[str, str]] = checker_common.get_nodes_data(
-        v1.list_node().items, _FILTER_LABEL_NAME, _FILTER_LABEL_VALUE
+        checker_common.get_node_informer(v1).list_nodes(),
+        _FILTER_LABEL_NAME,
+        _FILTER_LABEL_VALUE,
     )
     capacity = checker_common.get_capacity_topology(node_data)
     logging.info("Running %s w/ pairing mode `%s`", "NCCL", case)
@@ -98,6 +142,24 @@ def run_nccl_healthcheck(
       result = run_nccl_random_pair_healthcheck(
           v1, capacity, orchestrator_config, second_pass_enabled
       )
+    elif case == "group":
+      logging.info("Running %s w/ pairing mode `%s`", "NCCL", case)
+      # Only the Helm chart pins a job to all nodes of a group (NODES_CSV); a
+      # YAML orchestrator would run groups on arbitrary nodes
+      if isinstance(orchestrator_config, checker_common.HelmConfig):
+        result = run_group_healthcheck(
+            v1, capacity, orchestrator_config, second_pass_enabled
+        )
+      else:
+        logging.error(
+            "Pairing mode `group` needs a Helm orchestrator, running `random`"
+        )
+        result = run_nccl_random_pair_healthcheck(
+            v1, capacity, orchestrator_config, second_pass_enabled
+        )
+    elif case == "multi_round":
+      logging.info("Running %s w/ pairing mode `%s`", "NCCL", case)
+      result = run_multi_round_healthcheck(v1, capacity, orchestrator_config)
     else:
       logging.info("Unknown health check case: %s", case)
       result = run_nccl_random_pair_healthcheck(
@@ -113,6 +175,280 @@ def run_nccl_healthcheck(
   return result
 
 
+def _launch_node_pair(
+    node0: str,
+    node1: str,
+    orchestrator_config: checker_common.HelmConfig | str,
+    env_mappings: dict[str, str],
+    job_name_distinctor: str,
+    run_id: str,
+) -> tuple[list[str], list[str], list[Callable[[], Any]]]:
+  """Launches the NCCL health check for one node pair.
+
+  Args:
+    node0: The first node of the pair.
+    node1: The second node of the pair.
+    orchestrator_config: A HelmConfig object or a path to a yaml file to use as
+      the orchestrator.
+    env_mappings: Environment variables to pass to the job.
+    job_name_distinctor: A string to distinguish the type of job.
+    run_id: Identifier of the current pass, set as a label on the jobs.
+
+  Returns:
+    The names of the created jobs, the names of the installed helm releases
+    (whose jobs are looked up later) and the functions that clean them up.
+  """
+  env_mappings_copy = copy.deepcopy(env_mappings)
+  short_guid = str(uuid.uuid4())[:8]
+  # Defined a default unique name for the non-HelmConfig orchestrator case
+  base_name = "chs-hc"
+  suffix_name = f"{job_name_distinctor}-{short_guid}"
+  unique_name = f"{base_name}-{suffix_name}"
+  env_mappings_copy["NODE0"] = node0
+  env_mappings_copy["NODE1"] = node1
+  env_mappings_copy["SHORT_GUID"] = short_guid
+
+  print(f"Running NCCL test between node {node0} and node {node1}...")
+  if isinstance(orchestrator_config, checker_common.HelmConfig):
+    new_orchestrator_config = copy.deepcopy(orchestrator_config)
+    # Use the config's release name base if defined to create release name
+    if new_orchestrator_config.release_name is None:
+      new_orchestrator_config.release_name = (
+          f"{new_orchestrator_config.release_name_base}-{suffix_name}"
+      )
+    cleanup_functions = checker_common.create_job_k8s_helm(
+        helm_config=new_orchestrator_config,
+        env_mappings=env_mappings_copy,
+        run_id=run_id,
+    )
+    return [], [new_orchestrator_config.release_name], cleanup_functions
+
+  cleanup_functions = checker_common.create_job_k8s(
+      job_name=unique_name,
+      yaml_file=orchestrator_config,
+      env_mappings=env_mappings_copy,
+  )
+  return [unique_name], [], cleanup_functions
+
+
+def _render_node_pair_manifest(
+    orchestrator_config: checker_common.HelmConfig | str,
+    env_mappings: dict[str, str],
+    job_name_distinctor: str,
+    run_id: str,
+) -> str:
+  """Renders the per-pair manifest once, with placeholders for the pair.
+
+  Args:
+    orchestrator_config: A HelmConfig object or a path to a yaml file to use as
+      the orchestrator.
+    env_mappings: Environment variables to pass to the job.
+    job_name_distinctor: A string to distinguish the type of job.
+    run_id: Identifier of the current pass, set as a label on the jobs.
+
+  Returns:
+    The rendered manifest, to be filled in by _create_node_pair_objects.
+  """
+  env_mappings_copy = copy.deepcopy(env_mappings)
+  env_mappings_copy["NODE0"] = _NODE0_PLACEHOLDER
+  env_mappings_copy["NODE1"] = _NODE1_PLACEHOLDER
+  env_mappings_copy["SHORT_GUID"] = _GUID_PLACEHOLDER
+  if isinstance(orchestrator_config, checker_common.HelmConfig):
+    return checker_common.render_job_k8s_helm(
+        helm_config=orchestrator_config,
+        env_mappings=env_mappings_copy,
+        run_id=run_id,
+        extra_values={"job.guid": _GUID_PLACEHOLDER},
+    )
+  env_mappings_copy["JOB_NAME"] = (
+      f"chs-hc-{job_name_distinctor}-{_GUID_PLACEHOLDER}"
+  )
+  return checker_common.expand_template(orchestrator_config, env_mappings_copy)
+
+
+def _create_node_pair_objects(
+    manifest: str, node0: str, node1: str, run_id: str
+) -> list[str]:
+  """Fills a rendered manifest in for one node pair and creates its objects.
+
+  Args:
+    manifest: Manifest from _render_node_pair_manifest.
+    node0: The first node of the pair.
+    node1: The second node of the pair.
+    run_id: Identifier of the current pass, set as a label on the objects.
+
+  Returns:
+    The names of the created jobs.
+  """
+  print(f"Running NCCL test between node {node0} and node {node1}...")
+  pair_manifest = (
+      manifest.replace(_NODE0_PLACEHOLDER, node0)
+      .replace(_NODE1_PLACEHOLDER, node1)
+      .replace(_GUID_PLACEHOLDER, str(uuid.uuid4())[:8])
+  )
+  return checker_common.create_k8s_objects_from_manifest(pair_manifest, run_id)
+
+
+class _NodePairLauncher:
+  """Launches the NCCL tests of one pass and tracks the resulting jobs.
+
+  Pairs (or larger node groups) can be submitted until collect() is called.
+  They are launched by a pool of _LAUNCH_CONCURRENCY workers, limited to
+  _LAUNCH_QPS launches per second. A pair that fails to launch is reported, its
+  nodes are labeled as crashed so their results read as "crash", and it's
+  listed in failed_pairs. With LAUNCH_MODE=render the manifest is rendered once
+  and all objects of the pass are labeled with the run ID and deleted
+  together; groups larger than a pair are always launched one by one.
+  """
+
+  def __init__(
+      self,
+      orchestrator_config: checker_common.HelmConfig | str,
+      env_mappings: dict[str, str],
+      job_name_distinctor: str,
+  ):
+    self._orchestrator_config = orchestrator_config
+    self._env_mappings = env_mappings
+    self._job_name_distinctor = job_name_distinctor
+    # Label the jobs of this pass so they can be watched with a selector
+    self.run_id = str(uuid.uuid4())[:8]
+    self.label_selector = None
+    if (
+        isinstance(orchestrator_config, checker_common.HelmConfig)
+        or _LAUNCH_MODE == "render"
+    ):
+      self.label_selector = f"{checker_common.K_RUN_ID_LABEL}={self.run_id}"
+    self.jobs: list[str] = []
+    self.job_to_pair: dict[str, tuple[str, ...]] = {}
+    self.tested_nodes: list[str] = []
+    self.failed_pairs: list[tuple[str, ...]] = []
+    self.cleanup_functions: list[Callable[[], Any]] = []
+    self._manifest = None
+    self._lock = threading.Lock()
+    self._launches: list[tuple[tuple[str, ...], futures.Future[Any]]] = []
+    self._limiter = checker_common.RateLimiter(
+        qps=float(_LAUNCH_QPS), burst=int(_LAUNCH_CONCURRENCY)
+    )
+    self._executor = futures.ThreadPoolExecutor(
+        max_workers=int(_LAUNCH_CONCURRENCY)
+    )
+
+  def submit(self, node_pair: tuple[str, ...]) -> None:
+    """Queues the NCCL test for a node pair (or larger group) to be launched."""
+    with self._lock:
+      if (
+          _LAUNCH_MODE == "render"
+          and len(node_pair) == 2
+          and self._manifest is None
+      ):
+        self._manifest = _render_node_pair_manifest(
+            self._orchestrator_config,
+            self._env_mappings,
+            self._job_name_distinctor,
+            self.run_id,
+        )
+        self.cleanup_functions.append(
+            functools.partial(
+                checker_common.delete_k8s_objects_by_run_id, self.run_id
+            )
+        )
+      future = self._executor.submit(self._launch, node_pair)
+      self._launches.append((node_pair, future))
+
+  def _launch(
+      self, node_pair: tuple[str, ...]
+  ) -> tuple[list[str], list[str], list[Callable[[], Any]]]:
+    self._limiter.acquire()
+    node0, node1 = node_pair[:2]
+    if self._manifest is not None and len(node_pair) == 2:
+      pair_jobs = _create_node_pair_objects(
+          self._manifest, node0, node1, self.run_id
+      )
+      return pair_jobs, [], []
+    env_mappings = self._env_mappings
+    if len(node_pair) > 2:
+      # Groups list all their nodes for the job's node affinity
+      print(f"Running NCCL test between nodes {node_pair}...")
+      nodes_csv = ",".join(node_pair)
+      if isinstance(self._orchestrator_config, checker_common.HelmConfig):
+        nodes_csv = '"' + "\\,".join(node_pair) + '"'
+      env_mappings = dict(
+          env_mappings, NHOSTS=str(len(node_pair)), NODES_CSV=nodes_csv
+      )
+    return _launch_node_pair(
+        node0,
+        node1,
+        self._orchestrator_config,
+        env_mappings,
+        self._job_name_distinctor,
+        self.run_id,
+    )
+
+  def collect(self) -> None:
+    """Waits for all submitted launches and looks up their jobs."""
+    self._executor.shutdown(wait=True)
+    launch_errors: dict[tuple[str, ...], Exception] = {}
+    release_to_pair = {}
+    # Results are collected in pair order to keep tested_nodes ordered
+    for node_pair, future in self._launches:
+      self.tested_nodes.extend(node_pair)
+      try:
+        pair_jobs, pair_releases, pair_cleanup_functions = future.result()
+      except Exception as error:  # pylint: disable=broad-exception-caught
+        launch_errors[node_pair] = error
+        continue
+      for job in pair_jobs:
+        self.job_to_pair[job] = node_pair
+      for release_name in pair_releases:
+        release_to_pair[release_name] = node_pair
+      self.jobs.extend(pair_jobs)
+      self.cleanup_functions.extend(pair_cleanup_functions)
+
+    print(f"Launched {len(self._launches) - len(launch_errors)} node pairs")
+    # Nodes of pairs that failed to launch are reported as crashed, instead of
+    # keeping the result labels of an earlier test
+    mutator = checker_common.NodeMutator()
+    for node_pair, error in launch_errors.items():
+      logging.error(
+          "Failed to launch NCCL test between %s (reason: %r).",
+          " and ".join(node_pair),
+          error,
+      )
+      for node in node_pair:
+        mutator.set_label(node, NCCL_PRE_RESULT_KEY, "crash")
+    mutator.flush()
+    self.failed_pairs.extend(launch_errors)
+    # Look up the jobs of all helm releases of this pass in one call
+    if release_to_pair:
+      release_to_jobs = checker_common.get_created_jobs_by_release(
+          release_to_pair, self.label_selector
+      )
+      for release_name, release_jobs in release_to_jobs.items():
+        for job in release_jobs:
+          self.job_to_pair[job] = release_to_pair[release_name]
+        self.jobs.extend(release_jobs)
+
+  def wait(self, on_job_finished: Callable[[str], None] | None = None) -> None:
+    """Waits for the jobs of this pass to complete."""
+    print(f"Waiting for {len(self.jobs)} jobs to complete...")
+    checker_common.wait_till_jobs_complete(
+        batch_v1_api.BatchV1Api(),
+        self.jobs,
+        timeout_seconds=(int(_SLEEP_TIME_MINUTES) * 60),
+        check_interval=int(_CHECK_INTERVAL_SECONDS),
+        label_selector=self.label_selector,
+        on_job_finished=on_job_finished,
+    )
+
+  def cleanup(self) -> None:
+    """Uninstalls releases and deletes the k8s objects of this pass."""
+    for func in self.cleanup_functions:
+      try:
+        func()
+      except Exception as error:  # pylint: disable=broad-exception-caught
+        logging.exception("Cleanup failed (reason: %r).", error)
+
+
 def health_check_with_node_pairs(
     node_pairs: list[tuple[str, str]],
     orchestrator_config: checker_common.HelmConfig | str,
@@ -121,6 +457,9 @@ def health_check_with_node_pairs(
 ) -> list[str]:
   """Runs NCCL health check with a list of node pairs.
 
+  Pairs are scheduled into rounds in which no node is in more than one job, so
+  jobs never compete for the same node's GPUs. Rounds run back to back.
+
   Args:
     node_pairs: A list of node pairs to run the health check on.
     orchestrator_config: A HelmConfig object or a path to a yaml file to use as
@@ -129,81 +468,228 @@ def health_check_with_node_pairs(
     job_name_distinctor: A string to distinguish the type of job.
 
   Returns:
-    A list of the nodes that were tested.
+    A list of the nodes that were tested, including those whose test failed to
+    launch.
   """
-  # Create a list of job names for to monitor the jobs.
-  jobs = []
-  tested_nodes = []
-  cleanup_functions = []
-
   if env_mappings is None:
     env_mappings = {}
+  if not isinstance(orchestrator_config, (checker_common.HelmConfig, str)):
+    logging.error("No k8s object or helm release specified.")
+    return []
 
-  # For the first pass, pair each node
-  for node0, node1 in node_pairs:
-    env_mappings_copy = copy.deepcopy(env_mappings)
-    short_guid = str(uuid.uuid4())[:8]
-    # Defined a default unique name for the non-HelmConfig orchestrator case
-    base_name = "chs-hc"
-    suffix_name = f"{job_name_distinctor}-{short_guid}"
-    unique_name = f"{base_name}-{suffix_name}"
-    env_mappings_copy["NODE0"] = node0
-    env_mappings_copy["NODE1"] = node1
-    env_mappings_copy["SHORT_GUID"] = short_guid
-
-    print(f"Running NCCL test between node {node0} and node {node1}...")
-    if isinstance(orchestrator_config, checker_common.HelmConfig):
-      new_orchestrator_config = copy.deepcopy(orchestrator_config)
-      # Use the config's release name base if defined to create release name
-      if new_orchestrator_config.release_name is None:
-        new_orchestrator_config.release_name = (
-            f"{new_orchestrator_config.release_name_base}-{suffix_name}"
-        )
-      cleanup_functions.extend(
-          checker_common.create_job_k8s_helm(
-              helm_config=new_orchestrator_config,
-              env_mappings=env_mappings_copy,
-          )
-      )
-      jobs.extend(
-          checker_common.get_created_jobs(
-              [new_orchestrator_config.release_name]
-          )
-      )
-    elif isinstance(orchestrator_config, str):
-      cleanup_functions.extend(
-          checker_common.create_job_k8s(
-              job_name=unique_name,
-              yaml_file=orchestrator_config,
-              env_mappings=env_mappings_copy,
-          )
+  tested_nodes = []
+  rounds = schedule_rounds(node_pairs)
+  if len(rounds) > 1:
+    _extend_timeout((len(rounds) - 1) * int(_SLEEP_TIME_MINUTES))
+  for round_number, round_pairs in enumerate(rounds, start=1):
+    round_env_mappings = env_mappings
+    if len(rounds) > 1:
+      print(
+          f"Round {round_number} of {len(rounds)}:"
+          f" {len(round_pairs)} node pairs"
       )
-      jobs.append(unique_name)
+    if round_number > 1:
+      # Nodes were just tested, so the health validity must not exclude them
+      round_env_mappings = {**env_mappings, "HEALTH_VALIDITY_HOURS": "0"}
+    launcher = _NodePairLauncher(
+        orchestrator_config, round_env_mappings, job_name_distinctor
+    )
+    for node_pair in round_pairs:
+      launcher.submit(node_pair)
+    launcher.collect()
+    launcher.wait()
+
+    # Cleanup after pods are done (uninstall releases, delete k8s objects)
+    if len(rounds) > 1:
+      print(f"All pods are done with round {round_number}")
+    launcher.cleanup()
+    tested_nodes.extend(launcher.tested_nodes)
+
+  print("All pods are done with first pass")
+  return tested_nodes
+
+
+def schedule_rounds(
+    node_pairs: list[tuple[str, ...]],
+) -> list[list[tuple[str, ...]]]:
+  """Schedules node pairs into rounds where each node is in at most one pair.
+
+  This is a greedy edge colouring of the graph of requested pairs: each pair
+  goes into the first round in which neither of its nodes is already busy.
+  The number of rounds is at most 2 * (max pairs per node) - 1.
+
+  Args:
+    node_pairs: The node pairs (or larger groups) to schedule.
+
+  Returns:
+    The pairs split into rounds, keeping their order within each round.
+  """
+  rounds: list[list[tuple[str, ...]]] = []
+  busy_nodes: list[set[str]] = []
+  for node_pair in node_pairs:
+    for round_pairs, busy in zip(rounds, busy_nodes):
+      if busy.isdisjoint(node_pair):
+        round_pairs.append(node_pair)
+        busy.update(node_pair)
+        break
     else:
-      logging.error("No k8s object or helm release specified.")
-      return []
-
-    tested_nodes.append(node0)
-    tested_nodes.append(node1)
-
-  print(f"Waiting for {len(jobs)} jobs to complete...")
-  job_api = batch_v1_api.BatchV1Api()
-  checker_common.wait_till_jobs_complete(
-      job_api,
-      jobs,
-      timeout_seconds=(int(_SLEEP_TIME_MINUTES) * 60),
-      check_interval=int(_CHECK_INTERVAL_SECONDS),
-  )
+      rounds.append([node_pair])
+      busy_nodes.append(set(node_pair))
+  return rounds
 
-  # Cleanup after pods are done (uninstall releases, delete k8s objects, etc.)
+
+@dataclasses.dataclass
+class PipelinedPassResults:
+  """Results of a first and second pass run by run_pipelined_passes.
+
+  Attributes:
+    first_pass: Result type to the nodes with that result in the first pass.
+    second_pass: Result type to the suspect nodes with that result in the
+      second pass. Only suspects that were re-tested are included.
+    second_pass_pairs: The (suspect node, passed node) pairs re-tested.
+  """
+
+  first_pass: dict[str, list[str]]
+  second_pass: dict[str, list[str]]
+  second_pass_pairs: list[tuple[str, str]]
+
+
+def run_pipelined_passes(
+    v1: kubernetes.client.CoreV1Api,
+    node_pairs: list[tuple[str, str]],
+    orchestrator_config: checker_common.HelmConfig | str,
+    job_name_distinctor: str,
+    select_partner: Callable[[str, list[str]], str | None],
+    second_pass_env_mappings: dict[str, str],
+) -> PipelinedPassResults:
+  """Runs the first pass and starts second-pass pairs as soon as possible.
+
+  As each first-pass job finishes, its nodes' results are read. Each suspect
+  node is paired right away with an idle node that already passed and its
+  second pass test is launched, without waiting for the rest of the first pass.
+  Suspects left without an idle partner are re-tested after the first pass,
+  in rounds scheduled by health_check_with_node_pairs.
+
+  Args:
+    v1: The Kubernetes API client.
+    node_pairs: The node pairs of the first pass.
+    orchestrator_config: A HelmConfig object or a path to a yaml file to use as
+      the orchestrator.
+    job_name_distinctor: A string to distinguish the type of job.
+    select_partner: Given a suspect node and the available passed nodes
+      (least used first, in random order otherwise), returns the passed node
+      to re-test it with, or None to wait for more nodes to pass.
+    second_pass_env_mappings: Environment variables for second pass jobs.
+
+  Returns:
+    The results of both passes.
+  """
+  first_pass = _NodePairLauncher(
+      orchestrator_config, {"SECOND_PASS": "false"}, job_name_distinctor
+  )
+  second_pass = _NodePairLauncher(
+      orchestrator_config,
+      second_pass_env_mappings,
+      f"{job_name_distinctor}-2nd-pass",
+  )
+  for node_pair in node_pairs:
+    first_pass.submit(node_pair)
+  first_pass.collect()
+
+  lock = threading.Lock()
+  first_pass_results: dict[str, str] = {}
+  # Passed node to the number of second pass pairs it's been used in
+  passed_node_usage: dict[str, int] = {}
+  waiting_suspects: list[str] = []
+  second_pass_pairs: list[tuple[str, str]] = []
+
+  def _pair_waiting_suspects(allow_reuse: bool) -> list[tuple[str, str]]:
+    new_pairs = []
+    still_waiting = []
+    for suspect_node in waiting_suspects:
+      # Passed nodes in random order, then least used first
+      candidates = list(passed_node_usage)
+      random.shuffle(candidates)
+      candidates.sort(key=passed_node_usage.get)
+      if not allow_reuse:
+        # A passed node is only used once so it's never in two jobs at once
+        candidates = [n for n in candidates if not passed_node_usage[n]]
+      good_node = select_partner(suspect_node, candidates)
+      if good_node is None:
+        still_waiting.append(suspect_node)
+        continue
+      passed_node_usage[good_node] += 1
+      new_pairs.append((suspect_node, good_node))
+      print(
+          f"Will run NCCL test between good node {good_node} and suspect node"
+          f" {suspect_node}"
+      )
+    waiting_suspects[:] = still_waiting
+    second_pass_pairs.extend(new_pairs)
+    return new_pairs
+
+  def _record_results(node_results: dict[str, list[str]]) -> None:
+    for result_type, nodes in node_results.items():
+      for node in nodes:
+        first_pass_results[node] = result_type
+        if result_type == "pass":
+          passed_node_usage.setdefault(node, 0)
+        else:
+          waiting_suspects.append(node)
+
+  def _on_job_finished(job_name: str) -> None:
+    node_pair = first_pass.job_to_pair.get(job_name)
+    if node_pair is None:
+      return
+    node_results = get_nccl_test_results(v1, list(node_pair))
+    with lock:
+      _record_results(node_results)
+      for second_pass_pair in _pair_waiting_suspects(allow_reuse=False):
+        second_pass.submit(second_pass_pair)
+
+  first_pass.wait(on_job_finished=_on_job_finished)
   print("All pods are done with first pass")
-  for func in cleanup_functions:
-    try:
-      func()
-    except Exception as error:  # pylint: disable=broad-exception-caught
-      logging.exception("Cleanup failed (reason: %r).", error)
+  first_pass.cleanup()
 
-  return tested_nodes
+  # Nodes whose jobs didn't finish in time are read once the pass is over
+  unfinished_nodes = [
+      node for node in first_pass.tested_nodes if node not in first_pass_results
+  ]
+  with lock:
+    if unfinished_nodes:
+      _record_results(get_nccl_test_results(v1, unfinished_nodes))
+    # Remaining suspects may share passed nodes, so they run in later rounds
+    remaining_pairs = _pair_waiting_suspects(allow_reuse=True)
+    for suspect_node in waiting_suspects:
+      print(f"No passed node to re-test suspect node {suspect_node} with")
+
+  second_pass.collect()
+  second_pass.wait()
+  print("All pods are done with second pass")
+  second_pass.cleanup()
+  if remaining_pairs:
+    # These run after the second pass round the timeout already covers
+    _extend_timeout(int(_SLEEP_TIME_MINUTES))
+    health_check_with_node_pairs(
+        node_pairs=remaining_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings=second_pass_env_mappings,
+        job_name_distinctor=f"{job_name_distinctor}-2nd-pass",
+    )
+
+  first_pass_by_type: dict[str, list[str]] = collections.defaultdict(list)
+  for node, result_type in first_pass_results.items():
+    first_pass_by_type[result_type].append(node)
+  second_pass_results = {}
+  if second_pass_pairs:
+    second_pass_results = get_nccl_test_results(
+        v1, [suspect_node for suspect_node, _ in second_pass_pairs]
+    )
+  return PipelinedPassResults(
+      first_pass=first_pass_by_type,
+      second_pass=second_pass_results,
+      second_pass_pairs=second_pass_pairs,
+  )
 
 
 def run_nccl_random_pair_healthcheck(
@@ -260,15 +746,29 @@ def run_nccl_random_pair_healthcheck(
     node_pairs.append(node_pair)
     logging.info("Paired node %s and node %s", node0, node1)
 
-  tested_nodes = health_check_with_node_pairs(
-      node_pairs=node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "false"},
-      job_name_distinctor="random-pair",
-  )
-
-  # Get the passed nodes and other suspect from the first pass.
-  node_results = get_nccl_test_results(v1, tested_nodes)
+  pipelined = None
+  if second_pass_enabled and is_second_pass_pipelined():
+    pipelined = run_pipelined_passes(
+        v1,
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        job_name_distinctor="random-pair",
+        select_partner=lambda _, passed: passed[0] if passed else None,
+        second_pass_env_mappings={
+            "SECOND_PASS": "true",
+            "HEALTH_VALIDITY_HOURS": "0",
+        },
+    )
+    node_results = pipelined.first_pass
+  else:
+    tested_nodes = health_check_with_node_pairs(
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "false"},
+        job_name_distinctor="random-pair",
+    )
+    # Get the passed nodes and other suspect from the first pass.
+    node_results = get_nccl_test_results(v1, tested_nodes)
   passed_nodes = node_results.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes: list[tuple[str, str]] = []
@@ -277,11 +777,11 @@ def run_nccl_random_pair_healthcheck(
       suspect_nodes.extend((node, result_type) for node in nodes)
 
   # Label nodes that passed
+  mutator = checker_common.NodeMutator()
   for node in passed_nodes:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
+  mutator.flush()
 
   # If no second pass, no failed nodes, or no passed nodes for second pass,
   # then return results.
@@ -289,10 +789,9 @@ def run_nccl_random_pair_healthcheck(
     logging.info("Second pass will not run")
     # Label suspect nodes based on their given result type
     for node, result_type in suspect_nodes:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value=result_type
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
       logging.info("Node %s failed nccl test, result %s", node, result_type)
+    mutator.flush()
     failed_nodes = node_results.get("fail", list())
     suspect_nodes_no_fails: list[str] = [
         node for node, result_type in suspect_nodes if result_type != "fail"
@@ -305,36 +804,40 @@ def run_nccl_random_pair_healthcheck(
     )
     return health_result
 
-  print(f"Running second pass for {len(suspect_nodes)} nodes...")
-
-  second_pass_node_pairs = []
-  # For second pass, pair each suspect node with a randomly selected passed node
-  # If there are more suspect nodes than passed nodes, passed nodes will be
-  # cycled through and therefore pair with more than one suspect node.
-  passed_nodes_list = list(passed_nodes)
   # Get just the names from suspect nodes
   suspect_nodes_list = [node for (node, _) in suspect_nodes]
-  random.shuffle(passed_nodes_list)
-  for suspect_node, good_node in zip(
-      suspect_nodes_list, itertools.cycle(passed_nodes_list)
-  ):
-    node_pair = (suspect_node, good_node)
-    second_pass_node_pairs.append(node_pair)
-    print(
-        f"Will run NCCL test between good node {good_node} and suspect node"
-        f" {suspect_node}"
-    )
+  if pipelined is not None:
+    # Second pass already ran while the first pass was finishing
+    node_results_second_pass = pipelined.second_pass
+  else:
+    print(f"Running second pass for {len(suspect_nodes)} nodes...")
+
+    second_pass_node_pairs = []
+    # For second pass, pair each suspect node with a randomly selected passed
+    # node. If there are more suspect nodes than passed nodes, passed nodes will
+    # be cycled through and therefore pair with more than one suspect node.
+    passed_nodes_list = list(passed_nodes)
+    random.shuffle(passed_nodes_list)
+    for suspect_node, good_node in zip(
+        suspect_nodes_list, itertools.cycle(passed_nodes_list)
+    ):
+      node_pair = (suspect_node, good_node)
+      second_pass_node_pairs.append(node_pair)
+      print(
+          f"Will run NCCL test between good node {good_node} and suspect node"
+          f" {suspect_node}"
+      )
 
-  tested_nodes_second_pass = health_check_with_node_pairs(
-      node_pairs=second_pass_node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "true", "HEALTH_VALIDITY_HOURS": "0"},
-      job_name_distinctor="2nd-pass",
-  )
-  print(f"Second pass completed for {len(tested_nodes_second_pass)} nodes")
+    tested_nodes_second_pass = health_check_with_node_pairs(
+        node_pairs=second_pass_node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "true", "HEALTH_VALIDITY_HOURS": "0"},
+        job_name_distinctor="2nd-pass",
+    )
+    print(f"Second pass completed for {len(tested_nodes_second_pass)} nodes")
 
-  # Only care about the results from the previous failed nodes
-  node_results_second_pass = get_nccl_test_results(v1, suspect_nodes_list)
+    # Only care about the results from the previous failed nodes
+    node_results_second_pass = get_nccl_test_results(v1, suspect_nodes_list)
   passed_nodes_second_pass = node_results_second_pass.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes_second_pass: list[tuple[str, str]] = []
@@ -352,16 +855,13 @@ def run_nccl_random_pair_healthcheck(
 
   # Label nodes that passed second pass
   for node in passed_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
   # Since final test, we can use this result type as final result
   for node, result_type in suspect_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value=result_type
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, result_type)
     logging.info("Node %s failed nccl test, result %s", node, result_type)
+  mutator.flush()
   passed_nodes, failed_nodes = determine_failed_components(
       passed_nodes,
       suspect_nodes_list,
@@ -425,15 +925,33 @@ def run_intra_rack_healthcheck(
           f" {rack})"
       )
 
-  tested_nodes = health_check_with_node_pairs(
-      node_pairs=node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "false"},
-      job_name_distinctor="intra-rack",
-  )
-
-  # Get the suspect and passed nodes from the first pass.
-  node_results = get_nccl_test_results(v1, tested_nodes)
+  pipelined = None
+  if second_pass_enabled and is_second_pass_pipelined():
+    node_to_rack = {
+        node: rack for rack, nodes in rack_to_nodes.items() for node in nodes
+    }
+    pipelined = run_pipelined_passes(
+        v1,
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        job_name_distinctor="intra-rack",
+        # Suspects are re-tested with a passed node in the same rack
+        select_partner=lambda suspect, passed: next(
+            (n for n in passed if node_to_rack[n] == node_to_rack[suspect]),
+            None,
+        ),
+        second_pass_env_mappings={"SECOND_PASS": "true"},
+    )
+    node_results = pipelined.first_pass
+  else:
+    tested_nodes = health_check_with_node_pairs(
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "false"},
+        job_name_distinctor="intra-rack",
+    )
+    # Get the suspect and passed nodes from the first pass.
+    node_results = get_nccl_test_results(v1, tested_nodes)
   passed_nodes = node_results.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes: list[tuple[str, str]] = []
@@ -443,11 +961,11 @@ def run_intra_rack_healthcheck(
   suspect_nodes_list = [node for (node, _) in suspect_nodes]
 
   # Label nodes that passed
+  mutator = checker_common.NodeMutator()
   for node in passed_nodes:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
+  mutator.flush()
 
   # If no second pass, no failed nodes, or no passed nodes for second pass,
   # then return results.
@@ -455,10 +973,9 @@ def run_intra_rack_healthcheck(
     logging.info("Second pass will not run")
     # Label suspect nodes based on their given result type
     for node, result_type in suspect_nodes:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value=result_type
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
       logging.info("Node %s failed nccl test, result %s", node, result_type)
+    mutator.flush()
     failed_nodes = node_results.get("fail", list())
     suspect_nodes_no_fails: list[str] = [
         node for node, result_type in suspect_nodes if result_type != "fail"
@@ -471,51 +988,55 @@ def run_intra_rack_healthcheck(
     )
     return health_result
 
-  # For the second pass, pair each suspect node with a passed node in the same
-  # rack.
-  print(f"Running second pass for {len(suspect_nodes)} nodes...")
-  second_pass_node_pairs = []
-  all_suspect_nodes = []
-  for rack, nodes in rack_to_nodes.items():
-    passed_nodes_in_rack = []
-    suspect_nodes_in_rack = []
-    # Determine which nodes in the rack passed and which suspect.
-    for node in nodes:
-      if node in passed_nodes:
-        passed_nodes_in_rack.append(node)
-      elif node in suspect_nodes_list:
-        suspect_nodes_in_rack.append(node)
-
-    if not passed_nodes_in_rack:
-      print(f"No passed nodes in rack: {rack}")
-      continue
-
-    # Shuffle the passed nodes in the rack & then cycle through them to pair
-    # with each suspect node exhaustively. Repeats are fine but not ideal.
-    random.shuffle(passed_nodes_in_rack)
-    for suspect_node, healthy_node in zip(
-        suspect_nodes_in_rack, itertools.cycle(passed_nodes_in_rack)
-    ):
-      node_pair = (suspect_node, healthy_node)
-      second_pass_node_pairs.append(node_pair)
-      print(
-          f"Will run NCCL test between good node {healthy_node} (Rack:"
-          f" {rack}) and suspect node {suspect_node} (Rack:"
-          f" {rack})"
-      )
-    # Track all suspect nodes from the first pass (should have no repeats)
-    all_suspect_nodes.extend(suspect_nodes_in_rack)
+  if pipelined is not None:
+    # Second pass already ran while the first pass was finishing
+    node_results_second_pass = pipelined.second_pass
+  else:
+    # For the second pass, pair each suspect node with a passed node in the same
+    # rack.
+    print(f"Running second pass for {len(suspect_nodes)} nodes...")
+    second_pass_node_pairs = []
+    all_suspect_nodes = []
+    for rack, nodes in rack_to_nodes.items():
+      passed_nodes_in_rack = []
+      suspect_nodes_in_rack = []
+      # Determine which nodes in the rack passed and which suspect.
+      for node in nodes:
+        if node in passed_nodes:
+          passed_nodes_in_rack.append(node)
+        elif node in suspect_nodes_list:
+          suspect_nodes_in_rack.append(node)
+
+      if not passed_nodes_in_rack:
+        print(f"No passed nodes in rack: {rack}")
+        continue
 
-  tested_nodes_second_pass = health_check_with_node_pairs(
-      node_pairs=second_pass_node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "true"},
-      job_name_distinctor="intra-rack-2nd-pass",
-  )
-  print(f"Second pass completed for {len(tested_nodes_second_pass)} nodes")
+      # Shuffle the passed nodes in the rack & then cycle through them to pair
+      # with each suspect node exhaustively. Repeats are fine but not ideal.
+      random.shuffle(passed_nodes_in_rack)
+      for suspect_node, healthy_node in zip(
+          suspect_nodes_in_rack, itertools.cycle(passed_nodes_in_rack)
+      ):
+        node_pair = (suspect_node, healthy_node)
+        second_pass_node_pairs.append(node_pair)
+        print(
+            f"Will run NCCL test between good node {healthy_node} (Rack:"
+            f" {rack}) and suspect node {suspect_node} (Rack:"
+            f" {rack})"
+        )
+      # Track all suspect nodes from the first pass (should have no repeats)
+      all_suspect_nodes.extend(suspect_nodes_in_rack)
+
+    tested_nodes_second_pass = health_check_with_node_pairs(
+        node_pairs=second_pass_node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "true"},
+        job_name_distinctor="intra-rack-2nd-pass",
+    )
+    print(f"Second pass completed for {len(tested_nodes_second_pass)} nodes")
 
-  # Only care about the results from the previous failed nodes
-  node_results_second_pass = get_nccl_test_results(v1, all_suspect_nodes)
+    # Only care about the results from the previous failed nodes
+    node_results_second_pass = get_nccl_test_results(v1, all_suspect_nodes)
   passed_nodes_second_pass = node_results_second_pass.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes_second_pass: list[tuple[str, str]] = []
@@ -529,16 +1050,13 @@ def run_intra_rack_healthcheck(
 
   # Label nodes that passed second pass
   for node in passed_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
   # Since final test, we can use this result type as final result
   for node, result_type in suspect_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value=result_type
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, result_type)
     logging.info("Node %s failed nccl test, result %s", node, result_type)
+  mutator.flush()
   # Get just the names from suspect nodes for second pass
   suspect_nodes_second_pass_list = [
       node for (node, _) in suspect_nodes_second_pass
@@ -628,15 +1146,48 @@ def run_inter_rack_healthcheck(
     )
     return health_result
 
-  tested_nodes = health_check_with_node_pairs(
-      node_pairs=node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "false"},
-      job_name_distinctor="inter-rack",
-  )
-
-  # Get the passed nodes and other suspect from the first pass.
-  node_results = get_nccl_test_results(v1, tested_nodes)
+  pipelined = None
+  if second_pass_enabled and is_second_pass_pipelined():
+    node_to_rack = {
+        node: rack for rack, nodes in rack_to_nodes.items() for node in nodes
+    }
+    rack_to_cluster = {
+        rack: cluster
+        for cluster, racks in cluster_to_racks.items()
+        for rack in racks
+    }
+
+    # Suspects are re-tested with a passed node from another rack in the same
+    # cluster.
+    def _select_partner(suspect: str, passed: list[str]) -> str | None:
+      suspect_rack = node_to_rack[suspect]
+      for node in passed:
+        rack = node_to_rack[node]
+        if (
+            rack != suspect_rack
+            and rack_to_cluster[rack] == rack_to_cluster[suspect_rack]
+        ):
+          return node
+      return None
+
+    pipelined = run_pipelined_passes(
+        v1,
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        job_name_distinctor="inter-rack",
+        select_partner=_select_partner,
+        second_pass_env_mappings={"SECOND_PASS": "true"},
+    )
+    node_results = pipelined.first_pass
+  else:
+    tested_nodes = health_check_with_node_pairs(
+        node_pairs=node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "false"},
+        job_name_distinctor="inter-rack",
+    )
+    # Get the passed nodes and other suspect from the first pass.
+    node_results = get_nccl_test_results(v1, tested_nodes)
   passed_nodes = node_results.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes: list[tuple[str, str]] = []
@@ -645,11 +1196,11 @@ def run_inter_rack_healthcheck(
       suspect_nodes.extend((node, result_type) for node in nodes)
 
   # Label nodes that passed
+  mutator = checker_common.NodeMutator()
   for node in passed_nodes:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
+  mutator.flush()
 
   # Determine which racks passed and which failed by checking if any of the
   # nodes in the rack passed.
@@ -662,10 +1213,9 @@ def run_inter_rack_healthcheck(
   if (not second_pass_enabled) or (not failed_racks) or (not passed_nodes):
     logging.info("Second pass will not run")
     for node, result_type in suspect_nodes:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value=result_type
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
       logging.info("Node %s failed nccl test, result %s", node, result_type)
+    mutator.flush()
     print(f"Found failed racks: {failed_racks}")
     print(f"Found passed racks: {passed_racks}")
     health_result.health_results.extend(
@@ -673,55 +1223,59 @@ def run_inter_rack_healthcheck(
     )
     return health_result
 
-  # If second pass is enabled, we will run the test between the passed and
-  # failed racks in the same cluster.
-  print(f"Running second pass for {len(failed_racks)} racks...")
-  second_pass_node_pairs = []
-  all_failed_nodes = []
-  for cluster in capacity.clusters:
-    for failed_rack in cluster.racks:
-      if failed_rack.id not in failed_racks:
-        continue
-
-      # Get the list of racks in the same cluster as the failed rack.
-      potential_racks = cluster_to_racks[cluster.id]
-
-      # Choose a random healthy rack from the same cluster
-      healthy_rack = ""
-      for potential_rack in potential_racks:
-        if potential_rack in passed_racks:
-          healthy_rack = potential_rack
-          break
-
-      if not healthy_rack:
-        print(f"No healthy rack found for rack: {failed_rack.id}")
-        continue
-
-      # Choose a random node from the healthy and failed rack
-      failed_nodes = rack_to_nodes[failed_rack.id]
-      healthy_nodes = rack_to_nodes[healthy_rack]
-
-      healthy_node = random.choice(healthy_nodes)
-      failed_node = random.choice(failed_nodes)
-      all_failed_nodes.append(failed_node)
-      node_pair = (healthy_node, failed_node)
-      second_pass_node_pairs.append(node_pair)
-
-      print(
-          f"Will run NCCL test between good node {healthy_node} (Rack:"
-          f" {healthy_rack}) and failed node {failed_node} (Rack:"
-          f" {failed_rack})"
-      )
+  if pipelined is not None:
+    # Second pass already ran while the first pass was finishing
+    node_results_second_pass = pipelined.second_pass
+  else:
+    # If second pass is enabled, we will run the test between the passed and
+    # failed racks in the same cluster.
+    print(f"Running second pass for {len(failed_racks)} racks...")
+    second_pass_node_pairs = []
+    all_failed_nodes = []
+    for cluster in capacity.clusters:
+      for failed_rack in cluster.racks:
+        if failed_rack.id not in failed_racks:
+          continue
+
+        # Get the list of racks in the same cluster as the failed rack.
+        potential_racks = cluster_to_racks[cluster.id]
+
+        # Choose a random healthy rack from the same cluster
+        healthy_rack = ""
+        for potential_rack in potential_racks:
+          if potential_rack in passed_racks:
+            healthy_rack = potential_rack
+            break
+
+        if not healthy_rack:
+          print(f"No healthy rack found for rack: {failed_rack.id}")
+          continue
+
+        # Choose a random node from the healthy and failed rack
+        failed_nodes = rack_to_nodes[failed_rack.id]
+        healthy_nodes = rack_to_nodes[healthy_rack]
+
+        healthy_node = random.choice(healthy_nodes)
+        failed_node = random.choice(failed_nodes)
+        all_failed_nodes.append(failed_node)
+        node_pair = (healthy_node, failed_node)
+        second_pass_node_pairs.append(node_pair)
+
+        print(
+            f"Will run NCCL test between good node {healthy_node} (Rack:"
+            f" {healthy_rack}) and failed node {failed_node} (Rack:"
+            f" {failed_rack})"
+        )
 
-  tested_nodes = health_check_with_node_pairs(
-      node_pairs=second_pass_node_pairs,
-      orchestrator_config=orchestrator_config,
-      env_mappings={"SECOND_PASS": "true"},
-      job_name_distinctor="inter-rack-2nd-pass",
-  )
+    tested_nodes = health_check_with_node_pairs(
+        node_pairs=second_pass_node_pairs,
+        orchestrator_config=orchestrator_config,
+        env_mappings={"SECOND_PASS": "true"},
+        job_name_distinctor="inter-rack-2nd-pass",
+    )
 
-  # Get the results of the second pass and combine with the first pass results
-  node_results_second_pass = get_nccl_test_results(v1, tested_nodes)
+    # Get the results of the second pass and combine with the first pass results
+    node_results_second_pass = get_nccl_test_results(v1, tested_nodes)
   passed_nodes_second_pass = node_results_second_pass.get("pass", list())
   # Consider all other node without "pass" key as suspect
   suspect_nodes_second_pass: list[tuple[str, str]] = []
@@ -735,16 +1289,13 @@ def run_inter_rack_healthcheck(
 
   # Label nodes that passed second pass
   for node in passed_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
   # Since final test, we can use this result type as final result
   for node, result_type in suspect_nodes_second_pass:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value=result_type
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, result_type)
     logging.info("Node %s failed nccl test, result %s", node, result_type)
+  mutator.flush()
 
   second_passed_racks = []
   second_failed_racks = []
@@ -849,11 +1400,11 @@ def run_inter_cluster_healthcheck(
       suspect_nodes.extend((node, result_type) for node in nodes)
 
   # Label nodes that passed
+  mutator = checker_common.NodeMutator()
   for node in passed_nodes:
-    checker_common.label_node(
-        node, label_key=NCCL_RESULT_KEY, label_value="pass"
-    )
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
     logging.info("Node %s passed nccl test", node)
+  mutator.flush()
 
   passed_clusters = []
   failed_clusters = []
@@ -867,10 +1418,9 @@ def run_inter_cluster_healthcheck(
     logging.info("Second pass will not run")
     # Label suspect nodes based on their given result type
     for node, result_type in suspect_nodes:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value=result_type
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
       logging.info("Node %s failed nccl test, result %s", node, result_type)
+    mutator.flush()
     print(f"Found failed clusters: {failed_clusters}")
     print(f"Found passed clusters: {passed_clusters}")
     health_result.health_results.extend(
@@ -924,17 +1474,14 @@ def run_inter_cluster_healthcheck(
   # Label nodes that originally failed the second pass
   for node in all_suspect_nodes:
     if node in passed_nodes_second_pass:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value="pass"
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, "pass")
       logging.info("Node %s passed nccl test", node)
   # Since final test, we can use this result type as final result
   for node, result_type in suspect_nodes_second_pass:
     if node in all_suspect_nodes:
-      checker_common.label_node(
-          node, label_key=NCCL_RESULT_KEY, label_value=result_type
-      )
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
       logging.info("Node %s failed nccl test, result %s", node, result_type)
+  mutator.flush()
 
   second_passed_clusters = []
   second_failed_clusters = []
@@ -964,6 +1511,504 @@ def run_inter_cluster_healthcheck(
   return health_result
 
 
+def split_into_groups(
+    nodes: list[str], group_size: int
+) -> list[tuple[str, ...]]:
+  """Splits nodes into consecutive groups of about group_size nodes.
+
+  Args:
+    nodes: The nodes to split, in topology order.
+    group_size: The target number of nodes per group.
+
+  Returns:
+    Groups of at least two nodes each, or no groups if there are fewer than two
+    nodes.
+  """
+  if len(nodes) < 2:
+    return []
+  num_groups = min(math.ceil(len(nodes) / group_size), len(nodes) // 2)
+  base_size, extra = divmod(len(nodes), num_groups)
+  groups = []
+  start = 0
+  for i in range(num_groups):
+    size = base_size + (1 if i < extra else 0)
+    groups.append(tuple(nodes[start : start + size]))
+    start += size
+  return groups
+
+
+def run_group_healthcheck(
+    v1: kubernetes.client.CoreV1Api,
+    capacity: common_pb2.Capacity,
+    orchestrator_config: checker_common.HelmConfig | str,
+    second_pass_enabled: bool,
+) -> health_results_pb2.HealthResult:
+  """Localizes bad nodes by bisecting groups of nodes that fail NCCL tests.
+
+  Each topology block is split into groups of about _GROUP_SIZE nodes that are
+  tested together. Groups that fail are split in half and tested again until
+  they're down to two or three nodes, whose nodes become suspects. With second
+  pass enabled each suspect is then re-tested with a passed node, as in the
+  random pairing mode.
+
+  Args:
+    v1: Kubernetes CoreV1Api object.
+    capacity: Capacity topology of the cluster.
+    orchestrator_config: A HelmConfig object or a path to a yaml file to use as
+      the orchestrator.
+    second_pass_enabled: Whether second pass is enabled.
+
+  Returns:
+    The health results for all nodes.
+  """
+  health_result = health_results_pb2.HealthResult(
+      name=health_runner_config_pb2.HealthCheckName.Name(
+          health_runner_config_pb2.HEALTH_CHECK_NCCL_GROUP
+      ),
+      type=health_runner_config_pb2.HealthCheckType.Name(
+          health_runner_config_pb2.HealthCheckType.HEALTH_CHECK_TYPE_COMMUNICATION
+      ),
+  )
+  groups = []
+  skipped_nodes = []
+  for cluster in capacity.clusters:
+    nodes = [node.id for rack in cluster.racks for node in rack.nodes]
+    logging.info("%d nodes in block %s", len(nodes), cluster.id)
+    if len(nodes) < 2:
+      print(f"Skipping block {cluster.id} with less than 2 nodes.")
+      skipped_nodes.extend(nodes)
+      continue
+    groups.extend(split_into_groups(nodes, int(_GROUP_SIZE)))
+
+  passed_nodes = []
+  suspect_nodes: list[tuple[str, str]] = []
+  round_number = 0
+  while groups:
+    round_number += 1
+    print(f"Round {round_number}: testing {len(groups)} groups...")
+    env_mappings = {"SECOND_PASS": "false"}
+    if round_number > 1:
+      # Nodes were just tested, so the health validity must not exclude them
+      env_mappings["HEALTH_VALIDITY_HOURS"] = "0"
+      # The timeout only covers the first round and the second pass
+      _extend_timeout(int(_SLEEP_TIME_MINUTES))
+    launcher = _NodePairLauncher(
+        orchestrator_config, env_mappings, f"group-r{round_number}"
+    )
+    for group in groups:
+      launcher.submit(group)
+    launcher.collect()
+    launcher.wait()
+    print(f"All pods are done with round {round_number}")
+    launcher.cleanup()
+
+    node_results = get_nccl_test_results(v1, launcher.tested_nodes)
+    node_to_result = {
+        node: result_type
+        for result_type, nodes in node_results.items()
+        for node in nodes
+    }
+    failed_groups = set(launcher.failed_pairs)
+    next_groups = []
+    for group in groups:
+      if group in failed_groups:
+        print(f"Skipping group {group} that failed to launch.")
+        skipped_nodes.extend(group)
+      elif all(node_to_result.get(node) == "pass" for node in group):
+        passed_nodes.extend(group)
+      elif len(group) >= 4:
+        half = len(group) // 2
+        next_groups.extend([group[:half], group[half:]])
+      else:
+        suspect_nodes.extend(
+            (node, node_to_result.get(node, "timeout")) for node in group
+        )
+    groups = next_groups
+
+  # Label nodes that passed
+  mutator = checker_common.NodeMutator()
+  for node in passed_nodes:
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
+    logging.info("Node %s passed nccl test", node)
+  mutator.flush()
+
+  if (not second_pass_enabled) or (not suspect_nodes) or (not passed_nodes):
+    logging.info("Second pass will not run")
+    for node, result_type in suspect_nodes:
+      mutator.set_label(node, NCCL_RESULT_KEY, result_type)
+      logging.info("Node %s failed nccl test, result %s", node, result_type)
+    mutator.flush()
+    failed_nodes = [node for node, _ in suspect_nodes]
+    print(f"Found failed/suspect nodes: {failed_nodes}")
+    print(f"Found passed nodes: {passed_nodes}")
+    health_result.health_results.extend(
+        generate_nccl_health_results(passed_nodes, failed_nodes, skipped_nodes)
+    )
+    return health_result
+
+  print(f"Running second pass for {len(suspect_nodes)} nodes...")
+  suspect_nodes_list = [node for (node, _) in suspect_nodes]
+  passed_nodes_list = list(passed_nodes)
+  random.shuffle(passed_nodes_list)
+  second_pass_node_pairs = list(
+      zip(suspect_nodes_list, itertools.cycle(passed_nodes_list))
+  )
+  health_check_with_node_pairs(
+      node_pairs=second_pass_node_pairs,
+      orchestrator_config=orchestrator_config,
+      env_mappings={"SECOND_PASS": "true", "HEALTH_VALIDITY_HOURS": "0"},
+      job_name_distinctor="group-2nd-pass",
+  )
+
+  # Only care about the results from the suspect nodes
+  node_results_second_pass = get_nccl_test_results(v1, suspect_nodes_list)
+  passed_nodes_second_pass = node_results_second_pass.get("pass", list())
+  suspect_nodes_second_pass = [
+      (node, result_type)
+      for result_type, nodes in node_results_second_pass.items()
+      if result_type != "pass"
+      for node in nodes
+  ]
+  for node in passed_nodes_second_pass:
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
+    logging.info("Node %s passed nccl test", node)
+  for node, result_type in suspect_nodes_second_pass:
+    mutator.set_label(node, NCCL_RESULT_KEY, result_type)
+    logging.info("Node %s failed nccl test, result %s", node, result_type)
+  mutator.flush()
+
+  passed_nodes, failed_nodes = determine_failed_components(
+      passed_nodes,
+      suspect_nodes_list,
+      passed_nodes_second_pass,
+      [node for node, _ in suspect_nodes_second_pass],
+  )
+  print(f"found failed/suspect nodes: {failed_nodes}")
+  print(f"found passed nodes: {passed_nodes}")
+  health_result.health_results.extend(
+      generate_nccl_health_results(passed_nodes, failed_nodes, skipped_nodes)
+  )
+  return health_result
+
+
+@dataclasses.dataclass
+class PairTestResult:
+  """The outcome of one NCCL test between two nodes."""
+
+  node0: str
+  node1: str
+  passed: bool
+  # Average bus bandwidth in GBps, 0 if the test didn't report one
+  bandwidth_gbps: float
+  round_number: int
+
+
+@dataclasses.dataclass
+class NodeFaultScore:
+  """The inferred health of a node from all of its pair tests."""
+
+  faulty: bool
+  # Share of the node's tests that failed and aren't blamed on its partner
+  fault_score: float
+  # How well the verdict agrees with the tests, discounted for few tests
+  confidence: float
+  num_tests: int
+  num_failed_tests: int
+
+
+def generate_disjoint_pairing(
+    nodes: list[str],
+    tested_pairs: set[frozenset[str]],
+) -> list[tuple[str, str]]:
+  """Returns a random pairing of nodes that avoids already tested pairs.
+
+  Args:
+    nodes: The nodes to pair.
+    tested_pairs: Pairs of nodes tested in earlier rounds.
+
+  Returns:
+    The pairing with the fewest repeated pairs out of a few random tries.
+  """
+  best_pairs = []
+  best_repeats = None
+  for _ in range(_PAIRING_ATTEMPTS):
+    pairs = [(nodes[i], nodes[j]) for i, j in generate_index_pairs(len(nodes))]
+    repeats = sum(frozenset(pair) in tested_pairs for pair in pairs)
+    if best_repeats is None or repeats < best_repeats:
+      best_pairs, best_repeats = pairs, repeats
+    if not repeats:
+      break
+  return best_pairs
+
+
+def get_pair_test_results(
+    v1: kubernetes.client.CoreV1Api,
+    node_pairs: list[tuple[str, str]],
+    round_number: int,
+) -> list[PairTestResult]:
+  """Reads the result and bandwidth labels of each tested node pair.
+
+  A pair passed only if both nodes were labeled as passing. Nodes without a
+  bandwidth label (e.g. the test timed out) count as 0 GBps. Pairs whose test
+  failed to launch (labeled crash) are left out, as they say nothing about
+  either node.
+
+  Args:
+    v1: The Kubernetes API client, used if the node cache isn't started yet.
+    node_pairs: The node pairs tested together.
+    round_number: The round the pairs were tested in.
+
+  Returns:
+    The result of each node pair.
+  """
+  informer = checker_common.get_node_informer(v1)
+  informer.sync()
+  pair_results = []
+  for node0, node1 in node_pairs:
+    passed = True
+    launched = True
+    bandwidths = []
+    for node_name in (node0, node1):
+      node = informer.get(node_name)
+      labels = (node.metadata.labels or {}) if node else {}
+      pre_result = labels.get(NCCL_PRE_RESULT_KEY)
+      if pre_result != "pass":
+        passed = False
+      if pre_result == "crash":
+        launched = False
+      try:
+        bandwidths.append(float(labels[NCCL_BANDWIDTH_KEY]))
+      except (KeyError, ValueError):
+        bandwidths.append(0.0)
+    if not launched:
+      logging.info("Pair %s and %s: failed to launch", node0, node1)
+      continue
+    pair_results.append(
+        PairTestResult(
+            node0=node0,
+            node1=node1,
+            passed=passed,
+            bandwidth_gbps=min(bandwidths),
+            round_number=round_number,
+        )
+    )
+    logging.info(
+        "Pair %s and %s: passed=%s, bandwidth=%s GBps",
+        node0,
+        node1,
+        passed,
+        min(bandwidths),
+    )
+  return pair_results
+
+
+def infer_faulty_nodes(
+    pair_results: list[PairTestResult],
+    threshold: float,
+) -> dict[str, NodeFaultScore]:
+  """Infers which nodes are faulty from the results of many pair tests.
+
+  A failed test is blamed on whichever of its nodes failed the most of its
+  tests. Nodes are marked faulty greedily, highest fault score first, and
+  every failure with an already faulty partner is explained by that partner.
+  This stops once no node has more than `threshold` of its tests failing for
+  reasons not explained by a faulty partner.
+
+  Args:
+    pair_results: The results of all pair tests.
+    threshold: The fault score a node must exceed to be marked faulty.
+
+  Returns:
+    The fault score of each tested node.
+  """
+  tests_by_node: dict[str, list[PairTestResult]] = collections.defaultdict(
+      list
+  )
+  for result in pair_results:
+    tests_by_node[result.node0].append(result)
+    if result.node1 != result.node0:
+      tests_by_node[result.node1].append(result)
+
+  def _partner(result: PairTestResult, node: str) -> str:
+    return result.node1 if result.node0 == node else result.node0
+
+  def _unexplained_failures(node: str, faulty: set[str]) -> int:
+    return sum(
+        not result.passed and _partner(result, node) not in faulty
+        for result in tests_by_node[node]
+    )
+
+  faulty_nodes: set[str] = set()
+  while True:
+    candidates = []
+    for node, tests in tests_by_node.items():
+      if node not in faulty_nodes:
+        failures = _unexplained_failures(node, faulty_nodes)
+        candidates.append((failures / len(tests), failures, node))
+    if not candidates:
+      break
+    # Ties go to the node with more failures, so it explains more tests
+    score, _, node = max(candidates)
+    if score <= threshold:
+      break
+    faulty_nodes.add(node)
+
+  scores = {}
+  for node, tests in tests_by_node.items():
+    num_failed = sum(not result.passed for result in tests)
+    faulty = node in faulty_nodes
+    if faulty:
+      failed = num_failed
+      consistent = num_failed
+    else:
+      failed = _unexplained_failures(node, faulty_nodes)
+      consistent = len(tests) - failed
+    scores[node] = NodeFaultScore(
+        faulty=faulty,
+        fault_score=failed / len(tests),
+        confidence=consistent / len(tests) * (1 - 0.5 ** len(tests)),
+        num_tests=len(tests),
+        num_failed_tests=num_failed,
+    )
+  return scores
+
+
+def run_multi_round_healthcheck(
+    v1: kubernetes.client.CoreV1Api,
+    capacity: common_pb2.Capacity,
+    orchestrator_config: checker_common.HelmConfig | str,
+) -> health_results_pb2.HealthResult:
+  """Finds faulty nodes from several rounds of random pair tests.
+
+  Each of the _MULTI_ROUND_COUNT rounds pairs every node with a new random
+  partner where possible. The pass/fail result and bandwidth of every pair are
+  kept, and infer_faulty_nodes decides which nodes are faulty from all of them.
+  This replaces the second pass: the tests run in non-final mode and only the
+  inferred verdicts are written as result labels.
+
+  Args:
+    v1: Kubernetes CoreV1Api object.
+    capacity: Capacity topology of the cluster.
+    orchestrator_config: A HelmConfig object or a path to a yaml file to use as
+      the orchestrator.
+
+  Returns:
+    The health results for all nodes, with each node's fault score and the
+    results of its pair tests.
+  """
+  health_result = health_results_pb2.HealthResult(
+      name=health_runner_config_pb2.HealthCheckName.Name(
+          health_runner_config_pb2.HEALTH_CHECK_NCCL_MULTI_ROUND
+      ),
+      type=health_runner_config_pb2.HealthCheckType.Name(
+          health_runner_config_pb2.HealthCheckType.HEALTH_CHECK_TYPE_COMMUNICATION
+      ),
+  )
+  nodes = [
+      node.id
+      for cluster in capacity.clusters
+      for rack in cluster.racks
+      for node in rack.nodes
+  ]
+  logging.info("Found %d nodes", len(nodes))
+  if len(nodes) < 2:
+    print("Skipping multi round health check with less than 2 nodes.")
+    health_result.health_results.extend(
+        generate_nccl_health_results([], [], nodes)
+    )
+    return health_result
+
+  pair_results: list[PairTestResult] = []
+  tested_pairs: set[frozenset[str]] = set()
+  launched_rounds = 0
+  for round_number in range(1, int(_MULTI_ROUND_COUNT) + 1):
+    node_pairs = generate_disjoint_pairing(nodes, tested_pairs)
+    print(f"Round {round_number}: testing {len(node_pairs)} node pairs...")
+    # Labels are read after each conflict-free round, before a node's next
+    # test overwrites them
+    for round_pairs in schedule_rounds(node_pairs):
+      launched_rounds += 1
+      # A test only labels passing nodes in non-final mode, so earlier
+      # results are cleared for a failing test not to look like a pass
+      mutator = checker_common.NodeMutator()
+      for node_pair in round_pairs:
+        for node in node_pair:
+          mutator.remove_label(node, NCCL_PRE_RESULT_KEY, print_output=False)
+          mutator.remove_label(node, NCCL_BANDWIDTH_KEY, print_output=False)
+      mutator.flush()
+      env_mappings = {"SECOND_PASS": "false"}
+      if launched_rounds > 1:
+        # Nodes were just tested, so the health validity must not exclude
+        # them. The timeout covers the first launch and one more.
+        env_mappings["HEALTH_VALIDITY_HOURS"] = "0"
+      if launched_rounds > 2:
+        _extend_timeout(int(_SLEEP_TIME_MINUTES))
+      tested_nodes = set(
+          health_check_with_node_pairs(
+              node_pairs=round_pairs,
+              orchestrator_config=orchestrator_config,
+              env_mappings=env_mappings,
+              job_name_distinctor=f"multi-round-r{round_number}",
+          )
+      )
+      launched_pairs = [pair for pair in round_pairs if pair[0] in tested_nodes]
+      pair_results.extend(
+          get_pair_test_results(v1, launched_pairs, round_number)
+      )
+    tested_pairs.update(frozenset(pair) for pair in node_pairs)
+
+  scores = infer_faulty_nodes(pair_results, float(_FAULT_SCORE_THRESHOLD))
+  passed_nodes = [node for node, score in scores.items() if not score.faulty]
+  failed_nodes = [node for node, score in scores.items() if score.faulty]
+  skipped_nodes = [node for node in nodes if node not in scores]
+
+  mutator = checker_common.NodeMutator()
+  for node in passed_nodes:
+    mutator.set_label(node, NCCL_RESULT_KEY, "pass")
+  for node in failed_nodes:
+    mutator.set_label(node, NCCL_RESULT_KEY, "fail")
+  mutator.flush()
+  for node in sorted(scores):
+    score = scores[node]
+    logging.info(
+        "Node %s: faulty=%s, score=%.2f, confidence=%.2f, %d/%d tests failed",
+        node,
+        score.faulty,
+        score.fault_score,
+        score.confidence,
+        score.num_failed_tests,
+        score.num_tests,
+    )
+  print(f"Found failed nodes: {failed_nodes}")
+  print(f"Found passed nodes: {passed_nodes}")
+
+  tests_by_node = collections.defaultdict(list)
+  for result in pair_results:
+    tests_by_node[result.node0].append((result.node1, result))
+    tests_by_node[result.node1].append((result.node0, result))
+  node_results = generate_nccl_health_results(
+      passed_nodes, failed_nodes, skipped_nodes
+  )
+  for node_result in node_results:
+    score = scores.get(node_result.id)
+    if score is None:
+      continue
+    fault_inference = node_result.fault_inference_result
+    fault_inference.fault_score = score.fault_score
+    fault_inference.confidence = score.confidence
+    fault_inference.num_tests = score.num_tests
+    fault_inference.num_failed_tests = score.num_failed_tests
+    for peer, result in tests_by_node[node_result.id]:
+      fault_inference.pair_tests.add(
+          peer_id=peer,
+          passed=result.passed,
+          bandwidth_gbps=result.bandwidth_gbps,
+          round=result.round_number,
+      )
+  health_result.health_results.extend(node_results)
+  return health_result
+
+
 # 
 def determine_failed_components(
     first_pass_passed: list[str],
@@ -1003,7 +2048,7 @@ def get_nccl_test_results(
   """Returns the NCCL test results for the given nodes.
 
   Args:
-    v1: The Kubernetes API client.
+    v1: The Kubernetes API client, used if the node cache isn't started yet.
     nodes: The list of nodes to get the results for.
 
   Returns:
@@ -1015,12 +2060,14 @@ def get_nccl_test_results(
 
   tested_nodes = set(nodes)
 
-  nodes = v1.list_node()
-  for node in nodes.items:
-    if node.metadata.name not in tested_nodes:
+  # Labels were set by the test pods; wait for the cache to catch up
+  informer = checker_common.get_node_informer(v1)
+  informer.sync()
+  for node_name in tested_nodes:
+    node = informer.get(node_name)
+    if node is None:
       continue
     pre_result = node.metadata.labels.get(NCCL_PRE_RESULT_KEY)
-    node_name = node.metadata.name
     logging.info(
         "Node %s has result: %s.",
         node_name,
@@ -1110,3 +2157,7 @@ def generate_nccl_health_results(
 
 def is_second_pass_enabled() -> bool:
   return os.environ.get("SECOND_PASS_ENABLED", "true").lower() == "true"
+
+
+def is_second_pass_pipelined() -> bool:
+  return os.environ.get("PIPELINE_SECOND_PASS", "false").lower() == "true"
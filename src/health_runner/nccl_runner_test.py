@@ -0,0 +1,248 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for nccl_runner."""
+
+import random
+from unittest import mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+from kubernetes import client
+
+import nccl_runner
+
+
+def _nodes(count: int) -> list[str]:
+  return [f"node-{i}" for i in range(count)]
+
+
+def _pair_result(
+    node0: str, node1: str, passed: bool
+) -> nccl_runner.PairTestResult:
+  return nccl_runner.PairTestResult(
+      node0=node0,
+      node1=node1,
+      passed=passed,
+      bandwidth_gbps=100.0 if passed else 0.0,
+      round_number=1,
+  )
+
+
+class SplitIntoGroupsTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ("exact_groups", 16, 8, [8, 8]),
+      ("uneven_groups", 10, 4, [4, 3, 3]),
+      ("one_group", 5, 8, [5]),
+      ("groups_of_at_least_two", 5, 1, [3, 2]),
+      ("pair", 2, 8, [2]),
+  )
+  def test_group_sizes(self, num_nodes, group_size, expected_sizes):
+    groups = nccl_runner.split_into_groups(_nodes(num_nodes), group_size)
+
+    self.assertEqual([len(group) for group in groups], expected_sizes)
+
+  def test_keeps_every_node_in_order(self):
+    nodes = _nodes(11)
+
+    groups = nccl_runner.split_into_groups(nodes, 4)
+
+    self.assertEqual([node for group in groups for node in group], nodes)
+
+  @parameterized.parameters(0, 1)
+  def test_no_groups_for_fewer_than_two_nodes(self, num_nodes):
+    self.assertEmpty(nccl_runner.split_into_groups(_nodes(num_nodes), 8))
+
+
+class ScheduleRoundsTest(absltest.TestCase):
+
+  def test_disjoint_pairs_share_a_round(self):
+    node_pairs = [("a", "b"), ("c", "d"), ("e", "f")]
+
+    self.assertEqual(nccl_runner.schedule_rounds(node_pairs), [node_pairs])
+
+  def test_pairs_sharing_a_node_run_in_separate_rounds(self):
+    node_pairs = [("a", "b"), ("a", "c"), ("d", "e"), ("c", "b")]
+
+    rounds = nccl_runner.schedule_rounds(node_pairs)
+
+    self.assertEqual(
+        rounds, [[("a", "b"), ("d", "e")], [("a", "c")], [("c", "b")]]
+    )
+
+  def test_each_node_is_in_at_most_one_pair_per_round(self):
+    node_pairs = [("hub", f"node-{i}") for i in range(4)] + [
+        ("node-0", "node-1"),
+        ("node-2", "node-3"),
+    ]
+
+    rounds = nccl_runner.schedule_rounds(node_pairs)
+
+    self.assertCountEqual(
+        [pair for round_pairs in rounds for pair in round_pairs], node_pairs
+    )
+    for round_pairs in rounds:
+      nodes = [node for pair in round_pairs for node in pair]
+      self.assertLen(set(nodes), len(nodes))
+
+  def test_no_pairs(self):
+    self.assertEmpty(nccl_runner.schedule_rounds([]))
+
+
+class GenerateDisjointPairingTest(absltest.TestCase):
+
+  def test_avoids_tested_pairs(self):
+    random.seed(0)
+    nodes = _nodes(4)
+    tested_pairs = {
+        frozenset(("node-0", "node-1")),
+        frozenset(("node-2", "node-3")),
+    }
+
+    pairs = nccl_runner.generate_disjoint_pairing(nodes, tested_pairs)
+
+    self.assertLen(pairs, 2)
+    self.assertCountEqual([n for pair in pairs for n in pair], nodes)
+    for pair in pairs:
+      self.assertNotIn(frozenset(pair), tested_pairs)
+
+
+class GetPairTestResultsTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.labels = {}
+    informer = mock.Mock()
+    informer.get.side_effect = lambda name: client.V1Node(
+        metadata=client.V1ObjectMeta(name=name, labels=self.labels.get(name))
+    )
+    self.enter_context(
+        mock.patch.object(
+            nccl_runner.checker_common,
+            "get_node_informer",
+            return_value=informer,
+        )
+    )
+
+  def _label(self, node, pre_result=None, bandwidth=None):
+    labels = {}
+    if pre_result is not None:
+      labels[nccl_runner.NCCL_PRE_RESULT_KEY] = pre_result
+    if bandwidth is not None:
+      labels[nccl_runner.NCCL_BANDWIDTH_KEY] = bandwidth
+    self.labels[node] = labels
+
+  def test_pair_passes_only_if_both_nodes_pass(self):
+    self._label("a", "pass", "120")
+    self._label("b", "pass", "100")
+    self._label("c", "pass", "110")
+    # A failing test leaves no pre-result label in non-final mode
+    self._label("d", bandwidth="3")
+
+    results = nccl_runner.get_pair_test_results(
+        mock.Mock(), [("a", "b"), ("c", "d")], round_number=2
+    )
+
+    self.assertEqual(
+        results,
+        [
+            nccl_runner.PairTestResult("a", "b", True, 100.0, 2),
+            nccl_runner.PairTestResult("c", "d", False, 3.0, 2),
+        ],
+    )
+
+  def test_missing_bandwidth_counts_as_zero(self):
+    self._label("a", "pass", "120")
+
+    results = nccl_runner.get_pair_test_results(
+        mock.Mock(), [("a", "b")], round_number=1
+    )
+
+    self.assertEqual(
+        results, [nccl_runner.PairTestResult("a", "b", False, 0.0, 1)]
+    )
+
+  def test_skips_pairs_that_failed_to_launch(self):
+    self._label("a", "crash")
+    self._label("b", "crash")
+    self._label("c", "pass", "100")
+    self._label("d", "pass", "100")
+
+    results = nccl_runner.get_pair_test_results(
+        mock.Mock(), [("a", "b"), ("c", "d")], round_number=1
+    )
+
+    self.assertEqual([(r.node0, r.node1) for r in results], [("c", "d")])
+
+
+class InferFaultyNodesTest(absltest.TestCase):
+
+  def test_all_tests_pass(self):
+    pair_results = [
+        _pair_result("a", "b", True),
+        _pair_result("b", "c", True),
+        _pair_result("c", "a", True),
+    ]
+
+    scores = nccl_runner.infer_faulty_nodes(pair_results, threshold=0.5)
+
+    self.assertCountEqual(scores, ["a", "b", "c"])
+    for score in scores.values():
+      self.assertFalse(score.faulty)
+      self.assertEqual(score.fault_score, 0.0)
+      self.assertEqual(score.num_tests, 2)
+
+  def test_blames_node_failing_with_every_partner(self):
+    pair_results = [
+        _pair_result("bad", "a", False),
+        _pair_result("bad", "b", False),
+        _pair_result("c", "bad", False),
+        _pair_result("a", "b", True),
+        _pair_result("b", "c", True),
+        _pair_result("c", "a", True),
+    ]
+
+    scores = nccl_runner.infer_faulty_nodes(pair_results, threshold=0.5)
+
+    self.assertTrue(scores["bad"].faulty)
+    self.assertEqual(scores["bad"].fault_score, 1.0)
+    self.assertEqual(scores["bad"].num_failed_tests, 3)
+    self.assertAlmostEqual(scores["bad"].confidence, 1 - 0.5**3)
+    for node in ("a", "b", "c"):
+      self.assertFalse(scores[node].faulty)
+      # The failure with the faulty node isn't held against its partner
+      self.assertEqual(scores[node].fault_score, 0.0)
+      self.assertEqual(scores[node].num_failed_tests, 1)
+
+  def test_single_failure_below_threshold(self):
+    pair_results = [
+        _pair_result("a", "b", False),
+        _pair_result("a", "c", True),
+        _pair_result("a", "d", True),
+        _pair_result("b", "c", True),
+        _pair_result("b", "d", True),
+    ]
+
+    scores = nccl_runner.infer_faulty_nodes(pair_results, threshold=0.5)
+
+    self.assertFalse(any(score.faulty for score in scores.values()))
+    self.assertAlmostEqual(scores["a"].fault_score, 1 / 3)
+
+  def test_no_results(self):
+    self.assertEmpty(nccl_runner.infer_faulty_nodes([], threshold=0.5))
+
+
+if __name__ == "__main__":
+  absltest.main()
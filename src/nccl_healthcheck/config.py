@@ -25,6 +25,7 @@ def _create_a3_config():
           "bash /scripts/run-nccl-combined-plugins.sh gpudirect {benchmark}"
           " {ld_library_path} 8 eth1,eth2,eth3,eth4"
           " {start_message_size} {end_message_size} {nhosts} 1 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=60,
       ld_library_path="/usr/local/tcpx/lib64:/usr/local/nvidia/lib64/",
@@ -39,6 +40,7 @@ def _create_a3plus_config():
           "bash /scripts/run-nccl-combined-plugins.sh fastrak {benchmark}"
           " {ld_library_path} 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/tcpxo/lib64:/usr/local/nvidia/lib64/",
@@ -54,6 +56,7 @@ def _create_a3plus_debian_config():
           " {benchmark} {ld_library_path} 8"
           " enp134s0,enp135s0,enp13s0,enp14s0,enp141s0,enp142s0,enp6s0,enp7s0"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/cuda-12.2/lib64:/usr/local/nvidia/lib64/",
@@ -68,6 +71,7 @@ def _create_a3ultra_config():
           "bash /scripts/run-nccl-combined-plugins.sh rdma {benchmark}"
           " {ld_library_path} 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/gib/lib64:/usr/local/nvidia/lib64/",
@@ -82,6 +86,7 @@ def _create_a4_config():
           "bash /scripts/run-nccl-combined-plugins.sh rdma {benchmark}"
           " {ld_library_path} 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/gib/lib64:/usr/local/nvidia/lib64/",
@@ -96,6 +101,7 @@ def _create_a48lssd_config():
           "bash /scripts/run-nccl-combined-plugins.sh rdma {benchmark}"
           " {ld_library_path} 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/gib/lib64:/usr/local/nvidia/lib64/",
@@ -110,6 +116,7 @@ def _create_a4x_config():
           "bash /scripts/run-nccl-combined-plugins.sh rdma {benchmark}"
           " {ld_library_path} 4 eth1,eth2,eth3,eth4"
           " {start_message_size} {end_message_size} {nhosts} 3 {iterations}"
+          " {run_cycles}"
       ),
       default_threshold=120,
       ld_library_path="/usr/local/gib/lib64:/usr/local/nvidia/lib64/",
@@ -17,15 +17,19 @@
 This module controls execution of pairwise NCCL test.
 """
 
-import collections
+from concurrent import futures
 import dataclasses
 import math
 import os
 import re
+import statistics
 import time
 
 import checker_common
 import config
+import numpy as np
+import numpy.typing as npt
+import rendezvous
 
 
 JOB_NAME = os.environ.get("JOB_NAME")
@@ -58,20 +62,70 @@ _NCCL_64MIB_LATENCY_MS_KEY = "aiinfra/nccl-healthcheck-64MiB-latency-ms"
 _NCCL_1GIB_LATENCY_MS_KEY = "aiinfra/nccl-healthcheck-1G-latency-ms"
 _NCCL_8GIB_LATENCY_MS_KEY = "aiinfra/nccl-healthcheck-8G-latency-ms"
 
-K_ADD_LABEL_FORMAT = "{k} label node %s %s=%s --overwrite".format(k=KUBECTL)
-K_TAINT_NODE_FORMAT = "{k} taint node %s %s=%s:%s".format(k=KUBECTL)
-K_REMOVE_TAINT_NODE_FORMAT = "{k} taint node %s %s-".format(k=KUBECTL)
 K_DELETE_SERVICE_FORMAT = "{k} delete svc %s".format(k=KUBECTL)
 
 _NCCL_RESULT_LENGTH = 13
 _NCCL_RESULT_MESSAGE_SIZE_INDEX = 0
 _NCCL_RESULT_TYPE_INDEX = 2
+_NCCL_RESULT_OUT_OF_PLACE_BW_INDEX = 7
 _NCCL_RESULT_IN_PLACE_BW_INDEX = 11
 _NCCL_RESULTS_IN_PLACE_TIME_INDEX = 9
 _NO_BANDWIDTH_VALUE = -1
 
+# A run is stopped early once the in-place bus bandwidth of a message size of
+# at least EARLY_ABORT_MIN_MESSAGE_SIZE bytes is below this share of the
+# bandwidth threshold, since averaging it with more results can't pass.
+_EARLY_ABORT_ENABLED = os.environ.get("EARLY_ABORT_ENABLED", "true").lower()
+_EARLY_ABORT_BANDWIDTH_RATIO = os.environ.get(
+    "EARLY_ABORT_BANDWIDTH_RATIO", "0.5"
+)
+_EARLY_ABORT_MIN_MESSAGE_SIZE = os.environ.get(
+    "EARLY_ABORT_MIN_MESSAGE_SIZE", "1073741824"
+)
+
+# In adaptive mode the test runs at least MIN_TEST_ITERATIONS and at most
+# MAX_TEST_ITERATIONS times, stopping as soon as the 95% confidence interval of
+# the average bus bandwidth is entirely above or below the threshold.
+_ADAPTIVE_ITERATIONS = os.environ.get("ADAPTIVE_ITERATIONS", "false").lower()
+_MIN_TEST_ITERATIONS = os.environ.get("MIN_TEST_ITERATIONS", "2")
+_MAX_TEST_ITERATIONS = os.environ.get("MAX_TEST_ITERATIONS", "10")
+
+# Runs all test iterations as cycles (nccl-tests `-N`) of a single launch, so
+# MPI bootstrap, plugin loading and communicator init are paid only once.
+_SINGLE_LAUNCH = os.environ.get("SINGLE_LAUNCH", "false").lower()
+
+# Optional verdict on the distribution across iterations: the 5th percentile of
+# the average bus bandwidth must reach this share of the threshold, and the
+# coefficient of variation of any bandwidth metric must stay below this value.
+# Empty disables the check.
+_MIN_P5_BANDWIDTH_RATIO = os.environ.get("MIN_P5_BANDWIDTH_RATIO", "")
+_MAX_BANDWIDTH_CV = os.environ.get("MAX_BANDWIDTH_CV", "")
+
+# Two-sided 95% critical values of Student's t distribution by degrees of
+# freedom; larger samples use the normal approximation.
+_T_CRITICAL_95 = {
+    1: 12.706,
+    2: 4.303,
+    3: 3.182,
+    4: 2.776,
+    5: 2.571,
+    6: 2.447,
+    7: 2.365,
+    8: 2.306,
+    9: 2.262,
+    10: 2.228,
+    15: 2.131,
+    20: 2.086,
+    30: 2.042,
+}
+
 WORKLOAD_TERMINATE_FILE = "/usr/share/nemo/workload_terminated"
 
+# How long the master waits at the end of the test for workers that haven't
+# connected to the rendezvous yet before falling back to ssh.
+_RENDEZVOUS_READY_TIMEOUT_SECONDS = 60
+_RENDEZVOUS_DONE_MESSAGE = "done"
+
 _NCCL_LABELS_TO_REMOVE = [
     # Time label is not removed since if the test fails then the time remains.
     _NCCL_BENCHMARK_KEY,
@@ -111,15 +165,29 @@ class NcclResult:
   """Class for storing the results for a single message size in a NCCL test."""
 
   message_size: str
-  in_place_bw: int
-  in_place_time: int
+  in_place_bw: float
+  in_place_time: float
+
+
+@dataclasses.dataclass
+class NcclCycle:
+  """Class for storing the rows of one message size sweep of a NCCL test."""
+
+  # NcclResult objects for the message sizes that are labeled.
+  results: list[NcclResult] = dataclasses.field(default_factory=list)
+  # Out-of-place and in-place bus bandwidths of every message size.
+  bus_bandwidths: list[float] = dataclasses.field(default_factory=list)
+  # In-place bus bandwidths of the large message sizes.
+  large_message_bandwidths: list[float] = dataclasses.field(
+      default_factory=list
+  )
 
 
 @dataclasses.dataclass
 class NcclResults:
   """Class for storing the results of a nccl tests."""
 
-  avg_bandwidth: int
+  avg_bandwidth: float
   # List of NcclResult objects, one for each message size.
   results: list[NcclResult]
   success: bool
@@ -183,12 +251,18 @@ def get_host_list(
     hosts.append(os.environ["NODE_NAME"])
     return hosts
 
-  for i in range(nhosts):
-    pod_name = f"{JOB_NAME}-{i}.{SERVICE_NAME}"
-    host_name = get_host_name(pod_name)
-    if host_name:
-      hosts.append(host_name)
-      print(f"Got host information from pod: {pod_name} on host {host_name}")
+  pod_names = [f"{JOB_NAME}-{i}.{SERVICE_NAME}" for i in range(nhosts)]
+  # All pods are queried at once and share one timeout, so discovery takes
+  # as long as the slowest pod instead of the sum over all of them.
+  start_time = int(time.time())
+  with futures.ThreadPoolExecutor(max_workers=nhosts) as executor:
+    host_names = executor.map(
+        lambda pod_name: get_host_name(pod_name, start_time), pod_names
+    )
+    for pod_name, host_name in zip(pod_names, host_names):
+      if host_name:
+        hosts.append(host_name)
+        print(f"Got host information from pod: {pod_name} on host {host_name}")
 
   return hosts
 
@@ -217,7 +291,11 @@ def create_hostfile(
 def run_nccl_test(
     hosts: list[str],
 ) -> None:
-  """Run the NCCL test."""
+  """Run the NCCL test.
+
+  Secondary nodes wait until the master releases them through the rendezvous
+  (or /master.done if the master can't be reached).
+  """
   nhosts = len(hosts)
   config_obj = config.get_config(INSTANCE_TYPE)
   if JOB_INDEX == 0:  # master node
@@ -229,32 +307,62 @@ def run_nccl_test(
     nccl_operation_iterations = int(os.getenv("ITERATIONS", "300"))
     # Number of times the test will run (a bandwidth for each)
     test_iterations = int(os.getenv("TEST_ITERATIONS", "5"))
+    adaptive = _ADAPTIVE_ITERATIONS == "true"
+    if adaptive:
+      test_iterations = int(_MAX_TEST_ITERATIONS)
     ld_library_path = config_obj.ld_library_path
 
-    bandwidths = []
-    # Run the test 'iter' amount of times and average the performance.
-    for _ in range(test_iterations):
-      test_result = checker_common.run_command(
-          config_obj.nccl_test_command_template.format(
-              ld_library_path=ld_library_path,
-              start_message_size=start_message_size,
-              end_message_size=end_message_size,
-              nhosts=nhosts,
-              iterations=nccl_operation_iterations,
-              benchmark=BENCHMARK,
-          )
+    bandwidth_threshold = int(os.environ["BANDWIDTH_THRESHOLD"])
+
+    early_abort_threshold = (
+        bandwidth_threshold if _EARLY_ABORT_ENABLED == "true" else None
+    )
+
+    def _command(run_cycles: int) -> str:
+      return config_obj.nccl_test_command_template.format(
+          ld_library_path=ld_library_path,
+          start_message_size=start_message_size,
+          end_message_size=end_message_size,
+          nhosts=nhosts,
+          iterations=nccl_operation_iterations,
+          benchmark=BENCHMARK,
+          run_cycles=run_cycles,
       )
-      # [dict[str, float]] - array of labels(message size + avg) to bandwidth
-      bandwidths.append(parse_nccl_result(test_result.stdout))
+
+    if _SINGLE_LAUNCH == "true":
+      bandwidths = run_nccl_test_cycles(
+          _command(test_iterations),
+          NcclResultParser(early_abort_threshold),
+          bandwidth_threshold if adaptive else None,
+      )
+    else:
+      bandwidths = []
+      # Run the test 'iter' amount of times and average the performance.
+      for iteration in range(test_iterations):
+        # Each size row is parsed as soon as the test prints it
+        parser = NcclResultParser(early_abort_threshold)
+        checker_common.run_command_streaming(_command(1), parser.feed)
+        bandwidths.append(parser.result())
+        if parser.aborted:
+          print(
+              "Bandwidth is far below the threshold, skipping the remaining"
+              f" {test_iterations - iteration - 1} test iterations"
+          )
+          break
+        if (
+            adaptive
+            and iteration + 1 >= int(_MIN_TEST_ITERATIONS)
+            and is_bandwidth_conclusive(bandwidths, bandwidth_threshold)
+        ):
+          print(f"Bandwidth is conclusive after {iteration + 1} iterations")
+          break
     process_test_result(
         test_results=bandwidths,
         nodes=hosts,
-        bandwidth_threshold=int(os.environ["BANDWIDTH_THRESHOLD"]),
+        bandwidth_threshold=bandwidth_threshold,
     )
   else:  # secondary nodes
-    while not os.path.exists("/master.done"):
-      print("waiting for master pod...")
-      time.sleep(5)
+    wait_for_master()
   # Create file to let tcpxo daemon to terminate, this only applies to A3
   # and A3+ machines which use rxdm.
   if INSTANCE_TYPE in (
@@ -299,7 +407,12 @@ def process_test_result(
 
   avg_bandwidth = averaged_metrics[_NCCL_AVG_BANDWIDTH_KEY]
   has_sufficient_bandwidth: bool = avg_bandwidth >= bandwidth_threshold
-  passed: bool = has_sufficient_bandwidth and has_acceptable_failure_rate
+  bandwidth_stats = compute_bandwidth_stats(test_results)
+  is_stable = is_bandwidth_stable(bandwidth_stats, bandwidth_threshold)
+  passed: bool = (
+      has_sufficient_bandwidth and has_acceptable_failure_rate and is_stable
+  )
+  avg_stats = bandwidth_stats.get(_NCCL_AVG_BANDWIDTH_KEY)
 
   checker_common.log_results(
       test_name=os.environ.get("TEST_NAME", "nccl"),
@@ -308,31 +421,42 @@ def process_test_result(
       workflow_id=os.environ.get("WORKFLOW_ID"),
       result_data={
           "avg_bus_bandwidth": avg_bandwidth,
+          "bus_bandwidth_stats": (
+              dataclasses.asdict(avg_stats) if avg_stats else None
+          ),
           "num_nodes": len(nodes),
           "all_nodes": sorted(nodes),
           "benchmark": BENCHMARK,
       },
   )
+  mutator = checker_common.NodeMutator()
   mark_all_nodes = os.environ.get("MARK_ALL_NODES", "true").lower()
   if mark_all_nodes == "true":
     # Adds the labels for all nodes.
     for node in nodes:
-      add_nccl_result_labels(node, averaged_metrics, passed, second_pass)
+      add_nccl_result_labels(
+          mutator, node, averaged_metrics, passed, second_pass
+      )
   else:
     # Only adds the labels for the node that is running the test.
     node_name = os.environ.get("NODE_NAME", "")
-    add_nccl_result_labels(node_name, averaged_metrics, passed, second_pass)
+    add_nccl_result_labels(
+        mutator, node_name, averaged_metrics, passed, second_pass
+    )
+  # All labels for all nodes are sent as one patch per node.
+  mutator.flush()
 
 
 def add_nccl_result_labels(
+    mutator: checker_common.NodeMutator,
     node: str,
     metrics: dict[str, int],
     passed: bool,
     second_pass: bool,
 ) -> None:
-  """Add NCCL result labels to nodes."""
-  add_healthcheck_time_label(node)
-  mark_node_bandwidth(node, metrics)
+  """Queue NCCL result labels for a node on the given mutator."""
+  add_healthcheck_time_label(mutator, node)
+  mark_node_bandwidth(mutator, node, metrics)
 
   # Either it passed or a second pass is needed
   terminal = second_pass or passed
@@ -347,15 +471,11 @@ def add_nccl_result_labels(
       result = "crash"
 
     # Pre-result label is used to determine if this run met criteria
-    checker_common.add_label(
-        node,
-        _NCCL_PRE_RESULT_KEY,
-        result,
-        K_ADD_LABEL_FORMAT,
-    )
+    mutator.set_label(node, _NCCL_PRE_RESULT_KEY, result)
 
 
 def mark_failed_node(
+    mutator: checker_common.NodeMutator,
     node: str,
     nodes: list[str],
     taint_value: str,
@@ -363,10 +483,8 @@ def mark_failed_node(
 ) -> None:
   """Mark a node as failed."""
   other_nodes = ",".join([n for n in nodes if n != node])
-  taint_node(node, TAINT_KEY, taint_value, taint_effect)
-  checker_common.add_label(
-      node, "aiinfra/nccl-healthcheck", other_nodes, K_ADD_LABEL_FORMAT
-  )
+  taint_node(mutator, node, TAINT_KEY, taint_value, taint_effect)
+  mutator.set_label(node, "aiinfra/nccl-healthcheck", other_nodes)
 
 
 def find_closest_power_of_2(n: float) -> float:
@@ -378,123 +496,427 @@ def find_closest_power_of_2(n: float) -> float:
   return 2 ** p
 
 
-def parse_nccl_result(test_result: str) -> NcclResults:
-  """Parse the NCCL test result for message size and bandwidth.
-
-  Args:
-    test_result (str): The test result to parse.
-
-  Returns:
-    NcclResults: The parsed NCCL test results.
-  """
-  lines = test_result.splitlines()
-  results = []
-  # Iterate through the data lines
-  for line in lines:
+class NcclResultParser:
+  """Parses NCCL test output one line at a time, as the test prints it."""
+
+  def __init__(self, bandwidth_threshold: int | None = None):
+    """Initializes the parser.
+
+    Args:
+      bandwidth_threshold (int | None): If set, feed reports the run as
+        hopeless once a large message size is far below this bandwidth.
+    """
+    self.bandwidth_threshold = bandwidth_threshold
+    self.results: list[NcclResult] = []
+    self.avg_bandwidth: float | None = None
+    self.aborted = False
+    # In-place bus bandwidths of the large message sizes seen so far
+    self._large_message_bandwidths: list[float] = []
+    # A new sweep starts whenever the message size stops growing
+    self._cycles: list[NcclCycle] = []
+    self._previous_size: int | None = None
+
+  @property
+  def completed_cycles(self) -> int:
+    """The number of message size sweeps that have finished."""
+    if self.avg_bandwidth is not None:
+      return len(self._cycles)
+    return max(len(self._cycles) - 1, 0)
+
+  def feed(self, line: str) -> bool:
+    """Parses one line of output.
+
+    Args:
+      line (str): The line to parse.
+
+    Returns:
+      bool: True if the run can't pass anymore and should be stopped.
+    """
     line = line.strip()
+    match = re.search(r"# Avg bus bandwidth\s*:\s*(\d+(?:\.\d+)?)", line)
+    if match:
+      self.avg_bandwidth = float(match.group(1))
+      print(f"Found bandwidth: {self.avg_bandwidth}")
+      return False
     if not line or line.startswith("#"):
       # Skip empty lines and comments
-      continue
+      return False
     chunks = line.split()
     if len(chunks) != _NCCL_RESULT_LENGTH:
-      continue
+      return False
     if chunks[_NCCL_RESULT_TYPE_INDEX] != "float":
       # If the type isn't float then this is not a valid line
-      continue
+      return False
     origianal_size = chunks[_NCCL_RESULT_MESSAGE_SIZE_INDEX]
+    message_size = int(float(origianal_size))
+    in_place_bw = float(chunks[_NCCL_RESULT_IN_PLACE_BW_INDEX])
+    if self._previous_size is None or message_size <= self._previous_size:
+      self._cycles.append(NcclCycle())
+    self._previous_size = message_size
+    cycle = self._cycles[-1]
+    cycle.bus_bandwidths.extend(
+        [float(chunks[_NCCL_RESULT_OUT_OF_PLACE_BW_INDEX]), in_place_bw]
+    )
+    if message_size >= int(_EARLY_ABORT_MIN_MESSAGE_SIZE):
+      cycle.large_message_bandwidths.append(in_place_bw)
+    self._check_hopeless(message_size, in_place_bw)
     size = str(find_closest_power_of_2(float(origianal_size)))
     print(f"reformatted the nccl resultsize from {origianal_size} to {size}")
     bandwidth_label = MESSAGE_SIZE_TO_BANDWIDTH_LABEL.get(size, None)
     latency_label = MESSAGE_SIZE_TO_LATENCY_LABEL.get(size, None)
-    if bandwidth_label is None and latency_label is None:
-      continue
-    # In-place bandwidth is in float format, convert it to int since our logic
-    # currently assumes ints
-    result = NcclResult(
-        message_size=size,
-        in_place_bw=int(float(chunks[_NCCL_RESULT_IN_PLACE_BW_INDEX])),
-        in_place_time=int(float(chunks[_NCCL_RESULTS_IN_PLACE_TIME_INDEX])),
+    if bandwidth_label is not None or latency_label is not None:
+      result = NcclResult(
+          message_size=size,
+          in_place_bw=in_place_bw,
+          in_place_time=float(chunks[_NCCL_RESULTS_IN_PLACE_TIME_INDEX]),
+      )
+      self.results.append(result)
+      cycle.results.append(result)
+    return self.aborted
+
+  def _check_hopeless(self, message_size: int, in_place_bw: float) -> None:
+    """Marks the run aborted if a large message size is far too slow."""
+    if self.bandwidth_threshold is None:
+      return
+    if message_size < int(_EARLY_ABORT_MIN_MESSAGE_SIZE):
+      return
+    self._large_message_bandwidths.append(in_place_bw)
+    cutoff = self.bandwidth_threshold * float(_EARLY_ABORT_BANDWIDTH_RATIO)
+    if in_place_bw < cutoff:
+      print(
+          f"Bandwidth {in_place_bw} at message size {message_size} is below"
+          f" {cutoff}, stopping the test early"
+      )
+      self.aborted = True
+
+  def result(self) -> NcclResults:
+    """Returns the results parsed so far.
+
+    A run stopped early has no average bus bandwidth line, so the average of
+    the large message sizes seen is used instead. It still counts as a
+    successful run, so the node fails on bandwidth rather than as a crash.
+    """
+    if self.avg_bandwidth is not None:
+      bandwidth = self.avg_bandwidth
+      success = True
+    elif self.aborted:
+      bandwidth = statistics.fmean(self._large_message_bandwidths)
+      success = True
+    else:
+      bandwidth = _NO_BANDWIDTH_VALUE
+      success = False
+
+    print(f"results: {self.results}")
+    return NcclResults(
+        avg_bandwidth=bandwidth,
+        results=self.results,
+        success=success,
     )
-    results.append(result)
-
-  # Extract the average bus bandwidth from the test result
-  match = re.search(r"# Avg bus bandwidth\s*:\s*(\d+)", test_result)
-  if match:
-    bandwidth = int(match.group(1))
-    print(f"Found bandwidth: {bandwidth}")
-    success = True
+
+  def cycle_results(self) -> list[NcclResults]:
+    """Returns the results of each message size sweep parsed so far.
+
+    nccl-tests prints a single average bus bandwidth for all cycles, so the
+    average of a cycle is computed from its rows the same way nccl-tests
+    does. A cycle stopped early as hopeless uses its large message sizes, and
+    any other unfinished cycle counts as a failed iteration.
+    """
+    if len(self._cycles) == 1 and self.avg_bandwidth is not None:
+      return [self.result()]
+    cycle_results = []
+    for index, cycle in enumerate(self._cycles):
+      finished = index < self.completed_cycles
+      if finished and cycle.bus_bandwidths:
+        bandwidths = cycle.bus_bandwidths
+      elif self.aborted and cycle.large_message_bandwidths:
+        bandwidths = cycle.large_message_bandwidths
+      else:
+        bandwidths = []
+      cycle_results.append(
+          NcclResults(
+              avg_bandwidth=(
+                  statistics.fmean(bandwidths)
+                  if bandwidths
+                  else _NO_BANDWIDTH_VALUE
+              ),
+              results=cycle.results,
+              success=bool(bandwidths),
+          )
+      )
+    if not cycle_results:
+      cycle_results.append(self.result())
+    return cycle_results
+
+
+def parse_nccl_result(test_result: str) -> NcclResults:
+  """Parse the NCCL test result for message size and bandwidth.
+
+  Args:
+    test_result (str): The test result to parse.
+
+  Returns:
+    NcclResults: The parsed NCCL test results.
+  """
+  parser = NcclResultParser()
+  for line in test_result.splitlines():
+    parser.feed(line)
+  return parser.result()
+
+
+def run_nccl_test_cycles(
+    command: str,
+    parser: NcclResultParser,
+    adaptive_threshold: int | None,
+) -> list[NcclResults]:
+  """Runs all test iterations as cycles of a single NCCL test launch.
+
+  Args:
+    command (str): The NCCL test command, set up to run every cycle.
+    parser (NcclResultParser): The parser to feed the output to.
+    adaptive_threshold (int | None): If set, the launch is stopped once
+      MIN_TEST_ITERATIONS cycles are done and the bandwidth is conclusive
+      against this threshold.
+
+  Returns:
+    list[NcclResults]: The results of each finished (or aborted) cycle.
+  """
+  checked_cycles = 0
+  conclusive = False
+
+  def _on_line(line: str) -> bool:
+    nonlocal checked_cycles, conclusive
+    if parser.feed(line):
+      return True
+    if adaptive_threshold is None or parser.completed_cycles == checked_cycles:
+      return False
+    checked_cycles = parser.completed_cycles
+    conclusive = checked_cycles >= int(
+        _MIN_TEST_ITERATIONS
+    ) and is_bandwidth_conclusive(
+        parser.cycle_results()[:checked_cycles], adaptive_threshold
+    )
+    if conclusive:
+      print(f"Bandwidth is conclusive after {checked_cycles} iterations")
+    return conclusive
+
+  checker_common.run_command_streaming(command, _on_line)
+  cycle_results = parser.cycle_results()
+  if parser.aborted:
+    print("Bandwidth is far below the threshold, skipped the remaining cycles")
+  elif conclusive:
+    # The cycle that was running when the launch was stopped is incomplete
+    cycle_results = cycle_results[:checked_cycles]
+  return cycle_results
+
+
+def bandwidth_confidence_interval(
+    bandwidths: list[float],
+) -> tuple[float, float]:
+  """Returns the 95% confidence interval of the mean bandwidth.
+
+  Args:
+    bandwidths (list[float]): The average bus bandwidth of each iteration.
+
+  Returns:
+    tuple[float, float]: The lower and upper bound of the interval, unbounded
+    with fewer than two samples.
+  """
+  if len(bandwidths) < 2:
+    return -math.inf, math.inf
+  mean = statistics.fmean(bandwidths)
+  degrees_of_freedom = len(bandwidths) - 1
+  if degrees_of_freedom > max(_T_CRITICAL_95):
+    t_critical = 1.96
   else:
-    bandwidth = _NO_BANDWIDTH_VALUE
-    success = False
+    # Round down to the nearest tabulated value, which is conservative
+    t_critical = _T_CRITICAL_95[
+        max(df for df in _T_CRITICAL_95 if df <= degrees_of_freedom)
+    ]
+  half_width = t_critical * statistics.stdev(bandwidths) / math.sqrt(
+      len(bandwidths)
+  )
+  return mean - half_width, mean + half_width
+
+
+def is_bandwidth_conclusive(
+    test_results: list[NcclResults],
+    bandwidth_threshold: int,
+) -> bool:
+  """Whether the iterations so far clearly pass or fail the threshold.
+
+  Args:
+    test_results (list[NcclResults]): The results of the iterations so far.
+    bandwidth_threshold (int): The threshold for the average bandwidth.
 
-  nccl_results = NcclResults(
-      avg_bandwidth=bandwidth,
-      results=results,
-      success=success,
+  Returns:
+    bool: True if the confidence interval of the average bus bandwidth of the
+    successful iterations doesn't contain the threshold.
+  """
+  bandwidths = [
+      float(result.avg_bandwidth) for result in test_results if result.success
+  ]
+  low, high = bandwidth_confidence_interval(bandwidths)
+  print(
+      f"Average bus bandwidth 95% confidence interval: [{low:.1f}, {high:.1f}]"
   )
-  print(f"results: {results}")
-  return nccl_results
+  return low > bandwidth_threshold or high < bandwidth_threshold
+
+
+@dataclasses.dataclass
+class BandwidthStats:
+  """Class for storing the distribution of a metric across test iterations."""
+
+  mean: float
+  p5: float
+  p50: float
+  p95: float
+  # Coefficient of variation (standard deviation / mean)
+  cv: float
+
+
+def collect_metric_samples(
+    test_results: list[NcclResults],
+) -> tuple[list[str], npt.NDArray[np.float64]]:
+  """Collects the metrics of each successful iteration into one array.
+
+  Args:
+    test_results: The results of each test iteration.
+
+  Returns:
+    The metric labels, and an (iterations x labels) array of their values
+    with NaN where an iteration didn't report a metric.
+  """
+  successful = [result for result in test_results if result.success]
+  labels = [_NCCL_AVG_BANDWIDTH_KEY]
+  label_index = {_NCCL_AVG_BANDWIDTH_KEY: 0}
+  entries = []
+  for row, nccl_results in enumerate(successful):
+    entries.append((row, 0, nccl_results.avg_bandwidth))
+    for result in nccl_results.results:
+      for label, value in (
+          (
+              MESSAGE_SIZE_TO_BANDWIDTH_LABEL.get(result.message_size),
+              result.in_place_bw,
+          ),
+          (
+              MESSAGE_SIZE_TO_LATENCY_LABEL.get(result.message_size),
+              result.in_place_time,
+          ),
+      ):
+        if label is None:
+          continue
+        if label not in label_index:
+          label_index[label] = len(labels)
+          labels.append(label)
+        entries.append((row, label_index[label], value))
+
+  samples = np.full((len(successful), len(labels)), np.nan)
+  if entries:
+    rows, columns, values = zip(*entries)
+    samples[list(rows), list(columns)] = values
+  return labels, samples
 
 
 def compute_metrics(
     test_results: list[NcclResults],
 ) -> dict[str, int]:
   """Compute the metrics for each message size."""
-  # Compute the metrics for each message size.
-  # The metrics is a tuple of iterations and total value (Bandwidth or Latency)
-  metrics: dict[str, tuple[int, int]] = collections.defaultdict(lambda: (0, 0))
-  for nccl_results in test_results:
-    # If the tests was not success don't include in bandwidth calculation
-    if not nccl_results.success:
-      continue
-    # Update the average bandwidth
-    update_metrics(metrics, _NCCL_AVG_BANDWIDTH_KEY, nccl_results.avg_bandwidth)
-    # Update the bandwidths for each message size
-    for result in nccl_results.results:
-      bandwidth_label = MESSAGE_SIZE_TO_BANDWIDTH_LABEL.get(
-          result.message_size, None
-      )
-      if bandwidth_label is not None:
-        update_metrics(metrics, bandwidth_label, result.in_place_bw)
-      latency_label = MESSAGE_SIZE_TO_LATENCY_LABEL.get(
-          result.message_size, None
+  labels, samples = collect_metric_samples(test_results)
+  # Average the metrics across all the iterations. Labels only hold ints.
+  means = np.nanmean(samples, axis=0)
+  return {
+      label: int(mean)
+      for label, mean in zip(labels, means)
+      if not np.isnan(mean)
+  }
+
+
+def compute_bandwidth_stats(
+    test_results: list[NcclResults],
+) -> dict[str, BandwidthStats]:
+  """Compute the distribution of each bandwidth metric across iterations.
+
+  Args:
+    test_results: The results of each test iteration.
+
+  Returns:
+    The mean, percentiles and coefficient of variation of the average bus
+    bandwidth and of each message size's bandwidth.
+  """
+  labels, samples = collect_metric_samples(test_results)
+  bandwidth_labels = {_NCCL_AVG_BANDWIDTH_KEY}
+  bandwidth_labels.update(MESSAGE_SIZE_TO_BANDWIDTH_LABEL.values())
+  columns = [i for i, label in enumerate(labels) if label in bandwidth_labels]
+  samples = samples[:, columns]
+  # Metrics missing from every iteration would only produce NaN warnings
+  present = ~np.all(np.isnan(samples), axis=0)
+  columns = [column for column, ok in zip(columns, present) if ok]
+  samples = samples[:, present]
+  if not samples.size:
+    return {}
+
+  means = np.nanmean(samples, axis=0)
+  p5, p50, p95 = np.nanpercentile(samples, [5, 50, 95], axis=0)
+  with np.errstate(divide="ignore", invalid="ignore"):
+    cvs = np.where(means > 0, np.nanstd(samples, axis=0) / means, 0.0)
+  return {
+      labels[column]: BandwidthStats(
+          mean=float(means[i]),
+          p5=float(p5[i]),
+          p50=float(p50[i]),
+          p95=float(p95[i]),
+          cv=float(cvs[i]),
       )
-      if latency_label is not None:
-        update_metrics(metrics, latency_label, result.in_place_time)
+      for i, column in enumerate(columns)
+  }
 
-  # Average the metrics across all the iterations.
-  averaged_metrics = {}
-  for label, metric in metrics.items():
-    averaged_metrics[label] = int(metric[1] / metric[0])
 
-  return averaged_metrics
+def is_bandwidth_stable(
+    bandwidth_stats: dict[str, BandwidthStats],
+    bandwidth_threshold: int,
+) -> bool:
+  """Whether the tail bandwidth and jitter across iterations are acceptable.
 
+  Args:
+    bandwidth_stats: The distribution of each bandwidth metric.
+    bandwidth_threshold: The threshold for the average bandwidth.
 
-def update_metrics(
-    metrics: dict[str, tuple[int, int]],
-    label: str,
-    value: int,
-) -> None:
-  """Update the metrics for a given label."""
-  count, total = metrics[label]
-  total += value
-  count += 1
-  metrics[label] = (count, total)
+  Returns:
+    False if the 5th percentile of the average bus bandwidth is below
+    MIN_P5_BANDWIDTH_RATIO of the threshold or any bandwidth metric varies
+    more than MAX_BANDWIDTH_CV, when those checks are set.
+  """
+  stable = True
+  avg_stats = bandwidth_stats.get(_NCCL_AVG_BANDWIDTH_KEY)
+  if _MIN_P5_BANDWIDTH_RATIO and avg_stats is not None:
+    min_p5 = bandwidth_threshold * float(_MIN_P5_BANDWIDTH_RATIO)
+    if avg_stats.p5 < min_p5:
+      print(f"Bandwidth p5 {avg_stats.p5:.1f} is below {min_p5:.1f}")
+      stable = False
+  if _MAX_BANDWIDTH_CV:
+    for label, stats in bandwidth_stats.items():
+      if stats.cv > float(_MAX_BANDWIDTH_CV):
+        print(f"{label} varies too much across iterations: cv {stats.cv:.3f}")
+        stable = False
+  return stable
 
 
 def get_host_name(
     pod_name: str,
+    start_time: int | None = None,
 ) -> str:
   """Retrieve the host name where the specified pod is running.
 
   Args:
     pod_name (str): The name of the pod for which the host name is to be
       retrieved.
+    start_time (int | None): When the timeout starts. Defaults to now.
 
   Returns:
   str: The host name where the pod is running.
   """
-  start_time = int(time.time())
+  if start_time is None:
+    start_time = int(time.time())
 
   while timeout_check(start_time, pod_name):
     result = checker_common.run_command(
@@ -539,6 +961,7 @@ def timeout_check(
 
 
 def taint_node(
+    mutator: checker_common.NodeMutator,
     node_name: str,
     key: str,
     value: str,
@@ -547,29 +970,30 @@ def taint_node(
   """Apply a taint to a specified node with given key, value, and effect.
 
   Args:
+    mutator (NodeMutator): The mutator to queue the taint on.
     node_name (str): The name of the node to be tainted.
     key (str): The taint key to be set.
     value (str): The taint value to be set.
     effect (str): The effect of the taint (e.g., "NoExecute", "NoSchedule").
   """
-  print("adding taint %s=%s to node %s" % (key, value, node_name))
   if os.environ.get("DRY_RUN") != "true":
-    checker_common.run_command(
-        K_TAINT_NODE_FORMAT % (node_name, key, value, effect)
+    mutator.add_taint(node_name, key, value, effect)
+  else:
+    print(
+        "dry run, not adding taint %s=%s to node %s" % (key, value, node_name)
     )
 
 
 def remove_node_taint(
+    mutator: checker_common.NodeMutator,
     node_name: str,
     taint_key: str,
 ) -> None:
-  print("removing taint %s from node %s" % (taint_key, node_name))
-  checker_common.run_command(
-      K_REMOVE_TAINT_NODE_FORMAT % (node_name, taint_key)
-  )
+  mutator.remove_taint(node_name, taint_key)
 
 
 def add_healthcheck_time_label(
+    mutator: checker_common.NodeMutator,
     node_name: str,
     node_label: str = HEALTHCHECK_TIME_LABEL_KEY,
     time_value: int | None = None,
@@ -577,42 +1001,29 @@ def add_healthcheck_time_label(
   """Add healthcheck time label to node."""
   if time_value is None:
     time_value = int(time.time())
-  checker_common.add_label(
-      node_name,
-      node_label,
-      f"{time_value}",
-      K_ADD_LABEL_FORMAT,
-  )
+  mutator.set_label(node_name, node_label, f"{time_value}")
 
 
 def mark_node_bandwidth(
+    mutator: checker_common.NodeMutator,
     node: str,
     bandwidths: dict[str, int],
 ) -> None:
   """Mark the node bandwidth achieved during the test along with the benchmark.
 
   Args:
+    mutator (NodeMutator): The mutator to queue the labels on.
     node (str): The name of the node to be labeled.
     bandwidths (dict[str, int]): The bandwidths achieved during the test.
   """
   for label, bandwidth in bandwidths.items():
     if bandwidth == _NO_BANDWIDTH_VALUE:
       bandwidth = None
-    checker_common.add_label(
-        node,
-        label,
-        f"{str(bandwidth):>02}",
-        K_ADD_LABEL_FORMAT,
-        print_output=False,
-    )
+    mutator.set_label(node, label, f"{str(bandwidth):>02}", print_output=False)
 
   # Add benchmark label
-  checker_common.add_label(
-      node,
-      _NCCL_BENCHMARK_KEY,
-      f"{BENCHMARK}",
-      K_ADD_LABEL_FORMAT,
-      print_output=False,
+  mutator.set_label(
+      node, _NCCL_BENCHMARK_KEY, f"{BENCHMARK}", print_output=False
   )
 
 
@@ -620,17 +1031,72 @@ def remove_nccl_labels(
     node_name: str,
 ) -> None:
   """Remove all nccl labels from a the node to ensure no previous labels are mistaken for the current test."""
+  mutator = checker_common.NodeMutator()
   for label in _NCCL_LABELS_TO_REMOVE:
-    checker_common.remove_label(node_name, label, KUBECTL)
+    mutator.remove_label(node_name, label)
+  mutator.flush()
+
+
+def start_rendezvous_server(
+    num_workers: int,
+) -> rendezvous.RendezvousServer | None:
+  """Start the master's rendezvous server for the secondary nodes.
+
+  Args:
+    num_workers (int): The number of secondary nodes.
+
+  Returns:
+    RendezvousServer | None: The running server, or None if it couldn't be
+    started and secondary nodes must be released over ssh.
+  """
+  server = rendezvous.RendezvousServer(num_workers)
+  try:
+    server.start()
+  except OSError as e:
+    print(f"Failed to start rendezvous server, falling back to ssh: {e}")
+    return None
+  return server
+
+
+def wait_for_master() -> None:
+  """Wait until the master releases this secondary node."""
+  client = rendezvous.RendezvousClient(f"{JOB_NAME}-0.{SERVICE_NAME}")
+  if client.connect(str(JOB_INDEX)):
+    released = client.wait_for(_RENDEZVOUS_DONE_MESSAGE)
+    client.close()
+    if released:
+      return
+    # Workers that connected too late are released over ssh instead
+    print("lost connection to master pod")
+  while not os.path.exists("/master.done"):
+    print("waiting for master pod...")
+    time.sleep(5)
 
 
 def cleanup(
     hosts: list[str],
+    server: rendezvous.RendezvousServer | None = None,
 ) -> None:
-  """Clean up any additional resources deployed to the cluster."""
+  """Clean up any additional resources deployed to the cluster.
+
+  Args:
+    hosts (list[str]): The hosts of the test.
+    server (RendezvousServer | None): The master's rendezvous server. Workers
+      that aren't connected to it are released over ssh.
+  """
   print("Running cleanup commands.")
   if JOB_INDEX == 0:
-    for i in range(len(hosts)):
+    ready_workers = set()
+    if server is not None:
+      ready_workers = set(
+          server.wait_for_workers(_RENDEZVOUS_READY_TIMEOUT_SECONDS)
+      )
+      # Releases all connected workers at once
+      server.notify(_RENDEZVOUS_DONE_MESSAGE)
+      server.close()
+    for i in range(1, len(hosts)):
+      if str(i) in ready_workers:
+        continue
       checker_common.run_command(
           f"ssh {JOB_NAME}-{i}.{SERVICE_NAME} -p 222 -- touch /master.done",
       )
@@ -647,12 +1113,16 @@ def main() -> None:
 
   nhosts = int(os.environ["NHOSTS"])
   nr = os.environ["nr"]
+  # Started early so secondary nodes can connect while hosts are discovered
+  server = None
+  if JOB_INDEX == 0 and nhosts > 1:
+    server = start_rendezvous_server(nhosts - 1)
   with open("/host.name", "w") as f:
     f.write(node_name)
   hosts = get_host_list(nhosts)
   create_hostfile(hosts, nr)
   run_nccl_test(hosts)
-  cleanup(hosts)
+  cleanup(hosts, server)
 
   print("my job is done")
 
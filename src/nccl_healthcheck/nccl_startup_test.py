@@ -0,0 +1,319 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for nccl_startup."""
+
+import math
+
+from absl.testing import absltest
+
+import nccl_startup
+
+
+def _result_line(message_size: int, in_place_bw: float) -> str:
+  """Returns an all_reduce_perf result line with the given in-place busbw."""
+  return (
+      f"  {message_size}  {message_size // 4}  float  sum  -1"
+      f"  1000.0  200.00  {in_place_bw}  0"
+      f"  1200.0  180.00  {in_place_bw}  0"
+  )
+
+
+class NcclResultParserTest(absltest.TestCase):
+
+  def test_parses_full_run(self):
+    parser = nccl_startup.NcclResultParser()
+
+    for line in [
+        "# nThread 1 nGpus 8 minBytes 1024 maxBytes 8589934592",
+        "",
+        _result_line(4194304, 45.5),
+        _result_line(1073741824, 190.2),
+        "# Out of bounds values : 0 OK",
+        "# Avg bus bandwidth    : 150 ",
+    ]:
+      self.assertFalse(parser.feed(line))
+    result = parser.result()
+
+    self.assertTrue(result.success)
+    self.assertEqual(result.avg_bandwidth, 150)
+    self.assertEqual(
+        [
+            (r.message_size, r.in_place_bw, r.in_place_time)
+            for r in result.results
+        ],
+        [("4194304", 45.5, 1200.0), ("1073741824", 190.2, 1200.0)],
+    )
+
+  def test_ignores_lines_that_are_not_results(self):
+    parser = nccl_startup.NcclResultParser()
+
+    parser.feed("some log line from the launcher")
+    parser.feed("  4194304  1048576  int32  sum  -1  1  2  3  0  1  2  3  0")
+
+    self.assertEmpty(parser.result().results)
+
+  def test_run_without_average_is_a_crash(self):
+    parser = nccl_startup.NcclResultParser(bandwidth_threshold=100)
+
+    parser.feed(_result_line(4194304, 45.5))
+    result = parser.result()
+
+    self.assertFalse(result.success)
+    self.assertEqual(result.avg_bandwidth, nccl_startup._NO_BANDWIDTH_VALUE)
+
+  def test_stops_hopeless_run_early(self):
+    parser = nccl_startup.NcclResultParser(bandwidth_threshold=100)
+
+    # Small message sizes are slow even on healthy nodes
+    self.assertFalse(parser.feed(_result_line(4194304, 5.0)))
+    self.assertFalse(parser.feed(_result_line(1073741824, 80.0)))
+    self.assertTrue(parser.feed(_result_line(2147483648, 20.0)))
+    result = parser.result()
+
+    self.assertTrue(parser.aborted)
+    # Fails on the large message sizes' bandwidth rather than as a crash
+    self.assertTrue(result.success)
+    self.assertEqual(result.avg_bandwidth, 50)
+
+  def test_no_early_stop_without_threshold(self):
+    parser = nccl_startup.NcclResultParser()
+
+    self.assertFalse(parser.feed(_result_line(1073741824, 1.0)))
+    self.assertFalse(parser.aborted)
+
+  def test_parse_nccl_result_matches_parser(self):
+    output = "\n".join(
+        [_result_line(67108864, 120.7), "# Avg bus bandwidth    : 130"]
+    )
+
+    result = nccl_startup.parse_nccl_result(output)
+
+    self.assertEqual(result.avg_bandwidth, 130)
+    self.assertLen(result.results, 1)
+    self.assertEqual(result.results[0].message_size, "67108864")
+
+
+class CycleResultsTest(absltest.TestCase):
+
+  def _feed(self, parser, *bandwidths_by_cycle):
+    for bandwidths in bandwidths_by_cycle:
+      for message_size, bandwidth in zip((4194304, 1073741824), bandwidths):
+        parser.feed(_result_line(message_size, bandwidth))
+
+  def test_splits_output_into_cycles(self):
+    parser = nccl_startup.NcclResultParser()
+
+    self._feed(parser, (40.0, 160.0), (60.0, 200.0))
+    parser.feed("# Avg bus bandwidth    : 115")
+    results = parser.cycle_results()
+
+    self.assertEqual(parser.completed_cycles, 2)
+    self.assertEqual([r.avg_bandwidth for r in results], [100, 130])
+    self.assertTrue(all(r.success for r in results))
+    self.assertLen(results[1].results, 2)
+
+  def test_single_cycle_uses_reported_average(self):
+    parser = nccl_startup.NcclResultParser()
+
+    self._feed(parser, (40.0, 160.0))
+    parser.feed("# Avg bus bandwidth    : 99")
+
+    self.assertEqual([r.avg_bandwidth for r in parser.cycle_results()], [99])
+
+  def test_unfinished_cycle_is_a_failed_iteration(self):
+    parser = nccl_startup.NcclResultParser()
+
+    self._feed(parser, (40.0, 160.0), (60.0,))
+    results = parser.cycle_results()
+
+    self.assertEqual(parser.completed_cycles, 1)
+    self.assertEqual(
+        [(r.avg_bandwidth, r.success) for r in results],
+        [(100, True), (nccl_startup._NO_BANDWIDTH_VALUE, False)],
+    )
+
+  def test_hopeless_cycle_uses_large_message_sizes(self):
+    parser = nccl_startup.NcclResultParser(bandwidth_threshold=100)
+
+    self._feed(parser, (40.0, 160.0), (60.0, 20.0))
+    results = parser.cycle_results()
+
+    self.assertTrue(parser.aborted)
+    self.assertEqual(
+        [(r.avg_bandwidth, r.success) for r in results],
+        [(100, True), (20, True)],
+    )
+
+  def test_no_output_is_one_failed_iteration(self):
+    results = nccl_startup.NcclResultParser().cycle_results()
+
+    self.assertLen(results, 1)
+    self.assertFalse(results[0].success)
+
+
+def _run(avg_bandwidth: int, success: bool = True) -> nccl_startup.NcclResults:
+  return nccl_startup.NcclResults(
+      avg_bandwidth=avg_bandwidth, results=[], success=success
+  )
+
+
+class BandwidthConfidenceIntervalTest(absltest.TestCase):
+
+  def test_unbounded_with_fewer_than_two_samples(self):
+    for bandwidths in ([], [100.0]):
+      self.assertEqual(
+          nccl_startup.bandwidth_confidence_interval(bandwidths),
+          (-math.inf, math.inf),
+      )
+
+  def test_uses_t_value_for_degrees_of_freedom(self):
+    # Mean 11, standard error 1, so the half width is t(1) = 12.706
+    low, high = nccl_startup.bandwidth_confidence_interval([10.0, 12.0])
+
+    self.assertAlmostEqual(low, 11 - 12.706)
+    self.assertAlmostEqual(high, 11 + 12.706)
+
+  def test_rounds_down_to_tabulated_degrees_of_freedom(self):
+    # 12 samples have 11 degrees of freedom, which use the t value for 10
+    bandwidths = [100.0, 102.0] * 6
+    standard_error = 1.0 * math.sqrt(12 / 11) / math.sqrt(12)
+
+    low, high = nccl_startup.bandwidth_confidence_interval(bandwidths)
+
+    self.assertAlmostEqual(low, 101 - 2.228 * standard_error)
+    self.assertAlmostEqual(high, 101 + 2.228 * standard_error)
+
+  def test_normal_approximation_beyond_table(self):
+    bandwidths = [100.0, 102.0] * 20
+    standard_error = 1.0 * math.sqrt(40 / 39) / math.sqrt(40)
+
+    low, _ = nccl_startup.bandwidth_confidence_interval(bandwidths)
+
+    self.assertAlmostEqual(low, 101 - 1.96 * standard_error)
+
+  def test_identical_samples_have_no_width(self):
+    self.assertEqual(
+        nccl_startup.bandwidth_confidence_interval([150.0, 150.0, 150.0]),
+        (150.0, 150.0),
+    )
+
+
+class IsBandwidthConclusiveTest(absltest.TestCase):
+
+  def test_clear_pass(self):
+    self.assertTrue(
+        nccl_startup.is_bandwidth_conclusive(
+            [_run(180), _run(182), _run(181)], bandwidth_threshold=100
+        )
+    )
+
+  def test_clear_failure(self):
+    self.assertTrue(
+        nccl_startup.is_bandwidth_conclusive(
+            [_run(40), _run(42), _run(41)], bandwidth_threshold=100
+        )
+    )
+
+  def test_borderline_needs_more_samples(self):
+    self.assertFalse(
+        nccl_startup.is_bandwidth_conclusive(
+            [_run(95), _run(105), _run(100)], bandwidth_threshold=100
+        )
+    )
+
+  def test_single_sample_is_never_conclusive(self):
+    self.assertFalse(nccl_startup.is_bandwidth_conclusive([_run(180)], 100))
+
+  def test_ignores_failed_iterations(self):
+    results = [_run(180), _run(-1, success=False), _run(181)]
+
+    self.assertTrue(nccl_startup.is_bandwidth_conclusive(results, 100))
+
+
+def _iteration(
+    avg_bandwidth: int, bandwidth_4mib: int | None = None, success=True
+) -> nccl_startup.NcclResults:
+  results = []
+  if bandwidth_4mib is not None:
+    results.append(
+        nccl_startup.NcclResult(
+            message_size="4194304",
+            in_place_bw=bandwidth_4mib,
+            in_place_time=25,
+        )
+    )
+  return nccl_startup.NcclResults(
+      avg_bandwidth=avg_bandwidth, results=results, success=success
+  )
+
+
+class ComputeBandwidthStatsTest(absltest.TestCase):
+
+  def test_distribution_of_average_bandwidth(self):
+    stats = nccl_startup.compute_bandwidth_stats(
+        [_iteration(100), _iteration(200), _iteration(300)]
+    )
+
+    avg_stats = stats[nccl_startup._NCCL_AVG_BANDWIDTH_KEY]
+    self.assertAlmostEqual(avg_stats.mean, 200)
+    self.assertAlmostEqual(avg_stats.p5, 110)
+    self.assertAlmostEqual(avg_stats.p50, 200)
+    self.assertAlmostEqual(avg_stats.p95, 290)
+    self.assertAlmostEqual(avg_stats.cv, math.sqrt(20000 / 3) / 200)
+
+  def test_only_bandwidth_metrics_are_included(self):
+    stats = nccl_startup.compute_bandwidth_stats(
+        [_iteration(100, 40), _iteration(120, 60)]
+    )
+
+    self.assertCountEqual(
+        stats,
+        [
+            nccl_startup._NCCL_AVG_BANDWIDTH_KEY,
+            nccl_startup._NCCL_4MIB_BANDWIDTH_KEY,
+        ],
+    )
+    self.assertAlmostEqual(
+        stats[nccl_startup._NCCL_4MIB_BANDWIDTH_KEY].mean, 50
+    )
+
+  def test_ignores_missing_metrics_and_failed_iterations(self):
+    stats = nccl_startup.compute_bandwidth_stats([
+        _iteration(100, 40),
+        _iteration(120),
+        _iteration(-1, 5, success=False),
+    ])
+
+    self.assertAlmostEqual(
+        stats[nccl_startup._NCCL_AVG_BANDWIDTH_KEY].mean, 110
+    )
+    self.assertAlmostEqual(
+        stats[nccl_startup._NCCL_4MIB_BANDWIDTH_KEY].mean, 40
+    )
+
+  def test_zero_mean_has_no_variation(self):
+    stats = nccl_startup.compute_bandwidth_stats([_iteration(0), _iteration(0)])
+
+    self.assertEqual(stats[nccl_startup._NCCL_AVG_BANDWIDTH_KEY].cv, 0.0)
+
+  def test_no_successful_iterations(self):
+    self.assertEmpty(
+        nccl_startup.compute_bandwidth_stats([_iteration(-1, success=False)])
+    )
+    self.assertEmpty(nccl_startup.compute_bandwidth_stats([]))
+
+
+if __name__ == "__main__":
+  absltest.main()
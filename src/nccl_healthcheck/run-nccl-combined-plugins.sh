@@ -17,8 +17,8 @@
 set -x
 
 # Sample command to run the workload:
-#  /scripts/run-nccl-fastrak.sh ${collective_name}_perf "${LD_LIBRARY_PATH}" ${gpu_per_node} ${if_name_list} ${msg_min} ${msg_max} ${channel_per_gpu} ${num_node} ${num_iteration}
-#  e.g. /scripts/run-nccl-fastrak.sh all_gather_perf "${LD_LIBRARY_PATH}" 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8 1M 512M 3 2 10
+#  /scripts/run-nccl-fastrak.sh ${collective_name}_perf "${LD_LIBRARY_PATH}" ${gpu_per_node} ${if_name_list} ${msg_min} ${msg_max} ${channel_per_gpu} ${num_node} ${num_iteration} ${num_cycles}
+#  e.g. /scripts/run-nccl-fastrak.sh all_gather_perf "${LD_LIBRARY_PATH}" 8 eth1,eth2,eth3,eth4,eth5,eth6,eth7,eth8 1M 512M 3 2 10 1
 
 SCRIPT_DIR=$( cd -- "$( dirname -- "${BASH_SOURCE[0]}" )" &> /dev/null && pwd )
 
@@ -41,6 +41,11 @@ run_nccl_rdma() {
   if [[ -n "$9" ]]; then
     iter=$9
   fi
+  # Number of times the whole message size sweep runs within one launch
+  local run_cycles=1
+  if [[ -n "${10}" ]]; then
+    run_cycles=${10}
+  fi
 
   echo "Setting ulimit to 1048576"
   ulimit -n 1048576
@@ -57,7 +62,7 @@ run_nccl_rdma() {
     -x LD_LIBRARY_PATH -x PATH \
     $NCCL_FLAGS \
     /third_party/nccl-tests/build/"${benchmark}" \
-      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -w 50 --iters "${iter}" 2>&1 | \
+      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -N "${run_cycles}" -w 50 --iters "${iter}" 2>&1 | \
     tee "${benchmark}_${nhosts}_${gpu_per_node}_${socket_ifnames}_i${iter}.txt"
 }
 
@@ -79,6 +84,11 @@ run_nccl_fastrak_debian() {
   fi
   local -r num_channel=$((gpu_per_node*channels_per_gpu))
   local -r iter=20
+  # Number of times the whole message size sweep runs within one launch
+  local run_cycles=1
+  if [[ -n "${10}" ]]; then
+    run_cycles=${10}
+  fi
 
   echo "Sourcing ${NCCL_LIB_DIR}/nccl-env-profile.sh"
   source "${NCCL_LIB_DIR}/nccl-env-profile.sh"
@@ -137,7 +147,7 @@ run_nccl_fastrak_debian() {
     -x NCCL_GPUVIZ_GET_SCALE_SIZE_HISTOGRAM_IN_BYTES=1 \
     -x NCCL_FASTRAK_DUMP_COMM_STATS=0 \
     taskset -c 32-63 /third_party/nccl-tests-mpi/build/"${benchmark}" \
-      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -w 5 --iters "${iter}" 2>&1 | \
+      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -N "${run_cycles}" -w 5 --iters "${iter}" 2>&1 | \
     tee "${benchmark}_${nhosts}_${gpu_per_node}_${socket_ifnames}_i${iter}.txt"
 }
 
@@ -160,6 +170,11 @@ run_nccl_fastrak() {
   if [[ -n "$9" ]]; then
     iter=$9
   fi
+  # Number of times the whole message size sweep runs within one launch
+  local run_cycles=1
+  if [[ -n "${10}" ]]; then
+    run_cycles=${10}
+  fi
   local -r num_channel=$((gpu_per_node*channels_per_gpu))
   # Sourcing the nccl-env-profile.sh file to set the most up to date environment variables from nccl team.
   # NCCL_LIB_DIR="/usr/local/nvidia/lib64"
@@ -201,7 +216,7 @@ run_nccl_fastrak() {
     -x NCCL_SHIMNET_GUEST_CONFIG_CHECKER_CONFIG_FILE="/usr/local/nvidia/lib64/a3plus_guest_config.textproto" \
     -x NCCL_FASTRAK_PLUGIN_ACCEPT_TIMEOUT_MS=600000 \
     taskset -c 32-63 /third_party/nccl-tests-mpi/build/"${benchmark}" \
-      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -w 50 --iters "${iter}" 2>&1 | \
+      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -N "${run_cycles}" -w 50 --iters "${iter}" 2>&1 | \
     tee "${benchmark}_${nhosts}_${gpu_per_node}_${socket_ifnames}_i${iter}.txt"
 }
 
@@ -221,6 +236,11 @@ run_nccl_gpudirect() {
     channels_per_gpu=$8
   fi
   local -r iter=20
+  # Number of times the whole message size sweep runs within one launch
+  local run_cycles=1
+  if [[ -n "${10}" ]]; then
+    run_cycles=${10}
+  fi
 
   LD_LIBRARY_PATH=${ld_library_path_override} \
   mpirun --mca btl tcp,self --mca btl_tcp_if_include eth0 --allow-run-as-root \
@@ -247,7 +267,7 @@ run_nccl_gpudirect() {
     -x NCCL_GPUDIRECTTCPX_PROGRAM_FLOW_STEERING_WAIT_MICROS=1000000 \
     -x NCCL_GPUDIRECTTCPX_FORCE_ACK \
     /third_party/nccl-tests-mpi/build/"${benchmark}" \
-      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -w 5 --iters 20 2>&1 | \
+      -b "${data_b}" -e "${data_e}" -f 2 -g 1 -N "${run_cycles}" -w 5 --iters 20 2>&1 | \
     tee "${benchmark}_${nhosts}_${gpu_per_node}_${socket_ifnames}_i${iter}.txt"
 }
 
@@ -17,12 +17,19 @@
 This module control execution of neper test.
 """
 
+import collections
 from collections.abc import Callable
+from concurrent import futures
+import functools
+import glob
+import json
 import os
 import re
+import statistics
 import time
 
 import checker_common
+import rendezvous
 
 JOB_NAME = os.getenv("JOB_NAME")
 SERVICE_NAME = os.getenv("SERVICE_NAME")
@@ -34,10 +41,40 @@ TAINT_EFFECT = "NoSchedule"
 
 HEALTHCHECK_TIME_LABEL_KEY = "aiinfra/neper-healthcheck-runtime-sec"
 
-K_ADD_LABEL_FORMAT = "/scripts/kubectl label node %s %s=%s --overwrite"
-K_TAINT_NODE_FORMAT = "/scripts/kubectl taint node %s %s=%s:%s"
-K_REMOVE_LABEL_FORMAT = "/scripts/kubectl label node %s %s-"
-K_REMOVE_TAINT_NODE_FORMAT = "/scripts/kubectl taint node %s %s-"
+_RENDEZVOUS_READY_TIMEOUT_SECONDS = 60
+
+# Tests all NICs at the same time instead of one after another
+_PARALLEL_NICS = os.environ.get("PARALLEL_NICS", "false").lower()
+# Parallel tests use their own control and data port pair, starting here
+_NEPER_BASE_PORT = 12866
+# Used when the NIC's NUMA node can't be read from sysfs
+_DEFAULT_NEPER_CPUS = "17-24,73-80"
+
+# Number of pods in the job. With more than 2, pods are tested in a mesh
+_NHOSTS = os.environ.get("NHOSTS", "2")
+# Number of rounds of disjoint pairs in the mesh, each with new partners
+_MESH_ROUNDS = os.environ.get("MESH_ROUNDS", "3")
+# Each mesh round uses its own block of ports, so servers left over from a
+# failed test in an earlier round can't collide with the next one
+_MESH_ROUND_PORT_STRIDE = 32
+_MESH_MESSAGE_TIMEOUT_SECONDS = 15 * 60
+
+# Stops client tests early once their throughput is clearly good or bad
+_ADAPTIVE_TEST_LENGTH = os.environ.get("ADAPTIVE_TEST_LENGTH", "false").lower()
+_DEFAULT_TEST_LENGTH_SECONDS = 30
+# Adaptive tests run at least this long...
+_MIN_TEST_LENGTH_SECONDS = os.environ.get("MIN_TEST_LENGTH_SECONDS", "10")
+# ...and at most this long, so borderline links get a longer test
+_MAX_TEST_LENGTH_SECONDS = os.environ.get("MAX_TEST_LENGTH_SECONDS", "60")
+# The last samples may spread by at most this fraction of GOOD_THROUGHPUT...
+_THROUGHPUT_TOLERANCE = os.environ.get("THROUGHPUT_TOLERANCE", "0.05")
+# ...and their mean must be at least this fraction of GOOD_THROUGHPUT away
+# from it
+_THROUGHPUT_DECISION_MARGIN = os.environ.get(
+    "THROUGHPUT_DECISION_MARGIN", "0.2"
+)
+# Number of one second throughput samples that must agree to stop early
+_THROUGHPUT_WINDOW = 5
 
 
 def ensure_env_variables() -> None:
@@ -105,59 +142,649 @@ def run_neper_test(
 
   cleanup_functions = []
 
+  parallel = _PARALLEL_NICS == "true"
   if f"{JOB_NAME}-0" in POD_NAME:  # master node
     print("I am a master that will run neper test on 2 nodes")
 
     self_host = checker_common.run_command("cat /host.name").stdout
     log_files = []
 
-    for host, ips in hosts_to_ips.items():
-      print(f"Host: {host}")
-      count = 0
-      for dst_ip in ips:
-        count += 1
-        log_file = f"/tmp/{self_host}_{host}_eth{count}.log"
-        log_files.append(log_file)
-        checker_common.run_command(
-            "taskset -c 17-24,73-80 /scripts/tcp_stream -rw --client -H"
-            f" '{dst_ip}' --skip-rx-copy --num-threads=16 --num-flows=200"
-            f" --suicide-length=600 --test-length=30 > '{log_file}' 2>&1"
-        )
-        cleanup_functions.append(cleanup_delete_temp_files(log_file))
-
+    # The secondary node is released after each NIC's test through the
+    # rendezvous, or with /master{count}.done over ssh if it isn't connected
+    server = rendezvous.RendezvousServer(num_workers=1)
+    try:
+      server.start()
+      worker_ready = bool(
+          server.wait_for_workers(_RENDEZVOUS_READY_TIMEOUT_SECONDS)
+      )
+    except OSError as e:
+      print(f"Failed to start rendezvous server, falling back to ssh: {e}")
+      worker_ready = False
+    if not worker_ready:
+      # A late worker is refused and polls for the files instead
+      server.close()
+    cleanup_functions.append(server.close)
+
+    def release_worker(count: int) -> None:
+      if worker_ready:
+        server.notify(f"done {count}")
+      else:
         checker_common.run_command(
             f"ssh {JOB_NAME}-1.{SERVICE_NAME} -p 222 -- touch"
             f" /master{count}.done",
         )
+
+    local_ips = read_local_ip_addresses()
+    for host, ips in hosts_to_ips.items():
+      print(f"Host: {host}")
+      if parallel:
+        host_log_files = run_neper_clients_in_parallel(self_host, host, ips)
+        log_files.extend(host_log_files)
+        cleanup_functions.extend(
+            cleanup_delete_temp_files(log_file) for log_file in host_log_files
+        )
+        for count in range(1, len(ips) + 1):
+          release_worker(count)
+      else:
+        count = 0
+        for dst_ip in ips:
+          count += 1
+          log_file = f"/tmp/{self_host}_{host}_eth{count}.log"
+          log_files.append(log_file)
+          local_ip = local_ips[count - 1] if count <= len(local_ips) else None
+          cpus = get_nic_cpus(local_ip, shared=False)
+          run_neper_client(
+              f"taskset -c {cpus} /scripts/tcp_stream -rw --client -H"
+              f" '{dst_ip}' --skip-rx-copy --num-threads=16 --num-flows=200"
+              " --suicide-length=600"
+              f" --test-length={get_test_length()} > '{log_file}' 2>&1",
+              log_file,
+              local_ip,
+          )
+          cleanup_functions.append(cleanup_delete_temp_files(log_file))
+          release_worker(count)
       process_test_result(log_files, self_host, host)
   else:  # secondary nodes
+    if parallel:
+      # Servers for all NICs are listening before the master is told this
+      # node is ready
+      for _, ips in hosts_to_ips.items():
+        start_neper_servers(ips)
+    client = rendezvous.RendezvousClient(f"{JOB_NAME}-0.{SERVICE_NAME}")
+    connected = client.connect(POD_NAME)
+    cleanup_functions.append(client.close)
     for _, ips in hosts_to_ips.items():
       count = 0
       for dst_ip in ips:
         count += 1
-        print(f"spinning up neper server for {dst_ip}...")
-        checker_common.run_command(
-            "taskset -c 17-24,73-80 /scripts/tcp_stream -rw --skip-rx-copy "
-            "--num-threads=16 --num-flows=200 --suicide-length=600 "
-            "--test-length=30 &"
-        )
-        while not os.path.exists(f"/master{count}.done"):
-          print(f"test for {dst_ip} not done")
-          time.sleep(10)
+        if not parallel:
+          print(f"spinning up neper server for {dst_ip}...")
+          checker_common.run_command(
+              f"taskset -c {get_nic_cpus(dst_ip, shared=False)}"
+              " /scripts/tcp_stream -rw --skip-rx-copy --num-threads=16"
+              " --num-flows=200 --suicide-length=600"
+              f" --test-length={get_test_length()} &"
+          )
+        # Falls back to polling once the master can't be reached
+        connected = connected and client.wait_for(f"done {count}")
+        if not connected:
+          while not os.path.exists(f"/master{count}.done"):
+            print(f"test for {dst_ip} not done")
+            time.sleep(10)
+          cleanup_functions.append(
+              cleanup_delete_temp_files(f"/master{count}.done")
+          )
         print(f"test for {dst_ip} is done")
-        cleanup_functions.append(
-            cleanup_delete_temp_files(f"/master{count}.done")
-        )
 
   return cleanup_functions
 
 
+def start_neper_servers(
+    ips: list[str], base_port: int = _NEPER_BASE_PORT
+) -> None:
+  """Starts a neper server in the background for every local NIC.
+
+  Each server uses its own control and data ports and is pinned to its share
+  of the CPUs local to its NIC.
+
+  Args:
+    ips (list[str]): The IP addresses of this host's NICs.
+    base_port (int): The control port of the first NIC's server.
+  """
+  for count, dst_ip in enumerate(ips, start=1):
+    port = base_port + 2 * (count - 1)
+    print(f"spinning up neper server for {dst_ip} on port {port}...")
+    checker_common.run_command(
+        f"taskset -c {get_nic_cpus(dst_ip, shared=True)}"
+        " /scripts/tcp_stream -rw"
+        " --skip-rx-copy --num-threads=16 --num-flows=200"
+        f" --suicide-length=600 --test-length={get_test_length()}"
+        f" --control-port={port} --port={port + 1} &"
+    )
+
+
+def run_neper_clients_in_parallel(
+    self_host: str,
+    remote_host: str,
+    ips: list[str],
+    base_port: int = _NEPER_BASE_PORT,
+) -> list[str]:
+  """Runs a neper client against every NIC of the remote host at once.
+
+  Each client uses its own control and data ports, matching the server the
+  secondary node started for that NIC, and is pinned to its share of the CPUs
+  local to this host's NIC with the same index.
+
+  Args:
+    self_host (str): This host's name.
+    remote_host (str): The remote host's name.
+    ips (list[str]): The IP addresses of the remote host's NICs.
+    base_port (int): The control port of the first NIC's server.
+
+  Returns:
+    list[str]: The log file of each NIC's test, in NIC order.
+  """
+  local_ips = read_local_ip_addresses()
+  commands = []
+  log_files = []
+  client_ips = []
+  for count, dst_ip in enumerate(ips, start=1):
+    port = base_port + 2 * (count - 1)
+    local_ip = local_ips[count - 1] if count <= len(local_ips) else None
+    client_ips.append(local_ip)
+    log_file = f"/tmp/{self_host}_{remote_host}_eth{count}.log"
+    log_files.append(log_file)
+    commands.append(
+        f"taskset -c {get_nic_cpus(local_ip, shared=True)}"
+        f" /scripts/tcp_stream -rw --client -H '{dst_ip}' --skip-rx-copy"
+        " --num-threads=16"
+        " --num-flows=200 --suicide-length=600"
+        f" --test-length={get_test_length()}"
+        f" --control-port={port} --port={port + 1} > '{log_file}' 2>&1"
+    )
+  with futures.ThreadPoolExecutor(max_workers=len(commands) or 1) as executor:
+    list(executor.map(run_neper_client, commands, log_files, client_ips))
+  return log_files
+
+
+def get_test_length() -> int:
+  """Returns the --test-length of neper servers and clients, in seconds."""
+  if _ADAPTIVE_TEST_LENGTH == "true":
+    return int(_MAX_TEST_LENGTH_SECONDS)
+  return _DEFAULT_TEST_LENGTH_SECONDS
+
+
+def run_neper_client(
+    command: str, log_file: str, local_ip: str | None
+) -> None:
+  """Runs a neper client, stopping it early in adaptive mode.
+
+  neper only reports throughput once the test is over, so in adaptive mode
+  the byte counters of the local NIC are sampled every second while it runs.
+  The client is stopped once the samples of each direction agree on a
+  throughput far enough from GOOD_THROUGHPUT. Both throughputs are then
+  written to the log in neper's format. Borderline links run for the whole
+  MAX_TEST_LENGTH_SECONDS.
+
+  Args:
+    command (str): The client command, writing its output to log_file.
+    log_file (str): The log file of the test.
+    local_ip (str | None): The IP address of the local NIC under test.
+  """
+  interface = get_interface_name(local_ip) if local_ip else None
+  if _ADAPTIVE_TEST_LENGTH != "true" or interface is None:
+    checker_common.run_command(command)
+    return
+  counters = f"/sys/class/net/{interface}/statistics"
+  monitor = ThroughputMonitor(
+      threshold=int(os.environ["GOOD_THROUGHPUT"]),
+      min_seconds=float(_MIN_TEST_LENGTH_SECONDS),
+  )
+  # Prints a timestamp and the NIC's byte counters every second until the
+  # client exits
+  checker_common.run_command_streaming(
+      f"{command} & neper=$!; while kill -0 $neper 2>/dev/null; do echo"
+      f" $(date +%s.%N) $(cat {counters}/tx_bytes {counters}/rx_bytes);"
+      " sleep 1; done",
+      monitor.feed,
+      print_output=False,
+  )
+  if monitor.local_throughput is not None:
+    print(
+        f"neper test on {interface} stopped early at"
+        f" {monitor.local_throughput} bps received and"
+        f" {monitor.remote_throughput} bps sent"
+    )
+    with open(log_file, "a") as f:
+      f.write(f"local_throughput={monitor.local_throughput}\n")
+      f.write(f"remote_throughput={monitor.remote_throughput}\n")
+
+
+class ThroughputMonitor:
+  """Decides from NIC byte counter samples when a neper test is conclusive.
+
+  Each direction is measured on its own, as neper reports it: the bytes the
+  local NIC receives give the local throughput, and the bytes it sends, which
+  the remote NIC receives, give the remote throughput. The test is conclusive
+  once both directions are.
+  """
+
+  def __init__(self, threshold: int, min_seconds: float):
+    """Initializes the monitor.
+
+    Args:
+      threshold (int): GOOD_THROUGHPUT, in bits per second.
+      min_seconds (float): How long the test runs before it can be stopped.
+    """
+    self.threshold = threshold
+    self.min_seconds = min_seconds
+    # Set to the conclusive throughputs, in bits per second, once reached
+    self.local_throughput: int | None = None
+    self.remote_throughput: int | None = None
+    self._start_time: float | None = None
+    self._last_sample: tuple[float, int, int] | None = None
+    self._rx_samples: list[float] = []
+    self._tx_samples: list[float] = []
+
+  def feed(self, line: str) -> bool:
+    """Adds a "<timestamp> <tx bytes> <rx bytes>" sample.
+
+    Args:
+      line (str): A line of the counter sampling output.
+
+    Returns:
+      bool: True if the test is conclusive and can be stopped.
+    """
+    try:
+      timestamp, tx_bytes, rx_bytes = line.split()
+      sample = (float(timestamp), int(tx_bytes), int(rx_bytes))
+    except ValueError:
+      return False
+    last_sample, self._last_sample = self._last_sample, sample
+    if last_sample is None:
+      self._start_time = sample[0]
+      return False
+    elapsed = sample[0] - last_sample[0]
+    if elapsed <= 0:
+      return False
+    self._tx_samples.append((sample[1] - last_sample[1]) * 8 / elapsed)
+    self._rx_samples.append((sample[2] - last_sample[2]) * 8 / elapsed)
+    if sample[0] - self._start_time < self.min_seconds:
+      return False
+    local_throughput = self._conclusive_throughput(self._rx_samples)
+    remote_throughput = self._conclusive_throughput(self._tx_samples)
+    if local_throughput is None or remote_throughput is None:
+      return False
+    self.local_throughput = local_throughput
+    self.remote_throughput = remote_throughput
+    return True
+
+  def _conclusive_throughput(self, samples: list[float]) -> int | None:
+    """Returns the throughput of one direction, if it's conclusive.
+
+    Args:
+      samples (list[float]): The direction's throughput samples, in bits per
+        second.
+
+    Returns:
+      int | None: The mean of the last samples, if they're stable and far
+      enough from GOOD_THROUGHPUT, else None.
+    """
+    window = samples[-_THROUGHPUT_WINDOW:]
+    if len(window) < _THROUGHPUT_WINDOW:
+      return None
+    mean = statistics.fmean(window)
+    stable = (max(window) - min(window)) <= self.threshold * float(
+        _THROUGHPUT_TOLERANCE
+    )
+    decided = abs(mean - self.threshold) >= self.threshold * float(
+        _THROUGHPUT_DECISION_MARGIN
+    )
+    return int(mean) if stable and decided else None
+
+
+def generate_mesh_rounds(
+    num_pods: int, num_rounds: int
+) -> list[list[tuple[int, int]]]:
+  """Schedules rounds of disjoint client/server pairs between pods.
+
+  Uses the circle method, so no two pods are paired twice and every pod is in
+  at most one pair per round. With an odd number of pods, one pod sits out
+  each round. Every pod that is in two or more rounds is the client in some
+  and the server in others, so it's measured both sending and receiving.
+
+  Args:
+    num_pods (int): The number of pods in the job.
+    num_rounds (int): The number of rounds wanted. Capped at the number of
+      rounds with new partners.
+
+  Returns:
+    list[list[tuple[int, int]]]: For each round, the (client, server) pod
+    indexes of each pair.
+  """
+  pods: list[int | None] = list(range(num_pods))
+  if num_pods % 2:
+    # The pod paired with the fixed placeholder sits out the round
+    pods.insert(0, None)
+  rounds = []
+  for round_number in range(min(num_rounds, len(pods) - 1)):
+    pairs = []
+    for i in range(len(pods) // 2):
+      client, server = pods[i], pods[-1 - i]
+      if client is None or server is None:
+        continue
+      if i:
+        # A rotating pod moves to the next pair each round, so alternating
+        # the client side between pairs alternates its role between rounds
+        swap = i % 2
+      else:
+        # The pod opposite the fixed one was a client in the round before
+        swap = round_number == 0
+      if swap:
+        client, server = server, client
+      pairs.append((client, server))
+    rounds.append(pairs)
+    # Keep the first pod in place and rotate the others
+    pods.insert(1, pods.pop())
+  return rounds
+
+
+def run_neper_mesh(num_pods: int) -> list[Callable[[], None]]:
+  """Runs the neper test between many pods in rounds of disjoint pairs.
+
+  Pod 0 coordinates through the rendezvous and also takes part in the tests.
+  In each round, server pods start a server on every NIC, then every pod
+  reports ready. Once all pods are ready, pod 0 starts the round and each
+  client pod tests all NICs of its partner at once. A pod reporting ready for
+  the next round has finished its tests in the current one. After the last
+  round, every pod sends its measurements to pod 0, which labels all hosts.
+
+  Args:
+    num_pods (int): The number of pods in the job.
+
+  Returns:
+    list[Callable[[], None]]: Functions that clean up after the test.
+
+  Raises:
+    RuntimeError: If the rendezvous between the pods fails.
+  """
+  pod_index = int(os.environ.get("JOB_COMPLETION_INDEX", "0"))
+  rounds = generate_mesh_rounds(num_pods, int(_MESH_ROUNDS))
+  print(
+      f"I am pod {pod_index} of a {num_pods} pod neper mesh with"
+      f" {len(rounds)} rounds"
+  )
+  self_host = checker_common.run_command("cat /host.name").stdout
+  local_ips = read_local_ip_addresses()
+  cleanup_functions = []
+
+  if pod_index == 0:
+    server = rendezvous.RendezvousServer(num_workers=num_pods - 1)
+    cleanup_functions.append(server.close)
+    server.start()
+    if len(server.wait_for_workers(_MESH_MESSAGE_TIMEOUT_SECONDS)) < (
+        num_pods - 1
+    ):
+      # Closing the server releases the workers that did connect
+      server.close()
+      raise RuntimeError("Not all pods joined the neper mesh")
+
+    def barrier(name: str, payload: str = "") -> dict[str, str]:
+      del payload  # The coordinator keeps its own payload
+      payloads = server.wait_for_messages(
+          f"{name} ", _MESH_MESSAGE_TIMEOUT_SECONDS
+      )
+      server.notify(f"start {name}")
+      return payloads
+
+  else:
+    client = rendezvous.RendezvousClient(f"{JOB_NAME}-0.{SERVICE_NAME}")
+    cleanup_functions.append(client.close)
+    if not client.connect(str(pod_index)):
+      raise RuntimeError("Could not join the neper mesh")
+
+    def barrier(name: str, payload: str = "") -> dict[str, str]:
+      client.send(f"{name} {payload}")
+      if not client.wait_for(f"start {name}"):
+        raise RuntimeError("The neper mesh coordinator went away")
+      return {}
+
+  measurements = []
+  partners_by_pod = {}
+  for round_number, pairs in enumerate(rounds):
+    base_port = _NEPER_BASE_PORT + _MESH_ROUND_PORT_STRIDE * round_number
+    server_pods = {server_pod: client_pod for client_pod, server_pod in pairs}
+    client_pods = dict(pairs)
+    if pod_index in server_pods:
+      start_neper_servers(local_ips, base_port)
+    barrier(f"round{round_number}")
+    print(f"Round {round_number + 1} of {len(rounds)} started")
+
+    if pod_index not in client_pods:
+      continue
+    remote_pod = f"{JOB_NAME}-{client_pods[pod_index]}.{SERVICE_NAME}"
+    if remote_pod not in partners_by_pod:
+      partners_by_pod[remote_pod] = (
+          get_host_name(remote_pod),
+          get_ip_addresses(remote_pod).strip().split("\n"),
+      )
+    remote_host, remote_ips = partners_by_pod[remote_pod]
+    log_files = run_neper_clients_in_parallel(
+        self_host, remote_host, remote_ips, base_port
+    )
+    for count, log_file in enumerate(log_files, start=1):
+      cleanup_functions.append(functools.partial(os.remove, log_file))
+      measurements.append({
+          "client": self_host,
+          "server": remote_host,
+          "eth": f"eth{count}",
+          "client_throughput": get_throughput(log_file, local=True),
+          "server_throughput": get_throughput(log_file, local=False),
+      })
+
+  payloads = barrier("results", json.dumps(measurements))
+  if pod_index == 0:
+    for payload in payloads.values():
+      measurements.extend(json.loads(payload))
+    process_mesh_results(measurements)
+  return cleanup_functions
+
+
+def process_mesh_results(measurements: list[dict[str, str | int]]) -> None:
+  """Labels every host of a neper mesh by its best throughput on each NIC.
+
+  A NIC is only failed if its throughput was below GOOD_THROUGHPUT with every
+  partner it was tested against, so a single bad partner can't fail a good
+  host.
+
+  Args:
+    measurements (list[dict[str, str | int]]): The client and server hosts,
+      NIC and throughputs of every test in the mesh.
+  """
+  threshold = int(os.environ["GOOD_THROUGHPUT"])
+  samples_by_host = collections.defaultdict(
+      lambda: collections.defaultdict(list)
+  )
+  partners_by_host = collections.defaultdict(set)
+  for measurement in measurements:
+    for host, partner, throughput in (
+        (
+            measurement["client"],
+            measurement["server"],
+            measurement["client_throughput"],
+        ),
+        (
+            measurement["server"],
+            measurement["client"],
+            measurement["server_throughput"],
+        ),
+    ):
+      samples_by_host[host][measurement["eth"]].append(throughput)
+      partners_by_host[host].add(partner)
+
+  mutator = checker_common.NodeMutator()
+  for host, samples_by_eth in samples_by_host.items():
+    partners = sorted(partners_by_host[host])
+    throughput_by_eth = {
+        eth: max(samples) for eth, samples in samples_by_eth.items()
+    }
+    test_failed = False
+    for eth, throughput in sorted(throughput_by_eth.items()):
+      if throughput < threshold:
+        test_failed = True
+        print(
+            f"host {host} failed the neper test at {eth} with best"
+            f" throughput {throughput} against {partners}. Adding node"
+            " taints..."
+        )
+        mutator.set_label(host, f"{TAINT_KEY}_{eth}", f"{throughput}")
+      else:
+        mutator.remove_label(host, f"{TAINT_KEY}_{eth}")
+    apply_fail_label(mutator, test_failed, host, partners[0])
+    add_healthcheck_time_label(mutator, host)
+    checker_common.log_results(
+        test_name="neper",
+        passed=not test_failed,
+        node_name=host,
+        workflow_id=os.environ.get("WORKFLOW_ID"),
+        result_data={
+            "throughput_by_eth": throughput_by_eth,
+            "throughput_samples_by_eth": dict(samples_by_eth),
+            "partners": partners,
+        },
+    )
+    mutator.set_label(
+        host, _RESULT_LABEL_KEY, "fail" if test_failed else "pass"
+    )
+  # Every host is patched once with all its label and taint changes
+  mutator.flush()
+
+
+def read_local_ip_addresses() -> list[str]:
+  """Returns this host's NIC IP addresses (except eth0), in NIC order."""
+  try:
+    with open("/tmp/ip_addrs") as f:
+      return [line.strip() for line in f if line.strip()]
+  except OSError:
+    return []
+
+
+def get_nic_cpus(ip_address: str | None, shared: bool) -> str:
+  """Returns the CPUs to pin the neper test of a local NIC to.
+
+  Args:
+    ip_address (str | None): The IP address of a local NIC.
+    shared (bool): Whether the NIC is tested at the same time as the other
+      NICs on its NUMA node, in which case it only gets its share of the
+      node's CPUs so the tests don't compete for cores.
+
+  Returns:
+    str: A cpulist for taskset, or the default CPUs if the NIC's NUMA node
+    can't be found.
+  """
+  interface = get_interface_name(ip_address) if ip_address else None
+  layout = get_nic_cpu_layout()
+  if interface not in layout:
+    print(f"No NUMA layout for NIC {interface}, using {_DEFAULT_NEPER_CPUS}")
+    return _DEFAULT_NEPER_CPUS
+  node_cpus, shared_cpus = layout[interface]
+  cpus = shared_cpus if shared else node_cpus
+  print(f"Pinning neper test of NIC {interface} to CPUs {cpus}")
+  return cpus
+
+
+@functools.cache
+def get_nic_cpu_layout() -> dict[str, tuple[str, str]]:
+  """Reads which CPUs are local to each physical NIC of this host.
+
+  NICs are mapped to their NUMA node with
+  /sys/class/net/<if>/device/numa_node, and the node's CPUs are read from
+  /sys/devices/system/node/node<n>/cpulist. The node's CPUs are also split
+  evenly between the NICs on that node. The layout doesn't change while the
+  pod runs, so it's read once.
+
+  Returns:
+    dict[str, tuple[str, str]]: For each interface, the cpulist of its whole
+    NUMA node and the cpulist of its share of that node.
+  """
+  nics_by_node = collections.defaultdict(list)
+  for device in sorted(glob.glob("/sys/class/net/*/device")):
+    interface = device.split("/")[-2]
+    try:
+      with open(f"{device}/numa_node") as f:
+        node = int(f.read().strip())
+    except (OSError, ValueError):
+      continue
+    # Single socket hosts report -1
+    nics_by_node[max(node, 0)].append(interface)
+
+  layout = {}
+  for node, interfaces in nics_by_node.items():
+    try:
+      with open(f"/sys/devices/system/node/node{node}/cpulist") as f:
+        cpus = parse_cpulist(f.read())
+    except OSError:
+      continue
+    if not cpus:
+      continue
+    share = max(len(cpus) // len(interfaces), 1)
+    for i, interface in enumerate(interfaces):
+      # With more NICs than CPUs, NICs share CPUs round robin
+      start = (i * share) % len(cpus)
+      layout[interface] = (
+          format_cpulist(cpus),
+          format_cpulist(cpus[start : start + share]),
+      )
+  print(f"NIC CPU layout: {layout}")
+  return layout
+
+
+def parse_cpulist(cpulist: str) -> list[int]:
+  """Parses a cpulist such as "0-3,8,10-11" into a sorted list of CPUs."""
+  cpus = set()
+  for part in cpulist.strip().split(","):
+    if not part:
+      continue
+    first, _, last = part.partition("-")
+    cpus.update(range(int(first), int(last or first) + 1))
+  return sorted(cpus)
+
+
+def format_cpulist(cpus: list[int]) -> str:
+  """Formats a sorted list of CPUs as a compact cpulist for taskset."""
+  ranges = []
+  for cpu in cpus:
+    if ranges and cpu == ranges[-1][1] + 1:
+      ranges[-1][1] = cpu
+    else:
+      ranges.append([cpu, cpu])
+  return ",".join(
+      str(first) if first == last else f"{first}-{last}"
+      for first, last in ranges
+  )
+
+
+@functools.cache
+def get_interface_name(ip_address: str) -> str | None:
+  """Returns the name of the local interface with the given IP address."""
+  result = checker_common.run_command(
+      "ip -o -4 addr show", print_output=False
+  )
+  for line in result.stdout.splitlines():
+    # e.g. "3: eth1    inet 10.0.1.2/32 brd ..."
+    fields = line.split()
+    if len(fields) > 3 and fields[3].split("/")[0] == ip_address:
+      return fields[1]
+  return None
+
+
 def process_test_result(
     log_files: list[str], local_host: str, remote_host: str
 ) -> None:
   """Analyze the log files and add taints to the nodes that yield bad throughput."""
 
   threshold = int(os.environ["GOOD_THROUGHPUT"])
+  mutator = checker_common.NodeMutator()
   count = 0
   local_test_failed = False
   remote_test_failed = False
@@ -177,14 +804,11 @@ def process_test_result(
           f"local host {local_host} failed the neper test at eth{count} with"
           f" throughput {local_throughput}. Adding node taints..."
       )
-      checker_common.add_label(
-          local_host,
-          f"{TAINT_KEY}_eth{count}",
-          f"{local_throughput}",
-          K_ADD_LABEL_FORMAT,
+      mutator.set_label(
+          local_host, f"{TAINT_KEY}_eth{count}", f"{local_throughput}"
       )
     else:
-      remove_label(local_host, f"{TAINT_KEY}_eth{count}")
+      mutator.remove_label(local_host, f"{TAINT_KEY}_eth{count}")
 
     if remote_throughput < threshold:
       remote_test_failed = True
@@ -192,21 +816,18 @@ def process_test_result(
           f"remote host {remote_host} failed the neper test at eth{count} with"
           f" throughput {remote_throughput}. Adding node taints..."
       )
-      checker_common.add_label(
-          remote_host,
-          f"{TAINT_KEY}_eth{count}",
-          f"{remote_throughput}",
-          K_ADD_LABEL_FORMAT,
+      mutator.set_label(
+          remote_host, f"{TAINT_KEY}_eth{count}", f"{remote_throughput}"
       )
     else:
       # Removing taints and labels.
-      remove_label(remote_host, f"{TAINT_KEY}_eth{count}")
+      mutator.remove_label(remote_host, f"{TAINT_KEY}_eth{count}")
 
-  apply_fail_label(local_test_failed, local_host, remote_host)
-  apply_fail_label(remote_test_failed, remote_host, local_host)
+  apply_fail_label(mutator, local_test_failed, local_host, remote_host)
+  apply_fail_label(mutator, remote_test_failed, remote_host, local_host)
 
-  add_healthcheck_time_label(local_host)
-  add_healthcheck_time_label(remote_host)
+  add_healthcheck_time_label(mutator, local_host)
+  add_healthcheck_time_label(mutator, remote_host)
 
   server_client = {"server": local_host, "client": remote_host}
   checker_common.log_results(
@@ -235,18 +856,10 @@ def process_test_result(
   result = (
       "pass" if not local_test_failed and not remote_test_failed else "fail"
   )
-  checker_common.add_label(
-      local_host,
-      _RESULT_LABEL_KEY,
-      result,
-      K_ADD_LABEL_FORMAT,
-  )
-  checker_common.add_label(
-      remote_host,
-      _RESULT_LABEL_KEY,
-      result,
-      K_ADD_LABEL_FORMAT,
-  )
+  mutator.set_label(local_host, _RESULT_LABEL_KEY, result)
+  mutator.set_label(remote_host, _RESULT_LABEL_KEY, result)
+  # Both hosts are patched once with every label and taint change.
+  mutator.flush()
 
 
 def get_throughput(log_file: str, local: bool) -> int:
@@ -335,51 +948,45 @@ def timeout_check(start_time: float, pod_name: str) -> bool:
   return True
 
 
-def taint_node(node_name: str, key: str, value: str, effect: str) -> None:
+def taint_node(
+    mutator: checker_common.NodeMutator,
+    node_name: str,
+    key: str,
+    value: str,
+    effect: str,
+) -> None:
   """Apply a taint to a specified node with given key, value, and effect.
 
   Args:
+    mutator (NodeMutator): The mutator to queue the taint on.
     node_name (str): The name of the node to be tainted.
     key (str): The taint key to be set.
     value (str): The taint value to be set.
     effect (str): The effect of the taint (e.g., "NoExecute", "NoSchedule").
   """
   if os.environ.get("DRY_RUN") != "true":
-    print("adding taint %s=%s to node %s" % (key, value, node_name))
-    checker_common.run_command(
-        K_TAINT_NODE_FORMAT % (node_name, key, value, effect)
-    )
-
+    mutator.add_taint(node_name, key, value, effect)
 
-def remove_node_taint(node_name: str, taint_key: str) -> None:
-  print("removing taint %s from node %s" % (taint_key, node_name))
-  checker_common.run_command(
-      K_REMOVE_TAINT_NODE_FORMAT % (node_name, taint_key)
-  )
 
-
-def add_healthcheck_time_label(node_name: str) -> None:
+def add_healthcheck_time_label(
+    mutator: checker_common.NodeMutator, node_name: str
+) -> None:
   """Add healthcheck time label to node."""
-  checker_common.add_label(
-      node_name,
-      HEALTHCHECK_TIME_LABEL_KEY,
-      f"{int(time.time())}",
-      K_ADD_LABEL_FORMAT,
-  )
+  mutator.set_label(node_name, HEALTHCHECK_TIME_LABEL_KEY, int(time.time()))
 
 
-def apply_fail_label(check_failed: bool, node_name: str, value: str) -> None:
+def apply_fail_label(
+    mutator: checker_common.NodeMutator,
+    check_failed: bool,
+    node_name: str,
+    value: str,
+) -> None:
   if check_failed:
-    taint_node(node_name, TAINT_KEY, "failed", TAINT_EFFECT)
-    checker_common.add_label(node_name, TAINT_KEY, value, K_ADD_LABEL_FORMAT)
+    taint_node(mutator, node_name, TAINT_KEY, "failed", TAINT_EFFECT)
+    mutator.set_label(node_name, TAINT_KEY, value)
   else:
-    remove_node_taint(node_name, TAINT_KEY)
-    remove_label(node_name, TAINT_KEY)
-
-
-def remove_label(node_name: str, label: str) -> None:
-  print("removing label %s from node %s" % (label, node_name))
-  checker_common.run_command(K_REMOVE_LABEL_FORMAT % (node_name, label))
+    mutator.remove_taint(node_name, TAINT_KEY)
+    mutator.remove_label(node_name, TAINT_KEY)
 
 
 def main() -> None:
@@ -391,8 +998,12 @@ def main() -> None:
   with open("/host.name", "w") as f:
     f.write(node_name)
 
-  host_to_ips = get_host_to_ips()
-  cleanup_funcs = run_neper_test(host_to_ips)
+  num_pods = int(_NHOSTS)
+  if num_pods > 2:
+    cleanup_funcs = run_neper_mesh(num_pods)
+  else:
+    host_to_ips = get_host_to_ips()
+    cleanup_funcs = run_neper_test(host_to_ips)
 
   print("my job is done, running cleanups...")
 
@@ -0,0 +1,192 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for neper_runner."""
+
+import collections
+import itertools
+
+from absl.testing import absltest
+from absl.testing import parameterized
+
+import neper_runner
+
+
+class CpulistTest(parameterized.TestCase):
+
+  @parameterized.named_parameters(
+      ("single_cpu", "5", [5]),
+      ("range", "0-3", [0, 1, 2, 3]),
+      ("mixed", "0-2,8,10-11\n", [0, 1, 2, 8, 10, 11]),
+      ("unsorted_and_overlapping", "8,0-1,1-2", [0, 1, 2, 8]),
+      ("empty", "\n", []),
+  )
+  def test_parse_cpulist(self, cpulist, expected_cpus):
+    self.assertEqual(neper_runner.parse_cpulist(cpulist), expected_cpus)
+
+  @parameterized.named_parameters(
+      ("single_cpu", [5], "5"),
+      ("range", [0, 1, 2, 3], "0-3"),
+      ("mixed", [0, 1, 2, 8, 10, 11], "0-2,8,10-11"),
+      ("no_ranges", [1, 3, 5], "1,3,5"),
+      ("empty", [], ""),
+  )
+  def test_format_cpulist(self, cpus, expected_cpulist):
+    self.assertEqual(neper_runner.format_cpulist(cpus), expected_cpulist)
+
+  def test_round_trip(self):
+    cpulist = "0-23,48-71"
+
+    self.assertEqual(
+        neper_runner.format_cpulist(neper_runner.parse_cpulist(cpulist)),
+        cpulist,
+    )
+
+
+class GenerateMeshRoundsTest(parameterized.TestCase):
+
+  @parameterized.parameters(2, 3, 4, 5, 8, 9)
+  def test_all_rounds_pair_every_pod_once(self, num_pods):
+    rounds = neper_runner.generate_mesh_rounds(num_pods, num_rounds=100)
+
+    # Capped at the number of rounds with new partners
+    self.assertLen(rounds, num_pods - 1 if num_pods % 2 == 0 else num_pods)
+    pairs = [frozenset(pair) for pairs in rounds for pair in pairs]
+    all_pairs = itertools.combinations(range(num_pods), 2)
+    self.assertCountEqual(pairs, [frozenset(pair) for pair in all_pairs])
+    for pairs in rounds:
+      pods = [pod for pair in pairs for pod in pair]
+      self.assertLen(set(pods), len(pods))
+      # Only one pod sits out with an odd number of pods
+      self.assertLen(pods, num_pods - num_pods % 2)
+
+  @parameterized.parameters(
+      itertools.product((4, 5, 6, 7, 8, 9, 16), (2, 3, 5, 100))
+  )
+  def test_pods_are_both_client_and_server(self, num_pods, num_rounds):
+    rounds = neper_runner.generate_mesh_rounds(num_pods, num_rounds)
+
+    roles = collections.defaultdict(set)
+    for pairs in rounds:
+      for client, server in pairs:
+        roles[client].add("client")
+        roles[server].add("server")
+    for pod in range(num_pods):
+      num_pod_rounds = sum(pod in pair for pairs in rounds for pair in pairs)
+      if num_pod_rounds >= 2:
+        self.assertEqual(roles[pod], {"client", "server"}, f"pod {pod}")
+
+  def test_fewer_rounds_than_partners(self):
+    rounds = neper_runner.generate_mesh_rounds(8, num_rounds=3)
+
+    self.assertLen(rounds, 3)
+    pairs = [frozenset(pair) for pairs in rounds for pair in pairs]
+    self.assertLen(set(pairs), 12)
+
+  @parameterized.parameters(0, 1)
+  def test_no_pairs_without_two_pods(self, num_pods):
+    rounds = neper_runner.generate_mesh_rounds(num_pods, num_rounds=3)
+
+    self.assertFalse(any(rounds))
+
+
+_GBPS = 10**9
+
+
+def _counter_lines(
+    tx_rates: list[float], rx_rates: list[float], start_time: float = 100.0
+) -> list[str]:
+  """Returns one counter sample per second for the given rates, in bps."""
+  lines = [f"{start_time} 0 0"]
+  tx_bytes = rx_bytes = 0
+  for second, (tx_rate, rx_rate) in enumerate(zip(tx_rates, rx_rates), 1):
+    tx_bytes += int(tx_rate / 8)
+    rx_bytes += int(rx_rate / 8)
+    lines.append(f"{start_time + second} {tx_bytes} {rx_bytes}")
+  return lines
+
+
+class ThroughputMonitorTest(absltest.TestCase):
+
+  def _feed_all(self, monitor, lines):
+    """Returns the index of the line that made the test conclusive."""
+    for index, line in enumerate(lines):
+      if monitor.feed(line):
+        return index
+    return None
+
+  def test_clearly_good_link_stops_after_window(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=3)
+    rates = [150 * _GBPS] * 10
+
+    conclusive_at = self._feed_all(monitor, _counter_lines(rates, rates))
+
+    self.assertEqual(conclusive_at, neper_runner._THROUGHPUT_WINDOW)
+    self.assertEqual(monitor.local_throughput, 150 * _GBPS)
+    self.assertEqual(monitor.remote_throughput, 150 * _GBPS)
+
+  def test_runs_at_least_min_seconds(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=8)
+    rates = [150 * _GBPS] * 10
+
+    conclusive_at = self._feed_all(monitor, _counter_lines(rates, rates))
+
+    self.assertEqual(conclusive_at, 8)
+
+  def test_directions_are_measured_separately(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=0)
+    tx_rates = [150 * _GBPS] * 10
+    rx_rates = [50 * _GBPS] * 10
+
+    self._feed_all(monitor, _counter_lines(tx_rates, rx_rates))
+
+    self.assertEqual(monitor.local_throughput, 50 * _GBPS)
+    self.assertEqual(monitor.remote_throughput, 150 * _GBPS)
+
+  def test_borderline_link_is_not_conclusive(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=0)
+    rates = [105 * _GBPS] * 20
+
+    self.assertIsNone(self._feed_all(monitor, _counter_lines(rates, rates)))
+    self.assertIsNone(monitor.local_throughput)
+
+  def test_unstable_link_is_not_conclusive(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=0)
+    rates = [150 * _GBPS, 200 * _GBPS] * 10
+
+    self.assertIsNone(self._feed_all(monitor, _counter_lines(rates, rates)))
+
+  def test_one_inconclusive_direction_keeps_the_test_running(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=0)
+    tx_rates = [150 * _GBPS] * 20
+    rx_rates = [100 * _GBPS] * 20
+
+    self.assertIsNone(
+        self._feed_all(monitor, _counter_lines(tx_rates, rx_rates))
+    )
+
+  def test_ignores_malformed_and_repeated_samples(self):
+    monitor = neper_runner.ThroughputMonitor(100 * _GBPS, min_seconds=0)
+    lines = _counter_lines([150 * _GBPS] * 10, [150 * _GBPS] * 10)
+    lines.insert(2, "cat: /sys/class/net/eth1/statistics: No such file")
+    lines.insert(4, lines[3])
+
+    self.assertEqual(
+        self._feed_all(monitor, lines), neper_runner._THROUGHPUT_WINDOW + 2
+    )
+    self.assertEqual(monitor.local_throughput, 150 * _GBPS)
+
+
+if __name__ == "__main__":
+  absltest.main()
@@ -0,0 +1,270 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""TCP rendezvous between the master and worker pods of a health check.
+
+The master pod listens on RENDEZVOUS_PORT. Each worker connects to it over the
+job's headless service and reports that it is ready. The master can then wait
+for all workers and release them all at once with a message, instead of
+workers polling for a file that the master creates over ssh. Workers can also
+send messages back, e.g. to act as a barrier or to report results.
+"""
+
+import os
+import socket
+import threading
+import time
+
+_RENDEZVOUS_PORT = os.environ.get("RENDEZVOUS_PORT", "29511")
+# How long a worker keeps trying to reach the master before giving up
+_CONNECT_TIMEOUT_SECONDS = os.environ.get(
+    "RENDEZVOUS_CONNECT_TIMEOUT_SECONDS", "300"
+)
+_HANDSHAKE_TIMEOUT_SECONDS = 10
+_READY_PREFIX = "ready "
+
+
+class RendezvousServer:
+  """Runs on the master and tracks the workers connected to it."""
+
+  def __init__(self, num_workers: int, port: int | None = None):
+    """Initializes the server.
+
+    Args:
+      num_workers (int): The number of workers expected to connect.
+      port (int | None): The port to listen on. Defaults to RENDEZVOUS_PORT.
+    """
+    self.num_workers = num_workers
+    self.port = port if port is not None else int(_RENDEZVOUS_PORT)
+    self._connections: dict[str, socket.socket] = {}
+    # Messages received from each worker after its ready message
+    self._messages: dict[str, list[str]] = {}
+    self._condition = threading.Condition()
+    self._listener: socket.socket | None = None
+
+  def start(self) -> None:
+    """Starts accepting workers in the background.
+
+    Raises:
+      OSError: If the port can't be listened on.
+    """
+    self._listener = socket.create_server(("", self.port))
+    threading.Thread(target=self._accept_forever, daemon=True).start()
+    print(f"Rendezvous server listening on port {self.port}")
+
+  def _accept_forever(self) -> None:
+    """Accepts worker connections until the server is closed."""
+    while True:
+      try:
+        connection, _ = self._listener.accept()
+      except OSError:
+        # The listener was closed
+        return
+      threading.Thread(
+          target=self._register, args=(connection,), daemon=True
+      ).start()
+
+  def _register(self, connection: socket.socket) -> None:
+    """Reads a worker's ready message and keeps its connection."""
+    connection.settimeout(_HANDSHAKE_TIMEOUT_SECONDS)
+    reader = connection.makefile("r")
+    try:
+      line = reader.readline()
+    except OSError:
+      line = ""
+    if not line.startswith(_READY_PREFIX):
+      connection.close()
+      return
+    worker_id = line[len(_READY_PREFIX) :].strip()
+    connection.settimeout(None)
+    with self._condition:
+      previous = self._connections.pop(worker_id, None)
+      if previous is not None:
+        previous.close()
+      self._connections[worker_id] = connection
+      self._messages.setdefault(worker_id, [])
+      self._condition.notify_all()
+    print(f"Worker {worker_id} is ready")
+    try:
+      for line in reader:
+        with self._condition:
+          self._messages[worker_id].append(line.rstrip("\n"))
+          self._condition.notify_all()
+    except OSError:
+      pass
+
+  def wait_for_workers(self, timeout_seconds: float) -> list[str]:
+    """Waits until all workers are connected or the timeout expires.
+
+    Args:
+      timeout_seconds (float): The longest time to wait.
+
+    Returns:
+      list[str]: The IDs of the workers that are connected.
+    """
+    with self._condition:
+      self._condition.wait_for(
+          lambda: len(self._connections) >= self.num_workers,
+          timeout_seconds,
+      )
+      worker_ids = sorted(self._connections)
+    if len(worker_ids) < self.num_workers:
+      print(
+          f"Only {len(worker_ids)} of {self.num_workers} workers are ready:"
+          f" {worker_ids}"
+      )
+    return worker_ids
+
+  def wait_for_messages(
+      self, prefix: str, timeout_seconds: float
+  ) -> dict[str, str]:
+    """Waits until every worker has sent a message starting with prefix.
+
+    Args:
+      prefix (str): The start of the message to wait for.
+      timeout_seconds (float): The longest time to wait.
+
+    Returns:
+      dict[str, str]: The rest of the first matching message of each worker
+      that sent one, by worker ID.
+    """
+
+    def _matching() -> dict[str, str]:
+      matching = {}
+      for worker_id, messages in self._messages.items():
+        for message in messages:
+          if message.startswith(prefix):
+            matching[worker_id] = message[len(prefix) :]
+            break
+      return matching
+
+    with self._condition:
+      self._condition.wait_for(
+          lambda: len(_matching()) >= self.num_workers, timeout_seconds
+      )
+      matching = _matching()
+    if len(matching) < self.num_workers:
+      print(
+          f"Only {len(matching)} of {self.num_workers} workers sent"
+          f" '{prefix}'"
+      )
+    return matching
+
+  def notify(self, message: str) -> None:
+    """Sends a message to every connected worker.
+
+    Args:
+      message (str): The message, without newlines.
+    """
+    with self._condition:
+      connections = list(self._connections.items())
+    for worker_id, connection in connections:
+      try:
+        connection.sendall(f"{message}\n".encode())
+      except OSError as e:
+        print(f"Failed to notify worker {worker_id}: {e}")
+
+  def close(self) -> None:
+    """Stops accepting workers and closes all connections."""
+    if self._listener is not None:
+      self._listener.close()
+    with self._condition:
+      for connection in self._connections.values():
+        connection.close()
+      self._connections.clear()
+
+
+class RendezvousClient:
+  """Runs on a worker and waits for messages from the master."""
+
+  def __init__(self, master_host: str, port: int | None = None):
+    """Initializes the client.
+
+    Args:
+      master_host (str): The host name of the master pod.
+      port (int | None): The master's port. Defaults to RENDEZVOUS_PORT.
+    """
+    self.master_host = master_host
+    self.port = port if port is not None else int(_RENDEZVOUS_PORT)
+    self._socket: socket.socket | None = None
+    self._reader = None
+
+  def connect(
+      self,
+      worker_id: str,
+      timeout_seconds: float | None = None,
+  ) -> bool:
+    """Connects to the master and reports this worker as ready.
+
+    Args:
+      worker_id (str): A unique ID for this worker.
+      timeout_seconds (float | None): How long to keep retrying. Defaults to
+        RENDEZVOUS_CONNECT_TIMEOUT_SECONDS.
+
+    Returns:
+      bool: True if connected, False if the master couldn't be reached.
+    """
+    if timeout_seconds is None:
+      timeout_seconds = float(_CONNECT_TIMEOUT_SECONDS)
+    deadline = time.time() + timeout_seconds
+    while time.time() < deadline:
+      try:
+        self._socket = socket.create_connection(
+            (self.master_host, self.port), timeout=_HANDSHAKE_TIMEOUT_SECONDS
+        )
+        self._socket.sendall(f"{_READY_PREFIX}{worker_id}\n".encode())
+        self._socket.settimeout(None)
+        self._reader = self._socket.makefile("r")
+        print(f"Connected to rendezvous master {self.master_host}")
+        return True
+      except OSError:
+        time.sleep(1)
+    print(f"Could not reach rendezvous master {self.master_host}")
+    return False
+
+  def send(self, message: str) -> bool:
+    """Sends a message to the master.
+
+    Args:
+      message (str): The message, without newlines.
+
+    Returns:
+      bool: True if the message was sent.
+    """
+    try:
+      self._socket.sendall(f"{message}\n".encode())
+    except OSError as e:
+      print(f"Failed to send to rendezvous master: {e}")
+      return False
+    return True
+
+  def wait_for(self, message: str) -> bool:
+    """Blocks until the master sends the given message.
+
+    Args:
+      message (str): The message to wait for. Other messages are skipped.
+
+    Returns:
+      bool: True if the message arrived, False if the master closed the
+      connection first.
+    """
+    for line in self._reader:
+      if line.strip() == message:
+        return True
+    return False
+
+  def close(self) -> None:
+    """Closes the connection to the master."""
+    if self._socket is not None:
+      self._socket.close()
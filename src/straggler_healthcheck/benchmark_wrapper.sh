@@ -49,4 +49,6 @@ taskset --cpu-list $cstart-$((cend-1)),$vstart-$((vend-1)) \
         --n_batch="${N_BATCH}" \
         --n_microbatch="${N_MICROBATCH}" \
         --bidirectional="${BIDIRECTIONAL}" \
-        --output_dir="${DATA_OUTPUT_DIR}"
\ No newline at end of file
+        --output_dir="${DATA_OUTPUT_DIR}" \
+        --output_format="${OUTPUT_FORMAT}" \
+        --timing_backend="${TIMING_BACKEND}"
\ No newline at end of file
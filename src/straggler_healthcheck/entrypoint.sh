@@ -71,6 +71,10 @@ export LD_LIBRARY_PATH="/usr/local/fastrak_exec/lib64:${LD_LIBRARY_PATH}"
 export N_BATCH=${N_BATCH:-100}
 export N_MICROBATCH=${N_MICROBATCH:-1000}
 export N_GPUS_PER_NODE=${N_GPUS_PER_NODE:-8}
+# npy, or textproto to debug the results by hand
+export OUTPUT_FORMAT=${OUTPUT_FORMAT:-npy}
+# perf_counter, or cuda_event to time microbatches on the device
+export TIMING_BACKEND=${TIMING_BACKEND:-perf_counter}
 
 HOST_NAME="$(hostname)"
 export HOST_NAME
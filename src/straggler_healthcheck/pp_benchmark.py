@@ -54,6 +54,10 @@ import straggler_detection_healthcheck_pb2
 
 _KILOBYTE = 1024
 
+# Timing backends of the microbatch communication
+PERF_COUNTER_TIMING = "perf_counter"
+CUDA_EVENT_TIMING = "cuda_event"
+
 
 def _schedule_transfers(
     depth_idx: int,
@@ -121,7 +125,8 @@ def _do_microbatch_comm(
     next_rank: int,
     prev_rank: int,
     bidirectional: bool,
-) -> list[int]:
+    events: Optional[list[torch.cuda.Event]] = None,
+) -> list[int] | list[torch.cuda.Event]:
   """Performs a single set of communication between GPUs.
 
   Args:
@@ -134,6 +139,9 @@ def _do_microbatch_comm(
     next_rank: The rank of the next GPU in the pipeline.
     prev_rank: The rank of the previous GPU in the pipeline.
     bidirectional: Whether to run bidirectional communication.
+    events: Four CUDA events to record on the current stream instead of
+      taking host timestamps. The current GPU isn't synchronized then, so the
+      last two events are recorded back to back.
 
   Returns:
     A tuple of timing events corresponding to:
@@ -145,7 +153,14 @@ def _do_microbatch_comm(
   tensor_idx = _get_tensor_id(microbatch_idx, len(send_tensor_fwd))
   timestamps = []
 
-  snapshot_time = lambda: timestamps.append(time.perf_counter_ns())
+  def snapshot_time() -> None:
+    if events is None:
+      timestamps.append(time.perf_counter_ns())
+    else:
+      # Completes once the work queued on the current stream before it has
+      event = events[len(timestamps)]
+      event.record()
+      timestamps.append(event)
 
   snapshot_time()
   work_handles = _schedule_transfers(
@@ -169,9 +184,11 @@ def _do_microbatch_comm(
     )
   snapshot_time()
 
+  # Also makes the current stream wait for the transfers
   _ = [handle.wait() for handle in work_handles]
   snapshot_time()
-  torch.cuda.synchronize()
+  if events is None:
+    torch.cuda.synchronize()
   snapshot_time()
   return timestamps
 
@@ -252,6 +269,8 @@ def run_pp_benchmark(
     n_microbatch: int = 500,
     n_warmup_runs: int = 10,
     bidirectional: bool = False,
+    output_format: str = pp_benchmark_results_log.NPY_FORMAT,
+    timing_backend: str = PERF_COUNTER_TIMING,
 ) -> None:
   """Runs PPBenchmark on the current node and outputs results to a file.
 
@@ -265,6 +284,11 @@ def run_pp_benchmark(
     n_microbatch: The number of microbatches per batch. Must be >= 20.
     n_warmup_runs: The number of warmup runs to run.
     bidirectional: Whether to run bidirectional communication.
+    output_format: The format of the results file, see
+      PPBenchmarkResultsLog.save_results.
+    timing_backend: PERF_COUNTER_TIMING to time each microbatch on the host,
+      synchronizing the GPU after it. CUDA_EVENT_TIMING to time it with CUDA
+      events on the device, resolved at the barrier after each batch.
   """
   my_rank = dist.get_rank()
   my_depth_idx = _get_depth(my_rank, n_gpus_per_node)
@@ -303,6 +327,14 @@ def run_pp_benchmark(
       build_comm_tensor(n_elements, n_microbatch) if bidirectional else None
   )
 
+  # Reused by every batch, since they're resolved at the barrier after it
+  microbatch_events = None
+  if timing_backend == CUDA_EVENT_TIMING:
+    microbatch_events = [
+        [torch.cuda.Event(enable_timing=True) for _ in range(4)]
+        for _ in range(n_microbatch)
+    ]
+
   # Warm Up
   results_log.record_barrier_time()
   for _ in range(n_warmup_runs):
@@ -324,6 +356,9 @@ def run_pp_benchmark(
     with context:
       torch.cuda.synchronize()
       for microbatch_idx in range(n_microbatch):
+        events = (
+            microbatch_events[microbatch_idx] if microbatch_events else None
+        )
         ts = _do_microbatch_comm(
             depth_idx=my_depth_idx,
             microbatch_idx=microbatch_idx,
@@ -334,7 +369,13 @@ def run_pp_benchmark(
             next_rank=next_rank,
             prev_rank=prev_rank,
             bidirectional=bidirectional,
+            events=events,
         )
-        results_log.record_microbatch_comm(batch_idx, microbatch_idx, ts)
+        if events:
+          results_log.record_microbatch_events(
+              batch_idx, microbatch_idx, ts
+          )
+        else:
+          results_log.record_microbatch_comm(batch_idx, microbatch_idx, ts)
       results_log.record_barrier_time()
-  results_log.save_results(output_dir=output_dir)
+  results_log.save_results(output_dir=output_dir, output_format=output_format)
@@ -19,7 +19,8 @@ data.
 
 Example usage:
   experiment_name = "experiment_name"
-  # A directory containing files of the form ".*{experiment_name}.textproto"
+  # A directory containing one results directory per rank named
+  # ".*{experiment_name}" (or files named ".*{experiment_name}.textproto")
   data_dir = "/path/to/benchmark/data"
   output_dir = "/tmp/out"
   # include events immediately before and after a known straggler
@@ -38,7 +39,9 @@ Example usage:
 """
 
 from collections.abc import Callable
+from concurrent import futures
 import dataclasses
+import hashlib
 import os
 import pathlib
 # 
@@ -54,81 +57,139 @@ import numpy.typing as npt
 import straggler_detection_healthcheck_pb2
 
 _NANOSECONDS_PER_MILLISECOND = 1000000
+# Metadata file of a rank's results directory, as written by
+# PPBenchmarkResultsLog.save_results
+_NPY_METADATA_FILE = "metadata.textproto"
 
 
-def _read_pp_benchmark_data(
-    data_dir, data_file
-) -> straggler_detection_healthcheck_pb2.PPBenchmarkResults:
-  """Read PP Benchmark Results from a textproto file.
+@dataclasses.dataclass
+class PPBenchmarkData:
+  """PP Benchmark Results of one rank, stored by column."""
+
+  metadata: straggler_detection_healthcheck_pb2.Metadata
+  # PPBenchmarkResult field name -> the value of that field for every event.
+  # Memory-mapped when read from a results directory.
+  columns: dict[str, npt.NDArray[np.int64]]
+
+
+def is_results_file(data_dir: str, filename: str) -> bool:
+  """Whether an entry of the data directory holds the results of one rank.
+
+  Args:
+    data_dir: directory containing Pipeline Parallelism benchmark results
+    filename: name of the entry in data_dir
+
+  Returns:
+    True for a textproto file, or a results directory with one .npy per
+    PPBenchmarkResult field.
+  """
+  if filename.endswith(".textproto"):
+    return True
+  return os.path.isfile(os.path.join(data_dir, filename, _NPY_METADATA_FILE))
+
+
+def _read_pp_benchmark_data(data_dir, data_file) -> PPBenchmarkData:
+  """Read PP Benchmark Results from a results directory or textproto file.
+
+  A results directory holds one .npy per PPBenchmarkResult field and the
+  Metadata as a textproto, as written by PPBenchmarkResultsLog. The .npy files
+  are memory-mapped, so only the fields used are read from disk.
 
   Args:
     data_dir: directory containing Pipeline Parallelism benchmark results
-    data_file: name of the textproto file
+    data_file: name of the results directory or textproto file
 
   Returns:
-    A PPBenchmarkResults proto containing the benchmark results.
+    A PPBenchmarkData containing the benchmark results.
   """
   pathlib.Path(data_dir).mkdir(parents=True, exist_ok=True)
-  with open(os.path.join(data_dir, data_file)) as f:
+  data_path = os.path.join(data_dir, data_file)
+  result_fields = [
+      field.name
+      for field in (
+          straggler_detection_healthcheck_pb2.PPBenchmarkResult.DESCRIPTOR.fields
+      )
+  ]
+  if os.path.isdir(data_path):
+    with open(os.path.join(data_path, _NPY_METADATA_FILE)) as f:
+      metadata = text_format.Parse(
+          f.read(), straggler_detection_healthcheck_pb2.Metadata()
+      )
+    columns = {
+        name: np.load(os.path.join(data_path, f"{name}.npy"), mmap_mode="r")
+        for name in result_fields
+    }
+    return PPBenchmarkData(metadata=metadata, columns=columns)
+
+  with open(data_path) as f:
     results = text_format.Parse(
         f.read(), straggler_detection_healthcheck_pb2.PPBenchmarkResults()
     )
-  return results
+  return PPBenchmarkData(
+      metadata=results.metadata,
+      columns={
+          name: np.array(
+              [getattr(result, name) for result in results.benchmark_results],
+              dtype=np.int64,
+          )
+          for name in result_fields
+      },
+  )
 
 
 def _extract_send_recv_durations_for_experiment(
-    benchmark_results: straggler_detection_healthcheck_pb2.PPBenchmarkResults,
+    benchmark_results: PPBenchmarkData,
     duration_extractor: Callable[
-        [straggler_detection_healthcheck_pb2.PPBenchmarkResult], int
-    ] = lambda result: (result.t3_ns - result.t0_ns),
+        [dict[str, npt.NDArray[np.int64]]], npt.NDArray[np.int64]
+    ] = lambda columns: (columns["t3_ns"] - columns["t0_ns"]),
 ) -> npt.NDArray[int]:
   """Extract SendRecv durations for all benchmark results as Milliseconds.
 
   Args:
     benchmark_results: Results for a given Pipeline Parallelism experiment
-    duration_extractor: Function to extract the duration of a SendRecv event.
-      Defaults to (t3 - t0)
+    duration_extractor: Function to extract the durations of all SendRecv
+      events from the result columns. Defaults to (t3 - t0)
 
   Returns:
     An array of SendRecv durations for all benchmark results in Milliseconds.
   """
-  return np.array(
-      [
-          duration_extractor(result) // _NANOSECONDS_PER_MILLISECOND
-          for result in benchmark_results.benchmark_results
-      ],
-      dtype="int",
-  )
+  return (
+      duration_extractor(benchmark_results.columns)
+      // _NANOSECONDS_PER_MILLISECOND
+  ).astype("int")
 
 
 def _identify_interesting_event_indices(
     send_recv_timing_results: npt.NDArray[int],
     straggler_threshold_ms: int,
     interesting_event_offset: int,
-) -> set[int]:
+) -> npt.NDArray[int]:
   """Identify interesting event indices for a given experiment.
 
+  An event is a straggler if any device took at least the threshold for it.
+  The straggler mask is dilated by the offset, so events close to a straggler
+  are interesting too.
+
   Args:
-    send_recv_timing_results: SendRecv durations for all benchmark results in
-      Milliseconds
+    send_recv_timing_results: SendRecv durations in Milliseconds, as a matrix
+      of shape (devices, events)
     straggler_threshold_ms: threshold for marking an event as a straggler
     interesting_event_offset: The fwd and bwd offset from a known straggler for
       marking an event as interesting
 
   Returns:
-    A set of event indices that are deemed 'interesting'.
+    A sorted array of event indices that are deemed 'interesting'.
   """
-  interesting_events = set()
-  max_num_events = len(send_recv_timing_results)
-  for event_idx, sr_time_ms in enumerate(send_recv_timing_results):
-    if sr_time_ms >= straggler_threshold_ms:
-      for offset in range(interesting_event_offset + 1):
-        if event_idx - offset >= 0:
-          interesting_events.add(event_idx - offset)
-        if event_idx + offset < max_num_events:
-          interesting_events.add(event_idx + offset)
-
-  return interesting_events
+  straggler_events = (send_recv_timing_results >= straggler_threshold_ms).any(
+      axis=0
+  )
+  # Binary dilation: event i counts the stragglers in [i - offset, i + offset]
+  window = np.ones(2 * interesting_event_offset + 1, dtype=int)
+  straggler_counts = np.convolve(straggler_events.astype(int), window)[
+      interesting_event_offset : interesting_event_offset
+      + len(straggler_events)
+  ]
+  return np.flatnonzero(straggler_counts > 0)
 
 
 @dataclasses.dataclass
@@ -148,9 +209,27 @@ class HeatmapData:
   delayed_event_matrix: npt.NDArray[int]
 
 
+def list_experiment_files(data_dir: str) -> dict[str, list[str]]:
+  """List the results files of every experiment in a directory.
+
+  Args:
+    data_dir: directory containing Pipeline Parallelism benchmark results
+
+  Returns:
+    For each experiment, the sorted names of its results directories or files,
+    one per rank.
+  """
+  files_by_experiment = {}
+  for filename in sorted(os.listdir(data_dir)):
+    if is_results_file(data_dir, filename):
+      experiment = pathlib.Path(filename).stem.split("-")[1]
+      files_by_experiment.setdefault(experiment, []).append(filename)
+  return files_by_experiment
+
+
 def read_experiment_data(
     data_dir: str, experiment: str
-) -> list[straggler_detection_healthcheck_pb2.PPBenchmarkResults]:
+) -> list[PPBenchmarkData]:
   """Read all benchmark results for a given experiment.
 
   Args:
@@ -158,19 +237,201 @@ def read_experiment_data(
     experiment: name of the experiment
 
   Returns:
-    A list of PPBenchmarkResults for the given experiment found in the data_dir.
+    A list of PPBenchmarkData for the given experiment found in the data_dir.
+  """
+  return [
+      _read_pp_benchmark_data(data_dir, filename)  # for each rank
+      for filename in list_experiment_files(data_dir).get(experiment, [])
+  ]
+
+
+@dataclasses.dataclass
+class DeviceDurations:
+  """SendRecv durations of one device (rank)."""
+
+  metadata: straggler_detection_healthcheck_pb2.Metadata
+  durations_ms: npt.NDArray[int]
+
+
+@dataclasses.dataclass
+class DurationMatrix:
+  """SendRecv durations of every device of an experiment."""
+
+  # (gpu_id, node_id) of each row, sorted
+  device_keys: list[tuple[int, int]]
+  # A matrix of shape (devices, events) of SendRecv durations in ms
+  durations_ms: npt.NDArray[int]
+  max_rank: int
+  max_node_idx: int
+
+
+def _read_device_durations(data_dir: str, data_file: str) -> DeviceDurations:
+  """Read the SendRecv durations of one rank's results file.
+
+  Args:
+    data_dir: directory containing Pipeline Parallelism benchmark results
+    data_file: name of the results directory or textproto file
+
+  Returns:
+    The device's metadata and SendRecv durations.
+  """
+  pp_benchmark = _read_pp_benchmark_data(data_dir, data_file)
+  return DeviceDurations(
+      metadata=pp_benchmark.metadata,
+      durations_ms=_extract_send_recv_durations_for_experiment(pp_benchmark),
+  )
+
+
+def build_duration_matrix(
+    device_durations: list[DeviceDurations],
+) -> Optional[DurationMatrix]:
+  """Stacks the SendRecv durations of all devices of an experiment.
+
+  Args:
+    device_durations: SendRecv durations of each device
+
+  Returns:
+    A DurationMatrix, or None if there are no devices. Events only some
+    devices recorded are left out.
+  """
+
+  send_recv_duration_ms_per_device: dict[tuple[int, int], npt.NDArray[int]] = (
+      dict()
+  )
+  max_rank = 0
+  max_node_idx = 0
+  for device in device_durations:
+    max_rank = max(max_rank, device.metadata.rank)
+    max_node_idx = max(max_node_idx, device.metadata.node_id)
+    # 
+    benchmark_id = (device.metadata.gpu_id, device.metadata.node_id)
+    send_recv_duration_ms_per_device[benchmark_id] = device.durations_ms
+  if not send_recv_duration_ms_per_device:
+    return None
+
+  ordered_keys_for_heatmap = sorted(send_recv_duration_ms_per_device.keys())
+  n_events = min(map(len, send_recv_duration_ms_per_device.values()))
+  return DurationMatrix(
+      device_keys=ordered_keys_for_heatmap,
+      durations_ms=np.stack([
+          send_recv_duration_ms_per_device[key][:n_events]
+          for key in ordered_keys_for_heatmap
+      ]),
+      max_rank=max_rank,
+      max_node_idx=max_node_idx,
+  )
+
+
+def _hash_files(data_dir: str, filenames: list[str]) -> str:
+  """Returns a digest of the names and contents of the given files.
+
+  Results directories are hashed file by file, in name order.
+  """
+  digest = hashlib.sha256()
+  for filename in filenames:
+    path = os.path.join(data_dir, filename)
+    file_paths = [path]
+    if os.path.isdir(path):
+      file_paths = [
+          os.path.join(path, name) for name in sorted(os.listdir(path))
+      ]
+    for file_path in file_paths:
+      digest.update(os.path.relpath(file_path, data_dir).encode())
+      with open(file_path, "rb") as f:
+        digest.update(hashlib.sha256(f.read()).digest())
+  return digest.hexdigest()
+
+
+def _load_cached_duration_matrix(cache_file: str) -> Optional[DurationMatrix]:
+  """Loads a DurationMatrix saved by _save_cached_duration_matrix."""
+  if not os.path.exists(cache_file):
+    return None
+  with np.load(cache_file, allow_pickle=False) as arrays:
+    return DurationMatrix(
+        device_keys=[tuple(key) for key in arrays["device_keys"].tolist()],
+        durations_ms=arrays["durations_ms"],
+        max_rank=int(arrays["max_rank"]),
+        max_node_idx=int(arrays["max_node_idx"]),
+    )
+
+
+def _save_cached_duration_matrix(
+    cache_file: str, duration_matrix: DurationMatrix
+) -> None:
+  """Saves a DurationMatrix, writing to a temporary file first."""
+  pathlib.Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+  # np.savez appends .npz to names without it
+  tmp_file = f"{cache_file}.tmp.npz"
+  np.savez(
+      tmp_file,
+      device_keys=np.array(duration_matrix.device_keys, dtype=np.int64),
+      durations_ms=duration_matrix.durations_ms,
+      max_rank=duration_matrix.max_rank,
+      max_node_idx=duration_matrix.max_node_idx,
+  )
+  os.replace(tmp_file, cache_file)
+
+
+def read_duration_matrices(
+    data_dir: str,
+    cache_dir: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> dict[str, DurationMatrix]:
+  """Read the SendRecv durations of every experiment in a directory.
+
+  The results files of all experiments are parsed in parallel, in a process
+  pool. Parsed duration matrices are cached in cache_dir, keyed by a hash of
+  the contents of the experiment's files, so rerunning the analysis on the
+  same data (e.g. with another straggler threshold) doesn't parse it again.
+
+  Args:
+    data_dir: directory containing Pipeline Parallelism benchmark results
+    cache_dir: directory to cache duration matrices in. Defaults to no cache.
+    max_workers: the number of parsing processes. Defaults to the number of
+      CPUs.
+
+  Returns:
+    The DurationMatrix of each experiment.
   """
-  benchmark_results = []
-  for filename in os.listdir(data_dir):
-    if filename.endswith(f"{experiment}.textproto"):  # for each rank
-      benchmark_results.append(_read_pp_benchmark_data(data_dir, filename))
-  return benchmark_results
+  duration_matrices = {}
+  cache_files = {}
+  files_to_parse = {}
+  for experiment, filenames in list_experiment_files(data_dir).items():
+    if cache_dir:
+      cache_files[experiment] = os.path.join(
+          cache_dir, f"{experiment}-{_hash_files(data_dir, filenames)}.npz"
+      )
+      cached = _load_cached_duration_matrix(cache_files[experiment])
+      if cached is not None:
+        print(f"Using cached durations for experiment {experiment}")
+        duration_matrices[experiment] = cached
+        continue
+    files_to_parse[experiment] = filenames
+  if not files_to_parse:
+    return duration_matrices
+
+  with futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    device_futures = {
+        experiment: [
+            executor.submit(_read_device_durations, data_dir, filename)
+            for filename in filenames
+        ]
+        for experiment, filenames in files_to_parse.items()
+    }
+    for experiment, experiment_futures in device_futures.items():
+      duration_matrix = build_duration_matrix(
+          [future.result() for future in experiment_futures]
+      )
+      if duration_matrix is None:
+        continue
+      duration_matrices[experiment] = duration_matrix
+      if experiment in cache_files:
+        _save_cached_duration_matrix(cache_files[experiment], duration_matrix)
+  return duration_matrices
 
 
 def preprocess_experiment_data(
-    benchmark_results: list[
-        straggler_detection_healthcheck_pb2.PPBenchmarkResults
-    ],
+    benchmark_results: list[PPBenchmarkData],
     experiment: str,
     straggler_threshold_ms: int,
     interesting_event_offset: int,
@@ -188,49 +449,65 @@ def preprocess_experiment_data(
     A HeatmapData object containing the data needed to plot a heatmap. Returns
     None if there are no interesting events.
   """
-
-  send_recv_duration_ms_per_device: dict[tuple[int, int], npt.NDArray[int]] = (
-      dict()
+  duration_matrix = build_duration_matrix([
+      DeviceDurations(
+          metadata=pp_benchmark.metadata,
+          durations_ms=_extract_send_recv_durations_for_experiment(
+              pp_benchmark
+          ),
+      )
+      for pp_benchmark in benchmark_results
+  ])
+  if duration_matrix is None:
+    print(f"No interesting events found for {experiment}")
+    return None
+  return preprocess_duration_matrix(
+      duration_matrix,
+      experiment,
+      straggler_threshold_ms,
+      interesting_event_offset,
   )
-  interesting_events = set()
-  max_rank = 0
-  max_node_idx = 0
-  for pp_benchmark in benchmark_results:
-    max_rank = max(max_rank, pp_benchmark.metadata.rank)
-    max_node_idx = max(max_node_idx, pp_benchmark.metadata.node_id)
-    # 
-    benchmark_id = (pp_benchmark.metadata.gpu_id, pp_benchmark.metadata.node_id)
-    send_recv_duration_ms_per_device[benchmark_id] = (
-        _extract_send_recv_durations_for_experiment(pp_benchmark)
-    )
 
-    interesting_events_for_experiment = _identify_interesting_event_indices(
-        send_recv_timing_results=send_recv_duration_ms_per_device[benchmark_id],
-        straggler_threshold_ms=straggler_threshold_ms,
-        interesting_event_offset=interesting_event_offset,
-    )
-    interesting_events.update(interesting_events_for_experiment)
 
-  if not interesting_events:
+def preprocess_duration_matrix(
+    duration_matrix: DurationMatrix,
+    experiment: str,
+    straggler_threshold_ms: int,
+    interesting_event_offset: int,
+) -> Optional[HeatmapData]:
+  """Produces data needed to plot a heatmap from an experiment's durations.
+
+  Args:
+    duration_matrix: SendRecv durations of every device of the experiment
+    experiment: name of the experiment
+    straggler_threshold_ms: threshold for marking an event as a straggler
+    interesting_event_offset: Fwd and bwd offset from a known straggler for
+      marking an event as interesting
+
+  Returns:
+    A HeatmapData object containing the data needed to plot a heatmap. Returns
+    None if there are no interesting events.
+  """
+  interesting_events = _identify_interesting_event_indices(
+      send_recv_timing_results=duration_matrix.durations_ms,
+      straggler_threshold_ms=straggler_threshold_ms,
+      interesting_event_offset=interesting_event_offset,
+  )
+  if not interesting_events.size:
     print(f"No interesting events found for {experiment}")
     return None
 
-  x_vals = list(sorted(interesting_events))
-
-  ordered_keys_for_heatmap = sorted(send_recv_duration_ms_per_device.keys())
+  x_vals = interesting_events.tolist()
   # Make a matrix focusing on slow events. Exclude fast events.
-  delay_matrix = np.array([
-      [send_recv_duration_ms_per_device[key][event] for event in x_vals]
-      for key in ordered_keys_for_heatmap
-  ])
+  delay_matrix = duration_matrix.durations_ms[:, interesting_events]
   y_labels = [
       f"gpu-{gpu_idx}-node-{node_idx}"
-      for (gpu_idx, node_idx) in ordered_keys_for_heatmap
+      for (gpu_idx, node_idx) in duration_matrix.device_keys
   ]
   return HeatmapData(
       experiment_name=experiment,
-      max_node_idx=max_node_idx,
-      max_rank=max_rank,
+      max_node_idx=duration_matrix.max_node_idx,
+      max_rank=duration_matrix.max_rank,
       x_vals=x_vals,
       y_labels=y_labels,
       delayed_event_matrix=delay_matrix,
@@ -85,6 +85,27 @@ _MAXIMUM_CHART_HEIGHT = flags.DEFINE_integer(
     "The maximum height of the chart.",
 )
 
+_CACHE_DIR = flags.DEFINE_string(
+    "cache_dir",
+    None,
+    "The directory to cache parsed ppbenchmark data in. Default: next to"
+    " data_dir, in <data_dir>_cache",
+)
+
+_USE_CACHE = flags.DEFINE_bool(
+    "use_cache",
+    True,
+    "Whether to cache parsed ppbenchmark data, so rerunning the analysis on"
+    " the same data skips parsing.",
+)
+
+_MAX_WORKERS = flags.DEFINE_integer(
+    "max_workers",
+    None,
+    "The number of processes parsing ppbenchmark data. Default: the number"
+    " of CPUs",
+)
+
 
 def main(argv: Sequence[str]):
   if len(argv) > 1:
@@ -94,22 +115,22 @@ def main(argv: Sequence[str]):
   straggler_threshold_ms = _STRAGGLER_THRESHOLD_MS.value
   interesting_event_offset = _INTERESTING_EVENT_OFFSET.value
 
-  experiments = set(
-      pathlib.Path(filename).stem.split("-")[1]
-      for filename in pathlib.Path(data_dir).glob("*.textproto")
+  cache_dir = None
+  if _USE_CACHE.value:
+    cache_dir = _CACHE_DIR.value or f"{data_dir.rstrip('/')}_cache"
+
+  duration_matrices = pp_benchmark_analysis.read_duration_matrices(
+      data_dir, cache_dir=cache_dir, max_workers=_MAX_WORKERS.value
   )
-  if not experiments:
+  if not duration_matrices:
     print("No experiments found in dir: %s" % data_dir)
     return
 
-  for experiment in experiments:
+  for experiment, duration_matrix in duration_matrices.items():
     experiment_dir = pathlib.Path(output_dir, experiment)
     experiment_dir.mkdir(parents=True, exist_ok=True)
-    experiment_data = pp_benchmark_analysis.read_experiment_data(
-        data_dir, experiment
-    )
-    heatmap_data = pp_benchmark_analysis.preprocess_experiment_data(
-        benchmark_results=experiment_data,
+    heatmap_data = pp_benchmark_analysis.preprocess_duration_matrix(
+        duration_matrix=duration_matrix,
         experiment=experiment,
         straggler_threshold_ms=straggler_threshold_ms,
         interesting_event_offset=interesting_event_offset,
@@ -0,0 +1,288 @@
+# Copyright 2024 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for pp_benchmark_analysis."""
+
+import os
+import pathlib
+import tempfile
+from unittest import mock
+
+from absl.testing import absltest
+from absl.testing import parameterized
+import numpy as np
+import torch
+
+import pp_benchmark_analysis
+import pp_benchmark_results_log
+import straggler_detection_healthcheck_pb2
+
+
+class _FakeTimeSource:
+  """Advances both clocks by 1 ms on every read."""
+
+  def __init__(self):
+    self._now_ns = 1_000_000_000
+
+  def time_ns(self) -> int:
+    self._now_ns += 1_000_000
+    return self._now_ns
+
+  def perf_counter_ns(self) -> int:
+    return self.time_ns()
+
+
+def _make_results_log(
+    rank: int, n_batch: int = 2, n_microbatch: int = 3
+) -> pp_benchmark_results_log.PPBenchmarkResultsLog:
+  """Returns a log with every microbatch of a run recorded."""
+  time_source = _FakeTimeSource()
+  results_log = pp_benchmark_results_log.PPBenchmarkResultsLog(
+      straggler_detection_healthcheck_pb2.Metadata(
+          hostname=f"host-{rank}",
+          rank=rank,
+          node_id=rank // 8,
+          gpu_id=rank % 8,
+          n_batch=n_batch,
+          n_microbatch=n_microbatch,
+          msg_size_mb=8,
+      ),
+      time_source=time_source,
+  )
+  with (
+      mock.patch.object(torch.cuda, "synchronize"),
+      mock.patch.object(torch.cuda, "Event"),
+      mock.patch.object(torch.distributed, "barrier"),
+  ):
+    for batch_idx in range(n_batch):
+      results_log.record_barrier_time()
+      for microbatch_idx in range(n_microbatch):
+        timestamps_ns = [time_source.perf_counter_ns() for _ in range(4)]
+        results_log.record_microbatch_comm(
+            batch_idx, microbatch_idx, timestamps_ns
+        )
+  return results_log
+
+
+class ReadPPBenchmarkDataTest(parameterized.TestCase):
+
+  @parameterized.parameters(
+      pp_benchmark_results_log.NPY_FORMAT,
+      pp_benchmark_results_log.TEXTPROTO_FORMAT,
+  )
+  def test_reads_saved_results(self, output_format):
+    data_dir = self.enter_context(tempfile.TemporaryDirectory())
+    results_logs = [_make_results_log(rank) for rank in (0, 9)]
+    for results_log in results_logs:
+      results_log.save_results(data_dir, output_format=output_format)
+
+    experiment_data = sorted(
+        pp_benchmark_analysis.read_experiment_data(data_dir, "8_mb"),
+        key=lambda data: data.metadata.rank,
+    )
+
+    self.assertLen(experiment_data, 2)
+    for data, results_log in zip(experiment_data, results_logs):
+      expected = results_log.get_results()
+      self.assertEqual(data.metadata, expected.metadata)
+      expected_columns = results_log.get_result_columns()
+      self.assertCountEqual(data.columns, expected_columns)
+      for name, column in expected_columns.items():
+        np.testing.assert_array_equal(data.columns[name], column)
+
+  def test_results_directory_is_memory_mapped(self):
+    data_dir = self.enter_context(tempfile.TemporaryDirectory())
+    _make_results_log(rank=0).save_results(data_dir)
+
+    (data,) = pp_benchmark_analysis.read_experiment_data(data_dir, "8_mb")
+
+    self.assertIsInstance(data.columns["t0_ns"], np.memmap)
+    self.assertCountEqual(
+        os.listdir(os.path.join(data_dir, "0_rank-8_mb")),
+        ["metadata.textproto"] + [f"{name}.npy" for name in data.columns],
+    )
+
+  def test_durations_are_in_milliseconds(self):
+    data_dir = self.enter_context(tempfile.TemporaryDirectory())
+    _make_results_log(rank=0).save_results(data_dir)
+    (data,) = pp_benchmark_analysis.read_experiment_data(data_dir, "8_mb")
+
+    durations_ms = (
+        pp_benchmark_analysis._extract_send_recv_durations_for_experiment(data)
+    )
+
+    # t0 and t3 are read 3 ms apart by the fake time source
+    np.testing.assert_array_equal(durations_ms, [3] * 6)
+
+  def test_ignores_other_files(self):
+    data_dir = self.enter_context(tempfile.TemporaryDirectory())
+    pathlib.Path(data_dir, "notes.txt").touch()
+    pathlib.Path(data_dir, "0_rank-8_mb").mkdir()
+
+    self.assertFalse(
+        pp_benchmark_analysis.is_results_file(data_dir, "notes.txt")
+    )
+    # A directory without the metadata file isn't a rank's results
+    self.assertFalse(
+        pp_benchmark_analysis.is_results_file(data_dir, "0_rank-8_mb")
+    )
+    self.assertEmpty(
+        pp_benchmark_analysis.read_experiment_data(data_dir, "8_mb")
+    )
+
+
+def _loop_interesting_event_indices(
+    durations_ms: np.ndarray, straggler_threshold_ms: int, offset: int
+) -> set[int]:
+  """The per-device loop that _identify_interesting_event_indices replaced."""
+  interesting_events = set()
+  for device_durations_ms in durations_ms:
+    max_num_events = len(device_durations_ms)
+    for event_idx, sr_time_ms in enumerate(device_durations_ms):
+      if sr_time_ms >= straggler_threshold_ms:
+        for event_offset in range(offset + 1):
+          if event_idx - event_offset >= 0:
+            interesting_events.add(event_idx - event_offset)
+          if event_idx + event_offset < max_num_events:
+            interesting_events.add(event_idx + event_offset)
+  return interesting_events
+
+
+class IdentifyInterestingEventIndicesTest(parameterized.TestCase):
+
+  @parameterized.product(offset=[0, 1, 3, 50], seed=[0, 1, 2])
+  def test_matches_loop(self, offset, seed):
+    rng = np.random.default_rng(seed)
+    # Mostly fast events with a few stragglers, including at the edges
+    durations_ms = rng.integers(0, 10, size=(4, 40))
+    durations_ms[rng.integers(0, 4, size=3), rng.integers(0, 40, size=3)] = 25
+    durations_ms[0, 0] = durations_ms[3, -1] = 30
+
+    interesting_events = (
+        pp_benchmark_analysis._identify_interesting_event_indices(
+            durations_ms,
+            straggler_threshold_ms=20,
+            interesting_event_offset=offset,
+        )
+    )
+
+    self.assertEqual(
+        interesting_events.tolist(),
+        sorted(_loop_interesting_event_indices(durations_ms, 20, offset)),
+    )
+
+  def test_no_stragglers(self):
+    interesting_events = (
+        pp_benchmark_analysis._identify_interesting_event_indices(
+            np.full((2, 10), 5),
+            straggler_threshold_ms=20,
+            interesting_event_offset=2,
+        )
+    )
+
+    self.assertEmpty(interesting_events)
+
+
+def _benchmark_data(
+    gpu_id: int, durations_ms: list[int]
+) -> pp_benchmark_analysis.PPBenchmarkData:
+  t3_ns = np.array(durations_ms, dtype=np.int64) * 1_000_000
+  return pp_benchmark_analysis.PPBenchmarkData(
+      metadata=straggler_detection_healthcheck_pb2.Metadata(
+          rank=gpu_id, gpu_id=gpu_id
+      ),
+      columns={"t0_ns": np.zeros_like(t3_ns), "t3_ns": t3_ns},
+  )
+
+
+class PreprocessExperimentDataTest(absltest.TestCase):
+
+  def test_builds_delay_matrix_of_interesting_events(self):
+    heatmap_data = pp_benchmark_analysis.preprocess_experiment_data(
+        [
+            _benchmark_data(gpu_id=1, durations_ms=[1, 1, 1, 1, 30, 1]),
+            # Events only some devices recorded are left out
+            _benchmark_data(gpu_id=0, durations_ms=[40, 1, 1, 1, 1]),
+        ],
+        experiment="8_mb",
+        straggler_threshold_ms=20,
+        interesting_event_offset=1,
+    )
+
+    self.assertEqual(heatmap_data.x_vals, [0, 1, 3, 4])
+    self.assertEqual(heatmap_data.y_labels, ["gpu-0-node-0", "gpu-1-node-0"])
+    np.testing.assert_array_equal(
+        heatmap_data.delayed_event_matrix, [[40, 1, 1, 1], [1, 1, 1, 30]]
+    )
+    self.assertEqual(heatmap_data.max_rank, 1)
+
+  def test_no_interesting_events(self):
+    self.assertIsNone(
+        pp_benchmark_analysis.preprocess_experiment_data(
+            [_benchmark_data(gpu_id=0, durations_ms=[1, 2, 3])],
+            experiment="8_mb",
+            straggler_threshold_ms=20,
+            interesting_event_offset=1,
+        )
+    )
+
+
+class ReadDurationMatricesTest(absltest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.data_dir = self.enter_context(tempfile.TemporaryDirectory())
+    self.cache_dir = self.enter_context(tempfile.TemporaryDirectory())
+    for rank in (0, 1):
+      _make_results_log(rank).save_results(self.data_dir)
+
+  def test_reads_every_experiment(self):
+    duration_matrices = pp_benchmark_analysis.read_duration_matrices(
+        self.data_dir, max_workers=1
+    )
+
+    self.assertCountEqual(duration_matrices, ["8_mb"])
+    duration_matrix = duration_matrices["8_mb"]
+    self.assertEqual(duration_matrix.device_keys, [(0, 0), (1, 0)])
+    np.testing.assert_array_equal(duration_matrix.durations_ms, [[3] * 6] * 2)
+
+  def test_uses_cache_until_results_change(self):
+    first = pp_benchmark_analysis.read_duration_matrices(
+        self.data_dir, cache_dir=self.cache_dir, max_workers=1
+    )
+    with mock.patch.object(
+        pp_benchmark_analysis, "_read_device_durations"
+    ) as read_device_durations:
+      cached = pp_benchmark_analysis.read_duration_matrices(
+          self.data_dir, cache_dir=self.cache_dir, max_workers=1
+      )
+    read_device_durations.assert_not_called()
+    np.testing.assert_array_equal(
+        cached["8_mb"].durations_ms, first["8_mb"].durations_ms
+    )
+    self.assertEqual(cached["8_mb"].device_keys, first["8_mb"].device_keys)
+
+    # Changing one column of a rank's results directory invalidates the cache
+    t3_path = os.path.join(self.data_dir, "1_rank-8_mb", "t3_ns.npy")
+    np.save(t3_path, np.load(t3_path) + 10_000_000)
+    updated = pp_benchmark_analysis.read_duration_matrices(
+        self.data_dir, cache_dir=self.cache_dir, max_workers=1
+    )
+
+    np.testing.assert_array_equal(updated["8_mb"].durations_ms[1], [13] * 6)
+    self.assertLen(os.listdir(self.cache_dir), 2)
+
+
+if __name__ == "__main__":
+  absltest.main()
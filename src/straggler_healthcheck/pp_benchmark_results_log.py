@@ -22,6 +22,8 @@ Typical usage example:
       # Instrument timing experiment 
       timestamps_ns = do_timing_experiment()
       log.record_microbatch_comm(batch_idx, microbatch_idx, timestamps_ns)
+      # or, with CUDA events resolved at the next barrier:
+      # log.record_microbatch_events(batch_idx, microbatch_idx, events)
     log.record_barrier_time()
   log.save_results(output_dir)
 """
@@ -32,10 +34,27 @@ import time
 from typing import Protocol
 
 from google.protobuf import text_format
+import numpy as np
 import torch
 
 import straggler_detection_healthcheck_pb2
 
+# Columns of the recorded data. Timestamps are kept as raw perf_counter_ns
+# values and made relative to their barrier only when results are exported.
+_BATCH_ID = 0
+_MICROBATCH_ID = 1
+_BARRIER_TIME_NS = 2
+_BARRIER_PERF_COUNTER_NS = 3
+_T0_NS = 4  # t0..t3 are in the last four columns
+_N_COLUMNS = 8
+_NANOSECONDS_PER_MILLISECOND = 1000000
+
+# Output formats of save_results
+NPY_FORMAT = "npy"
+TEXTPROTO_FORMAT = "textproto"
+# With NPY_FORMAT, the Metadata file in each rank's results directory
+NPY_METADATA_FILE = "metadata.textproto"
+
 
 class TimeSource(Protocol):
   """Defines an interface for a PPBenchmark timing source."""
@@ -69,11 +88,18 @@ class PPBenchmarkResultsLog:
     self._metadata = metadata
     self._barrier_perf_counter_ns = None  # perf_counter_ns at last run barrier
     self._barrier_time_ns = None  # time_ns at last run barrier
-    # Pre-allocate data array as a performance optimization.
-    self._data = [straggler_detection_healthcheck_pb2.PPBenchmarkResult()] * (
-        self._metadata.n_batch * self._metadata.n_microbatch
+    # Pre-allocate data array as a performance optimization. Recording a
+    # microbatch only writes a row, so no objects are created in the timed
+    # loop; protos are built when the results are exported.
+    self._data = np.zeros(
+        (self._metadata.n_batch * self._metadata.n_microbatch, _N_COLUMNS),
+        dtype=np.int64,
     )
     self._data_counter = 0
+    # CUDA event recorded on the current stream at the last run barrier
+    self._barrier_event = None
+    # (row, events) of microbatches whose events aren't resolved yet
+    self._pending_events: list[tuple[int, list[torch.cuda.Event]]] = []
 
   def record_microbatch_comm(
       self, batch_idx: int, microbatch_idx: int, timestamps_ns: list[int]
@@ -88,28 +114,64 @@ class PPBenchmarkResultsLog:
         starting async transfer but before work.wait() - t2: after work.wait()
         but before cuda.synchronize() - t3: after cuda.synchronize()
     """
-    barrier_relative_timestamps_ns = [
-        ts - self._barrier_perf_counter_ns for ts in timestamps_ns
-    ]
     self._data[self._data_counter] = (
-        straggler_detection_healthcheck_pb2.PPBenchmarkResult(
-            batch_id=batch_idx,
-            microbatch_id=microbatch_idx,
-            barrier_time_ns=self._barrier_time_ns,  # epoch ns of last barrier
-            t0_ns=barrier_relative_timestamps_ns[0],  # t0 (barrier offset ns)
-            t1_ns=barrier_relative_timestamps_ns[1],  # t1 (barrier offset ns)
-            t2_ns=barrier_relative_timestamps_ns[2],  # t2 (barrier offset ns)
-            t3_ns=barrier_relative_timestamps_ns[3],  # t3 (barrier offset ns)
-        )
+        batch_idx,
+        microbatch_idx,
+        self._barrier_time_ns,  # epoch ns of last barrier
+        self._barrier_perf_counter_ns,  # perf_counter_ns of last barrier
+        *timestamps_ns,  # t0..t3 (perf_counter_ns)
+    )
+    self._data_counter += 1
+
+  def record_microbatch_events(
+      self,
+      batch_idx: int,
+      microbatch_idx: int,
+      events: list[torch.cuda.Event],
+  ) -> None:
+    """Record CUDA events for each microbatch communication.
+
+    The events are only resolved to timestamps at the next
+    record_barrier_time, so recording them doesn't synchronize the device.
+
+    Args:
+      batch_idx: index of the batch
+      microbatch_idx: index of the microbatch
+      events: list of four CUDA events, recorded with enable_timing=True at
+        the same points as the timestamps of record_microbatch_comm. They
+        must not be recorded again before the next record_barrier_time.
+    """
+    self._data[self._data_counter, :_T0_NS] = (
+        batch_idx,
+        microbatch_idx,
+        self._barrier_time_ns,  # epoch ns of last barrier
+        self._barrier_perf_counter_ns,  # perf_counter_ns of last barrier
     )
+    self._pending_events.append((self._data_counter, events))
     self._data_counter += 1
 
+  def _resolve_pending_events(self) -> None:
+    """Stores the pending events' times, as offsets from the last barrier.
+
+    The device must be synchronized, so all pending events have completed.
+    """
+    for row, events in self._pending_events:
+      for column, event in enumerate(events, start=_T0_NS):
+        self._data[row, column] = self._barrier_perf_counter_ns + round(
+            self._barrier_event.elapsed_time(event)
+            * _NANOSECONDS_PER_MILLISECOND
+        )
+    self._pending_events.clear()
+
   def record_barrier_time(self):
     """Syncronizes all processes and records the current time."""
     torch.cuda.synchronize()
+    self._resolve_pending_events()
     torch.distributed.barrier()
     self._barrier_time_ns = self._time_source.time_ns()
     self._barrier_perf_counter_ns = self._time_source.perf_counter_ns()
+    self._barrier_event = torch.cuda.Event(enable_timing=True)
+    self._barrier_event.record()
 
   def get_results(
       self,
@@ -119,20 +181,65 @@ class PPBenchmarkResultsLog:
     Returns:
       PPBenchmarkResults proto containing the results of the benchmark.
     """
+    columns = self.get_result_columns()
+    benchmark_results = [
+        straggler_detection_healthcheck_pb2.PPBenchmarkResult(
+            **dict(zip(columns, row))
+        )
+        for row in zip(*(column.tolist() for column in columns.values()))
+    ]
     return straggler_detection_healthcheck_pb2.PPBenchmarkResults(
         metadata=self._metadata,
-        benchmark_results=self._data,
+        benchmark_results=benchmark_results,
     )
 
-  def save_results(self, output_dir: str) -> None:
-    """Saves results to a textproto in the output directory.
+  def get_result_columns(self) -> dict[str, np.ndarray]:
+    """Returns the recorded results as one array per PPBenchmarkResult field.
+
+    Returns:
+      A dict from PPBenchmarkResult field name to an int64 array with the
+      value of that field for every recorded microbatch.
+    """
+    data = self._data[: self._data_counter]
+    # t0..t3 as offsets from the last barrier, in ns
+    offsets_ns = data[:, _T0_NS:] - data[:, _BARRIER_PERF_COUNTER_NS, None]
+    return {
+        "batch_id": data[:, _BATCH_ID],
+        "microbatch_id": data[:, _MICROBATCH_ID],
+        "barrier_time_ns": data[:, _BARRIER_TIME_NS],
+        "t0_ns": offsets_ns[:, 0],
+        "t1_ns": offsets_ns[:, 1],
+        "t2_ns": offsets_ns[:, 2],
+        "t3_ns": offsets_ns[:, 3],
+    }
+
+  def save_results(
+      self, output_dir: str, output_format: str = NPY_FORMAT
+  ) -> None:
+    """Saves results to the output directory.
 
     Args:
       output_dir: directory to save the results to
+      output_format: NPY_FORMAT to save a directory with one .npy per
+        PPBenchmarkResult field, which can be memory-mapped, and the Metadata
+        in NPY_METADATA_FILE. TEXTPROTO_FORMAT to save a human readable
+        PPBenchmarkResults textproto, e.g. for debugging.
+
+    Raises:
+      ValueError: If the output format is unknown.
     """
 
     pathlib.Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    file_path = f"{output_dir}/{int(self._metadata.rank)}_rank-{int(self._metadata.msg_size_mb)}_mb.textproto"
-    with open(file_path, "w") as f:
-      f.write(text_format.MessageToString(self.get_results()))
+    file_prefix = f"{output_dir}/{int(self._metadata.rank)}_rank-{int(self._metadata.msg_size_mb)}_mb"
+    if output_format == TEXTPROTO_FORMAT:
+      with open(f"{file_prefix}.textproto", "w") as f:
+        f.write(text_format.MessageToString(self.get_results()))
+    elif output_format == NPY_FORMAT:
+      pathlib.Path(file_prefix).mkdir(exist_ok=True)
+      for name, column in self.get_result_columns().items():
+        np.save(f"{file_prefix}/{name}.npy", column)
+      with open(f"{file_prefix}/{NPY_METADATA_FILE}", "w") as f:
+        f.write(text_format.MessageToString(self._metadata))
+    else:
+      raise ValueError(f"Unknown output format: {output_format}")
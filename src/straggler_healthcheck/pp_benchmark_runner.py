@@ -30,6 +30,7 @@ from absl import flags
 import torch.distributed as dist
 
 import pp_benchmark
+import pp_benchmark_results_log
 
 _MESSAGE_SIZES_MB = flags.DEFINE_list(
     "message_sizes_mb",
@@ -104,6 +105,26 @@ _OUTPUT_DIR = flags.DEFINE_string(
     required=True,
 )
 
+_OUTPUT_FORMAT = flags.DEFINE_enum(
+    "output_format",
+    pp_benchmark_results_log.NPY_FORMAT,
+    [
+        pp_benchmark_results_log.NPY_FORMAT,
+        pp_benchmark_results_log.TEXTPROTO_FORMAT,
+    ],
+    "The format of the results files. textproto is human readable, for"
+    " debugging. Default: npy",
+)
+
+_TIMING_BACKEND = flags.DEFINE_enum(
+    "timing_backend",
+    pp_benchmark.PERF_COUNTER_TIMING,
+    [pp_benchmark.PERF_COUNTER_TIMING, pp_benchmark.CUDA_EVENT_TIMING],
+    "How to time each microbatch. perf_counter synchronizes the GPU after"
+    " every microbatch; cuda_event times it on the device with CUDA events."
+    " Default: perf_counter",
+)
+
 
 def main(_) -> None:
   message_sizes_mb = [
@@ -150,6 +171,8 @@ def main(_) -> None:
         n_batch=_N_BATCH.value,
         n_microbatch=_N_MICROBATCH.value,
         bidirectional=_BIDIRECTIONAL.value,
+        output_format=_OUTPUT_FORMAT.value,
+        timing_backend=_TIMING_BACKEND.value,
     )
 
 
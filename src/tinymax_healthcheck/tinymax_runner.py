@@ -24,11 +24,10 @@ _K_RUN_TINY_MAX_TEST = (
     " /scripts/run-inside-container-enhance.sh"
 )
 _HEALTHCHECK_TIME_LABEL_KEY = "aiinfra/tinymax-healthcheck-runtime-sec"
-_K_ADD_LABEL_FORMAT = "/scripts/kubectl label node %s %s=%s --overwrite"
-K_REMOVE_LABEL_FORMAT = "/scripts/kubectl label node %s %s-"
 _K_RESULT_LABEL_KEY = "aiinfra/tinymax-healthcheck-result"
-_K_TAINT = "aiinfra/tinymax-healthcheck=failed:NoSchedule"
-_K_TAINT_NODE_FORMAT = "/scripts/kubectl taint node %s %s"
+_K_TAINT_KEY = "aiinfra/tinymax-healthcheck"
+_K_TAINT_VALUE = "failed"
+_K_TAINT_EFFECT = "NoSchedule"
 
 WORKLOAD_TERMINATE_FILE = "/usr/share/nemo/workload_terminated"
 
@@ -67,33 +66,28 @@ def run_tinymax_test() -> bool:
   return True
 
 
-def taint_node() -> None:
+def taint_node(mutator: checker_common.NodeMutator) -> None:
   if os.environ.get("DRY_RUN") == "true":
     print("Training was set to dry run. Will not taint node.")
     return
 
-  node_name = os.environ.get("NODE_NAME")
-  taint_command = _K_TAINT_NODE_FORMAT % (node_name, _K_TAINT)
-  print("Applying taint  %s to node %s" % (taint_command, node_name))
-  if not checker_common.run_command(taint_command):
-    print("Failed to apply taint")
+  mutator.add_taint(
+      os.environ.get("NODE_NAME"),
+      _K_TAINT_KEY,
+      _K_TAINT_VALUE,
+      _K_TAINT_EFFECT,
+  )
 
 
-def label_node() -> None:
+def label_node(mutator: checker_common.NodeMutator) -> None:
   """Labels the node with the epoch time that the next test should run."""
-  checker_common.add_label(
+  mutator.set_label(
       os.environ.get("NODE_NAME"),
       _HEALTHCHECK_TIME_LABEL_KEY,
       int(time.time()),
-      _K_ADD_LABEL_FORMAT,
   )
 
 
-def remove_label(node_name: str, label: str) -> None:
-  print("removing label %s from node %s" % (label, node_name))
-  checker_common.run_command(K_REMOVE_LABEL_FORMAT % (node_name, label))
-
-
 def main() -> int:
   # Check to make sure all the needed envs variables are set.
   ensure_env_variables()
@@ -101,20 +95,19 @@ def main() -> int:
   # Run a tiny max training. This will train a 7b LLM over a 30 steps.
   success = run_tinymax_test()
   node_name = os.environ.get("NODE_NAME")
-  checker_common.add_label(
-      node_name,
-      _K_RESULT_LABEL_KEY,
-      "pass" if success else "fail",
-      _K_ADD_LABEL_FORMAT,
-  )
+  mutator = checker_common.NodeMutator()
+  result = "pass" if success else "fail"
+  mutator.set_label(node_name, _K_RESULT_LABEL_KEY, result)
   if success:
     print(f"Node {node_name} passed tinymax test")
   # If the job was not successful and not a dry run, taint the node.
   if not success:
     print(f"Node {node_name} failed tinymax test")
-    taint_node()
+    taint_node(mutator)
 
-  label_node()
+  label_node(mutator)
+  # Result, taint and time labels are applied in a single patch.
+  mutator.flush()
   print("Finished running. Bye!")
 
 